@@ -1,22 +1,34 @@
 # 2_Performance_Analysis.py
 
 import streamlit as st
-import streamlit.components.v1 as components
 import pandas as pd
 import numpy as np
 import sys
 import os
 from datetime import datetime
-import plotly.graph_objects as go  # Import ajouté pour les tableaux
 
 # Ajouter le dossier src au chemin d'importation
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Importer les modules personnalisés
-from src.data_loader import load_portfolio_data, get_stock_data, get_historical_data, load_sector_country_data
-from src.stock_utils import get_currency_mapping, determine_currency, get_company_name
+from src import config
+from src.data_loader import (
+    load_portfolio_data, get_quotes_batch, get_price_matrix, stream_price_matrix, load_sector_country_data,
+    get_fetch_ledger, get_fetch_metrics, get_history_memory_report, get_risk_metrics, get_rolling_stats,
+    get_covariance_model
+)
+from src.stock_utils import get_currency_mapping, determine_currency, get_company_name, format_number_with_spaces
 from src.ui_components import apply_custom_css, create_scrolling_ticker, create_footer, create_metric_card, create_title
-from src.visualization import plot_performance, plot_portfolio_simulation, calculate_portfolio_stats, display_top_contributors, create_bar_charts
+from src.visualization import (
+    plot_performance, plot_portfolio_simulation, calculate_portfolio_stats, display_top_contributors, create_bar_charts,
+    display_fetch_diagnostics, display_timing_panel, create_country_table, plot_rolling_stats,
+    plot_correlation_heatmap
+)
+from src.rebalancing import compare_strategies
+from src.intraday import IncrementalPortfolioSeries
+from src.rolling import STATS
+from src.covariance import cluster_order
+from src.profiling import start_run, step
 
 # Configuration de la page
 st.set_page_config(
@@ -26,6 +38,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Mesure de l'exécution (KOMOREBI_PROFILING=1 : durées par section dans la barre latérale)
+profile_run = start_run("app.py") if config.PROFILING else None
+step("Mise en page")
+
 # Appliquer le CSS global perso
 apply_custom_css()
 
@@ -74,19 +90,17 @@ st.markdown(
 # Titre
 st.markdown(create_title("Komorebi 100 valeurs"), unsafe_allow_html=True)
 
+step("Cotations et bandeau")
+
 # Chargement des données
 portfolio_df = load_portfolio_data()
 currency_mapping = get_currency_mapping()
 
-@st.cache_data(ttl=60)
-def get_all_stock_data(tickers):
-    return {t: get_stock_data(t) for t in tickers}
-
 tickers = portfolio_df['ticker'].tolist()
-stock_data_dict = get_all_stock_data(tickers)
+quotes_df = get_quotes_batch(tickers)
 
 # Ticker défilant
-st.markdown(create_scrolling_ticker(portfolio_df, stock_data_dict, currency_mapping), unsafe_allow_html=True)
+st.markdown(create_scrolling_ticker(portfolio_df, quotes_df, currency_mapping), unsafe_allow_html=True)
 
 # Ajout d'espace après le bandeau défilant
 st.markdown('<div style="height:35px;"></div>', unsafe_allow_html=True)  # Ajout de 35px d'espace
@@ -116,112 +130,259 @@ with col2:
 
 end_date = datetime.now()
 
-# Données historiques & graphique
-with st.spinner("Chargement des données historiques..."):
-    hist_data = get_historical_data(tickers, start_date, end_date)
-
-perf_fig = plot_performance(
-    hist_data,
-    reference_indices=reference_indices,
-    end_date_ui=end_date,
-    force_start_date=start_date
-)
-
-if perf_fig:
-    st.plotly_chart(perf_fig, use_container_width=True, key="perf")
-else:
-    st.warning("Pas assez de données pour afficher le graphique de performance.")
-
-# Simulation
-st.markdown('<div class="section-title">Simulation d\'investissement</div>', unsafe_allow_html=True)
-with st.spinner("Calcul de la simulation..."):
-    sim_fig, final_val, gain_loss, pct, _ = plot_portfolio_simulation(
-        hist_data, 1_000_000, end_date_ui=end_date, max_traces=20, force_start_date=start_date
+# Séries du portefeuille conservées entre les rafraîchissements : seul le point du jour est recalculé
+@st.cache_resource
+def get_intraday_series(tickers, start_date, initial_investment):
+    return IncrementalPortfolioSeries(start_date, initial_investment)
+
+def render_performance(prices, live_performance=None, key="perf"):
+    """Graphique de performance comparée aux indices de référence."""
+    perf_fig = plot_performance(
+        prices,
+        reference_indices=reference_indices,
+        end_date_ui=end_date,
+        force_start_date=start_date,
+        portfolio_performance=live_performance if live_performance is not None and len(live_performance) else None
     )
-if sim_fig:
-    st.plotly_chart(sim_fig, use_container_width=True, key="sim")
-    c1, c2, c3 = st.columns(3)
+    
+    if perf_fig:
+        st.plotly_chart(perf_fig, use_container_width=True, key=key)
+    else:
+        st.warning("Pas assez de données pour afficher le graphique de performance.")
+
+def render_rolling(prices, key="rolling"):
+    """Rendement, volatilité et corrélation glissants (30, 90 et 252 séances) du portefeuille."""
+    benchmark_name = next(iter(reference_indices), "CAC 40")
+    stats = get_rolling_stats(prices, start_date, indices_options[benchmark_name])
+    stat = st.radio("Statistique glissante", STATS, index=1, horizontal=True, key=f"{key}_stat")
+    if stat == "Corrélation":
+        st.caption(f"Corrélation avec le {benchmark_name}")
+    rolling_fig = plot_rolling_stats(stats, stat, height=420)
+    if rolling_fig:
+        st.plotly_chart(rolling_fig, use_container_width=True, key=key)
+    else:
+        st.info("Historique trop court pour les statistiques glissantes.")
+    return stats
+
+def render_rolling_table(stats):
+    """Dernières statistiques glissantes du portefeuille et de chaque valeur."""
+    with st.expander(f"Statistiques glissantes par valeur (corrélation avec le {next(iter(reference_indices), 'CAC 40')})"):
+        names = portfolio_df.drop_duplicates('ticker').set_index('ticker')['name']
+        table = stats.latest()
+        table.insert(0, 'Société', [names.get(t, t) for t in table.index])
+        percent_columns = [c for c in table.columns if c.endswith('(%)')]
+        corr_columns = [c for c in table.columns if c.startswith('Corrélation')]
+        rolling_html = (
+            table.style
+              .format('{:+.1f}%', subset=[c for c in percent_columns if c.startswith('Rendement')], na_rep='-')
+              .format('{:.1f}%', subset=[c for c in percent_columns if c.startswith('Volatilité')], na_rep='-')
+              .format('{:.2f}', subset=corr_columns, na_rep='-')
+              .set_table_attributes('class="komorebi-table"')
+              .to_html()
+        )
+        st.markdown(rolling_html, unsafe_allow_html=True)
+
+def render_simulation(prices, live_value=None, key="sim", complete=True):
+    """Simulation d'investissement, indicateurs et comparaison des stratégies (matrice complète)."""
+    with st.spinner("Calcul de la simulation..."):
+        sim_fig, final_val, gain_loss, pct, _ = plot_portfolio_simulation(
+            prices, 1_000_000, end_date_ui=end_date, max_traces=20, force_start_date=start_date,
+            portfolio_value=live_value if live_value is not None and len(live_value) else None
+        )
+    if sim_fig:
+        st.plotly_chart(sim_fig, use_container_width=True, key=key)
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            st.markdown(create_metric_card("Valeur finale", int(final_val), "Valeur totale du portefeuille", is_currency=True, currency="€"), unsafe_allow_html=True)
+        with c2:
+            st.markdown(create_metric_card("Gain/Perte", int(gain_loss), "Depuis l'investissement initial", is_currency=True, currency="€", positive_color=True), unsafe_allow_html=True)
+        with c3:
+            st.markdown(create_metric_card("Performance", pct, "Rendement total", is_percentage=True, positive_color=True), unsafe_allow_html=True)
+        if not complete:
+            return
+        # Comparaison avec un portefeuille rééquilibré vers l'équipondération
+        with st.expander("Comparaison des stratégies de rééquilibrage (coûts de 10 pb par transaction)"):
+            strategies_df = compare_strategies(prices, 1_000_000, start_date, end_date)
+            strategies_df.index += 1
+            strategies_html = (
+                strategies_df.style
+                  .format({
+                      'Valeur finale (€)': format_number_with_spaces,
+                      'Performance (%)': '{:+.2f}%',
+                      'Rotation cumulée (%)': '{:.1f}%',
+                      'Coûts (€)': format_number_with_spaces
+                  })
+                  .set_table_attributes('class="komorebi-table"')
+                  .to_html()
+            )
+            st.markdown(strategies_html, unsafe_allow_html=True)
+    else:
+        st.warning("Pas assez de données pour afficher la simulation.")
+
+def render_contributors(prices, key="contributors"):
+    """Contributeurs positifs et négatifs à la performance."""
+    if not prices.empty and 'name' in portfolio_df.columns:
+        df_perf = calculate_portfolio_stats(prices, portfolio_df, start_date, end_date)
+        display_top_contributors(df_perf, key=key)
+    else:
+        st.warning("Impossible de calculer les contributeurs à la performance.")
+
+def render_risk(prices):
+    """Indicateurs de risque du portefeuille et de chaque valeur, comparés à tous les indices de référence."""
+    risk_df = get_risk_metrics(prices, indices_options, start_date)
+    if risk_df.empty:
+        st.warning("Pas assez de données pour calculer les indicateurs de risque.")
+        return
+    portfolio_risk = risk_df.iloc[0]
+    c1, c2, c3, c4 = st.columns(4)
     with c1:
-        st.markdown(create_metric_card("Valeur finale", int(final_val), "Valeur totale du portefeuille", is_currency=True, currency="€"), unsafe_allow_html=True)
+        st.markdown(create_metric_card("Volatilité", portfolio_risk["Volatilité (%)"], "Annualisée", is_percentage=True, positive_color=False), unsafe_allow_html=True)
     with c2:
-        st.markdown(create_metric_card("Gain/Perte", int(gain_loss), "Depuis l'investissement initial", is_currency=True, currency="€", positive_color=True), unsafe_allow_html=True)
+        st.markdown(create_metric_card("Drawdown max", portfolio_risk["Drawdown max (%)"], "Depuis un plus haut", is_percentage=True), unsafe_allow_html=True)
     with c3:
-        st.markdown(create_metric_card("Performance", pct, "Rendement total", is_percentage=True, positive_color=True), unsafe_allow_html=True)
-else:
-    st.warning("Pas assez de données pour afficher la simulation.")
+        st.markdown(create_metric_card("Sharpe", f"{portfolio_risk['Sharpe']:.2f}", "Rendement / volatilité"), unsafe_allow_html=True)
+    with c4:
+        st.markdown(create_metric_card("Sortino", f"{portfolio_risk['Sortino']:.2f}", "Rendement / volatilité à la baisse"), unsafe_allow_html=True)
+    with st.expander("Indicateurs de risque par valeur (bêta et corrélation avec chaque indice)"):
+        names = portfolio_df.drop_duplicates('ticker').set_index('ticker')['name']
+        table = risk_df.copy()
+        table.insert(0, 'Société', [names.get(t, t) for t in table.index])
+        ratio_columns = [c for c in table.columns if c not in ('Société', 'Volatilité (%)', 'Drawdown max (%)')]
+        risk_html = (
+            table.style
+              .format({'Volatilité (%)': '{:.1f}%', 'Drawdown max (%)': '{:.1f}%'}, na_rep='-')
+              .format('{:.2f}', subset=ratio_columns, na_rep='-')
+              .set_table_attributes('class="komorebi-table"')
+              .to_html()
+        )
+        st.markdown(risk_html, unsafe_allow_html=True)
+
+def render_diversification(prices, window=252):
+    """Carte de chaleur des corrélations entre valeurs (rétrécissement de Ledoit-Wolf), valeurs corrélées regroupées."""
+    with st.expander(f"Corrélations entre valeurs ({window} dernières séances)"):
+        model = get_covariance_model(prices, window)
+        if len(model) < 2:
+            st.info("Historique trop court pour estimer les corrélations.")
+            return
+        correlation = model.correlation()
+        values = correlation.to_array()
+        off_diagonal = values[~np.eye(len(values), dtype=bool)]
+        st.caption(
+            f"Corrélation moyenne : {np.nanmean(off_diagonal):.2f} — "
+            f"rétrécissement de Ledoit-Wolf : {model.shrinkage:.0%} — "
+            f"séances du {model.dates[0]:%d/%m/%Y} au {model.end:%d/%m/%Y}"
+        )
+        st.plotly_chart(plot_correlation_heatmap(correlation, cluster_order(correlation)), use_container_width=True, key="correlation_heatmap")
+
+def performance_table(analysis_df, group, label):
+    """Tableau HTML des performances agrégées par secteur ou par pays."""
+    stats = (
+        analysis_df.groupby(group)
+        .agg({'Ticker':'count','Variation(%)':['mean','min','max']})
+        .reset_index()
+    )
+    stats.columns = [label,'Nombre','Performance Moyenne (%)','Performance Min (%)','Performance Max (%)']
+    stats.index += 1
+    
+    return (
+        stats.style
+          .format({
+              'Performance Moyenne (%)':'{:+.2f}%',
+              'Performance Min (%)':'{:+.2f}%',
+              'Performance Max (%)':'{:+.2f}%'
+          })
+          .background_gradient(cmap='RdYlGn', subset=['Performance Moyenne (%)'], vmin=-50, vmax=150)
+          .set_table_attributes('class="komorebi-table"')
+          .to_html()
+    )
 
-# Contributeurs
-if hist_data and 'name' in portfolio_df.columns:
-    df_perf = calculate_portfolio_stats(hist_data, portfolio_df, start_date, end_date)
-    display_top_contributors(df_perf)
-else:
-    st.warning("Impossible de calculer les contributeurs à la performance.")
+def render_sector_tables(prices, df_sc):
+    """Performances par secteur et par pays."""
+    # Calcul des variations (une ligne de la matrice au début, la dernière à la fin)
+    perf_df = pd.DataFrame(columns=['Ticker', 'Société', 'Variation(%)'])
+    if not prices.empty:
+        i0 = min(prices.dates.searchsorted(pd.Timestamp(start_date)), len(prices) - 1)
+        p0, p1 = prices.values[i0], prices.values[-1]
+        ok = np.nan_to_num(p0) > 0
+        names = portfolio_df.drop_duplicates('ticker').set_index('ticker')['name']
+        perf_tickers = [t for t, keep in zip(prices.tickers, ok) if keep]
+        perf_df = pd.DataFrame({
+            'Ticker': perf_tickers,
+            'Société': [names.get(t, t) for t in perf_tickers],
+            'Variation(%)': (p1[ok] - p0[ok]) / p0[ok] * 100
+        })
+    analysis_df = pd.merge(df_sc, perf_df, on='Ticker')
+    
+    # --- Performances par secteur ---
+    st.markdown("<h5 style='font-size:16px;'>Performance par secteur</h5>", unsafe_allow_html=True)
+    st.markdown(performance_table(analysis_df, 'Sector', 'Secteur'), unsafe_allow_html=True)
+    
+    # --- Performances par pays ---
+    st.markdown("<h5 style='font-size:16px;'>Performance par pays</h5>", unsafe_allow_html=True)
+    st.markdown(performance_table(analysis_df, 'Country', 'Pays'), unsafe_allow_html=True)
+
+step("Historiques, performance et simulation")
 
-# Analyse par secteur et pays
+# Emplacements mis à jour sur place au fur et à mesure du chargement des historiques
+progress_area = st.container()
+perf_slot = st.empty()
+st.markdown('<div class="section-title">Simulation d\'investissement</div>', unsafe_allow_html=True)
+sim_slot = st.empty()
+contributors_slot = st.empty()
+st.markdown('<div class="section-title">Analyse du risque</div>', unsafe_allow_html=True)
+risk_slot = st.empty()
 st.markdown('<div class="section-title">Analyse par Secteur et Pays</div>', unsafe_allow_html=True)
-df_sc = load_sector_country_data(tickers)
-
-# Calcul des variations
-perf_list = []
-for t in tickers:
-    if t in hist_data and not hist_data[t].empty:
-        dfh = hist_data[t]
-        i0 = dfh.index.get_indexer([start_date], method='nearest')[0]
-        if 0 <= i0 < len(dfh):
-            p0, p1 = dfh['Close'].iloc[i0], dfh['Close'].iloc[-1]
-            if p0 > 0:
-                pctc = (p1 - p0) / p0 * 100
-                comp = portfolio_df[portfolio_df['ticker'] == t]
-                name = comp.iloc[0]['name'] if not comp.empty else t
-                perf_list.append({'Ticker': t, 'Société': name, 'Variation(%)': pctc})
-perf_df = pd.DataFrame(perf_list)
-analysis_df = pd.merge(df_sc, perf_df, on='Ticker')
-
-# --- Performances par secteur ---
-st.markdown("<h5 style='font-size:16px;'>Performance par secteur</h5>", unsafe_allow_html=True)
-sector_stats = (
-    analysis_df.groupby('Sector')
-    .agg({'Ticker':'count','Variation(%)':['mean','min','max']})
-    .reset_index()
-)
-sector_stats.columns = ['Secteur','Nombre','Performance Moyenne (%)','Performance Min (%)','Performance Max (%)']
-sector_stats.index += 1
-
-sector_html = (
-    sector_stats.style
-      .format({
-          'Performance Moyenne (%)':'{:+.2f}%',
-          'Performance Min (%)':'{:+.2f}%',
-          'Performance Max (%)':'{:+.2f}%'
-      })
-      .background_gradient(cmap='RdYlGn', subset=['Performance Moyenne (%)'], vmin=-50, vmax=150)
-      .set_table_attributes('class="komorebi-table"')
-      .to_html()
-)
-st.markdown(sector_html, unsafe_allow_html=True)
-
-# --- Performances par pays ---
-st.markdown("<h5 style='font-size:16px;'>Performance par pays</h5>", unsafe_allow_html=True)
-country_stats = (
-    analysis_df.groupby('Country')
-    .agg({'Ticker':'count','Variation(%)':['mean','min','max']})
-    .reset_index()
-)
-country_stats.columns = ['Pays','Nombre','Performance Moyenne (%)','Performance Min (%)','Performance Max (%)']
-country_stats.index += 1
-
-country_html = (
-    country_stats.style
-      .format({
-          'Performance Moyenne (%)':'{:+.2f}%',
-          'Performance Min (%)':'{:+.2f}%',
-          'Performance Max (%)':'{:+.2f}%'
-      })
-      .background_gradient(cmap='RdYlGn', subset=['Performance Moyenne (%)'], vmin=-50, vmax=150)
-      .set_table_attributes('class="komorebi-table"')
-      .to_html()
-)
-st.markdown(country_html, unsafe_allow_html=True)
+sector_slot = st.empty()
+
+# Données historiques & graphiques : rendu progressif (premiers tickers chargés d'abord)
+# puis définitif ; une seule passe si la matrice partagée est déjà à jour
+if config.STREAMING_RENDER:
+    price_stream = stream_price_matrix(tickers, start_date, container=progress_area)
+else:
+    with st.spinner("Chargement des données historiques..."):
+        # Fin non fixée : la clé de cache reste stable entre deux rafraîchissements
+        price_stream = [(get_price_matrix(tickers, start_date), True)]
+
+df_sc = None
+for prices, complete in price_stream:
+    if complete:
+        live_series = get_intraday_series(tuple(tickers), start_date, 1_000_000)
+        live_performance, live_value = live_series.sync(prices, quotes_df, end_date=end_date)
+        suffix = ""
+    else:
+        live_performance = live_value = None
+        suffix = f"_partial_{len(prices.tickers)}"
+    
+    with perf_slot.container():
+        if not complete:
+            st.caption(f"Résultats partiels : {len(prices.tickers)}/{len(tickers)} valeurs chargées")
+        perf_col, rolling_col = st.columns([3, 2])
+        with perf_col:
+            render_performance(prices, live_performance, key=f"perf{suffix}")
+        with rolling_col:
+            if complete:
+                rolling_stats = render_rolling(prices)
+            else:
+                st.caption("Statistiques glissantes calculées une fois toutes les valeurs chargées")
+        if complete:
+            render_rolling_table(rolling_stats)
+    with sim_slot.container():
+        render_simulation(prices, live_value, key=f"sim{suffix}", complete=complete)
+    with contributors_slot.container():
+        render_contributors(prices, key=f"contributors{suffix}")
+    with risk_slot.container():
+        if complete:
+            render_risk(prices)
+            render_diversification(prices)
+        else:
+            st.caption("Indicateurs de risque calculés une fois toutes les valeurs chargées")
+    
+    if df_sc is None:
+        df_sc = load_sector_country_data(tickers)
+    with sector_slot.container():
+        render_sector_tables(prices, df_sc)
+
+step("Répartition sectorielle et géographique")
 
 # Ajouter plus d'espace avant la section "Répartition Sectorielle et Géographique"
 st.markdown("<div style='height:50px'></div>", unsafe_allow_html=True)
@@ -249,6 +410,8 @@ with col_chart2:
 # Ajouter plus d'espace avant la nouvelle section
 st.markdown("<div style='height:50px'></div>", unsafe_allow_html=True)
 
+step("Liste des valeurs par pays")
+
 # NOUVELLE SECTION: Liste des 100 valeurs présentes dans le Portefeuille
 st.markdown('<div class="section-title">Liste des 100 valeurs présentes dans le Portefeuille</div>', unsafe_allow_html=True)
 
@@ -258,18 +421,15 @@ portfolio_complete = portfolio_df.copy()
 # Ajouter les données de secteur/pays
 portfolio_complete = portfolio_complete.merge(df_sc, left_on='ticker', right_on='Ticker', how='left')
 
-# Ajouter les performances du jour
+# Ajouter les performances du jour (lues colonne par colonne dans les cotations)
 daily_performance = []
-for _, row in portfolio_complete.iterrows():
-    ticker = row['ticker']
-    stock_data = stock_data_dict.get(ticker, {})
-    
-    # Récupérer la performance du jour
-    current_price = stock_data.get('current_price', 0)
-    percent_change = stock_data.get('percent_change', 0)
-    
-    # Formater la performance du jour
-    if percent_change >= 0:
+day_prices = quotes_df['current_price'].reindex(portfolio_complete['ticker']).tolist()
+day_changes = quotes_df['percent_change'].reindex(portfolio_complete['ticker']).tolist()
+for ticker, current_price, percent_change in zip(portfolio_complete['ticker'], day_prices, day_changes):
+    # Formater la performance du jour (n/d si la cotation est indisponible)
+    if pd.isna(current_price) or pd.isna(percent_change):
+        performance_text = "n/d"
+    elif percent_change >= 0:
         performance_text = f"{current_price:.2f} (+{percent_change:.2f}%)"
     else:
         performance_text = f"{current_price:.2f} ({percent_change:.2f}%)"
@@ -308,70 +468,11 @@ for country in countries:
     if country_data.empty:
         continue
     
-    # Préparer les données pour le tableau
-    table_data = []
-    for _, row in country_data.iterrows():
-        # Secteur (avec valeur par défaut si manquante)
-        sector = row.get('Sector', 'Non disponible')
-        if pd.isna(sector):
-            sector = 'Non disponible'
-            
-        table_data.append({
-            'name': row['name'],
-            'performance': row['performance_day'],
-            'sector': sector,
-            'currency': row['currency']
-        })
-    
-    if not table_data:
-        continue
-    
-    # Convertir en DataFrame
-    country_df = pd.DataFrame(table_data)
-    
     # Créer le titre du pays avec marges réduites
-    st.markdown(f"<h4 style='color: #693112; margin-top: 5px; margin-bottom: 5px;'>🌍 {country} ({len(country_df)} valeurs)</h4>", unsafe_allow_html=True)
-    
-    # Créer le tableau avec Plotly - ORDRE MODIFIÉ DES COLONNES
-    fig_country = go.Figure(data=[go.Table(
-        header=dict(
-            # NOUVEL ORDRE: Nom - Secteur - Performance - Devise
-            values=['<b>Nom complet de la société</b>', '<b>Secteur</b>', '<b>Performance du jour (%)</b>', '<b>Devise</b>'],
-            font=dict(size=14, color='white'),
-            fill_color='#693112',  # Fond marron
-            align='center',
-            height=40
-        ),
-        cells=dict(
-            # NOUVEL ORDRE des valeurs: name - sector - performance - currency
-            values=[
-                country_df['name'],
-                country_df['sector'],
-                country_df['performance'],
-                country_df['currency']
-            ],
-            font=dict(size=14, color='#000000', weight='bold'),
-            align='center',
-            format=[None, None, None, None],
-            fill_color=['#F9F9F9'],
-            height=30
-        )
-    )])
-    
-    # SOLUTION CHATGPT : Calcul de la hauteur
-    n_rows = len(country_df)
-    base_height = 40 * n_rows + 50  # 40px par ligne + 50px pour l'en-tête
+    st.markdown(f"<h4 style='color: #693112; margin-top: 5px; margin-bottom: 5px;'>🌍 {country} ({len(country_data)} valeurs)</h4>", unsafe_allow_html=True)
     
-    if country == "France":
-        height = base_height  # on l'affiche en entier
-    else:
-        height = min(base_height, 800)  # pour les autres, on garde un max
-    
-    # Mise en page du tableau avec hauteur adaptée
-    fig_country.update_layout(
-        margin=dict(l=5, r=5, t=0, b=0),
-        height=height
-    )
+    # Tableau Plotly (France affichée en entier, hauteur limitée pour les autres pays)
+    fig_country = create_country_table(country_data, full_height=(country == "France"))
     
     # Afficher le tableau
     st.plotly_chart(fig_country, use_container_width=True, key=f"country_{country}")
@@ -386,59 +487,25 @@ if not no_country_data.empty:
     # Titre avec marges réduites
     st.markdown(f"<h4 style='color: #693112; margin-top: 5px; margin-bottom: 5px;'>❓ Pays non défini ({len(no_country_data)} valeurs)</h4>", unsafe_allow_html=True)
     
-    # Préparer les données
-    table_data = []
-    for _, row in no_country_data.iterrows():
-        sector = row.get('Sector', 'Non disponible')
-        if pd.isna(sector):
-            sector = 'Non disponible'
-            
-        table_data.append({
-            'name': row['name'],
-            'performance': row['performance_day'],
-            'sector': sector,
-            'currency': row['currency']
-        })
-    
-    no_country_df = pd.DataFrame(table_data)
-    
-    # Créer le tableau - ORDRE MODIFIÉ DES COLONNES
-    fig_no_country = go.Figure(data=[go.Table(
-        header=dict(
-            # NOUVEL ORDRE: Nom - Secteur - Performance - Devise
-            values=['<b>Nom complet de la société</b>', '<b>Secteur</b>', '<b>Performance du jour (%)</b>', '<b>Devise</b>'],
-            font=dict(size=14, color='white'),
-            fill_color='#693112',
-            align='center',
-            height=40
-        ),
-        cells=dict(
-            # NOUVEL ORDRE des valeurs: name - sector - performance - currency
-            values=[
-                no_country_df['name'],
-                no_country_df['sector'],
-                no_country_df['performance'],
-                no_country_df['currency']
-            ],
-            font=dict(size=14, color='#000000', weight='bold'),
-            align='center',
-            format=[None, None, None, None],
-            fill_color=['#F9F9F9'],
-            height=30
-        )
-    )])
-    
-    # Hauteur adaptée pour "Pays non défini"
-    n_rows = len(no_country_df)
-    base_height = 40 * n_rows + 50
-    height = min(base_height, 800)  # Limite pour éviter des pages trop longues
-    
-    fig_no_country.update_layout(
-        margin=dict(l=5, r=5, t=0, b=0),
-        height=height
-    )
+    # Tableau Plotly, hauteur limitée
+    fig_no_country = create_country_table(no_country_data)
     
     st.plotly_chart(fig_no_country, use_container_width=True, key="country_undefined")
 
+step("Diagnostic et pied de page")
+
+# Diagnostic des récupérations de données (KOMOREBI_DIAGNOSTICS=1)
+if config.DIAGNOSTICS:
+    with st.expander("Diagnostic des données (source, latence, tentatives, ancienneté)"):
+        display_fetch_diagnostics(get_fetch_ledger(), get_fetch_metrics(), memory=get_history_memory_report())
+
 # Footer
-st.markdown(create_footer(), unsafe_allow_html=True)
\ No newline at end of file
+st.markdown(create_footer(), unsafe_allow_html=True)
+
+# Durées de l'exécution, conservées pour les dernières exécutions de la session
+if profile_run is not None:
+    profile_runs = st.session_state.setdefault("profile_runs", [])
+    profile_runs.append(profile_run.finish())
+    del profile_runs[:-20]
+    with st.sidebar:
+        display_timing_panel(profile_runs)
\ No newline at end of file
@@ -0,0 +1,274 @@
+# bench_pipeline.py
+
+# Benchmark de bout en bout de la chaîne données -> analyses -> graphiques, sur un fournisseur
+# synthétique local et déterministe, pour plusieurs tailles d'univers et profondeurs d'historique.
+# Rapporte les percentiles de latence et le pic mémoire de chaque étape, et compare à une
+# référence enregistrée (code de sortie 1 en cas de régression).
+#
+# Usage : python -m benchmarks.bench_pipeline [--tickers 100 500 2000] [--years 1 5 20] [--repeat 3]
+#                                             [--save-baseline [FICHIER]] [--compare [FICHIER]]
+#                                             [--risk-tickers 1000] [--risk-years 20]
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Stockages dans un répertoire temporaire et débit non limité (fournisseur local),
+# fixés avant le chargement de la configuration
+WORK_DIR = tempfile.mkdtemp(prefix="komorebi-bench-")
+os.environ.setdefault("KOMOREBI_HISTORY_STORE_DIR", os.path.join(WORK_DIR, "history"))
+os.environ.setdefault("KOMOREBI_ARCHIVE_DIR", os.path.join(WORK_DIR, "archive"))
+os.environ.setdefault("KOMOREBI_SNAPSHOT_DIR", os.path.join(WORK_DIR, "snapshot"))
+os.environ.setdefault("KOMOREBI_MARKET_STORE_PATH", os.path.join(WORK_DIR, "market.db"))
+os.environ.setdefault("KOMOREBI_FETCH_RATE", "0")
+os.environ["KOMOREBI_USE_REFRESHER"] = "0"
+
+from src import config, market_data
+from src.price_matrix import PriceMatrix
+from src.portfolio_engine import PortfolioEngine
+from src.providers import SyntheticProvider, set_provider
+from src.risk import risk_metrics, TRADING_DAYS
+from src.stock_utils import determine_currency
+from src.ui_components import create_scrolling_ticker
+from src.visualization import (
+    plot_performance, plot_portfolio_simulation, calculate_portfolio_stats, create_country_table
+)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "pipeline.json")
+
+
+def make_portfolio(n_tickers, path):
+    """Portefeuille synthétique : les suffixes de place du portefeuille réel, répétés."""
+    real = pd.read_csv(market_data.PORTFOLIO_CSV)['ticker']
+    suffixes = sorted({t[t.index('.'):] if '.' in t else '' for t in real})
+    tickers = [f"S{i:04d}{suffixes[i % len(suffixes)]}" for i in range(n_tickers)]
+    pd.DataFrame({'name': [f"Société {i}" for i in range(n_tickers)], 'ticker': tickers}).to_csv(path, index=False)
+
+
+def country_tables(portfolio_df, df_sc, quotes):
+    """Construction des tableaux par pays, comme dans app.py."""
+    complete = portfolio_df.merge(df_sc, left_on='ticker', right_on='Ticker', how='left')
+    prices = quotes['current_price'].reindex(complete['ticker'])
+    changes = quotes['percent_change'].reindex(complete['ticker'])
+    complete['performance_day'] = [
+        "n/d" if pd.isna(p) or pd.isna(c) else f"{p:.2f} ({c:+.2f}%)" for p, c in zip(prices, changes)
+    ]
+    complete['currency'] = [determine_currency(t) for t in complete['ticker']]
+    figures = []
+    for country, rows in complete.groupby('Country'):
+        figures.append(create_country_table(rows, full_height=(country == "France")))
+    return figures
+
+
+def run_scenario(n_tickers, years, repeat, seed):
+    """
+    Mesure chaque étape de la chaîne pour un univers et une profondeur d'historique.
+
+    Returns:
+        dict: étape -> {p50_s, p95_s, max_s, peak_mb}
+    """
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=int(365.25 * years))
+    provider = SyntheticProvider(seed=seed, start=start_date - timedelta(days=10))
+
+    csv_path = os.path.join(WORK_DIR, f"portfolio_{n_tickers}.csv")
+    make_portfolio(n_tickers, csv_path)
+    tickers = pd.read_csv(csv_path)['ticker'].tolist()
+    # Génération des séries hors mesure : seule la chaîne de l'application est chronométrée
+    provider.preload(tickers + ["^FCHI"])
+    set_provider(provider)
+
+    def cold():
+        market_data.clear_caches()
+        shutil.rmtree(config.HISTORY_STORE_DIR, ignore_errors=True)
+        os.makedirs(config.HISTORY_STORE_DIR, exist_ok=True)
+
+    ctx = {}
+    stages = [
+        ("load_portfolio", None, lambda: market_data.load_portfolio(csv_path)),
+        ("get_historical_data (froid)", cold, lambda: market_data.get_historical_data(tickers, start_date)),
+        ("get_historical_data (cache)", None, lambda: market_data.get_historical_data(tickers, start_date)),
+        ("price_matrix", None, lambda: PriceMatrix.from_history(ctx["get_historical_data (cache)"], start_date, end_date)),
+        ("get_quotes_batch (froid)", market_data.clear_caches, lambda: market_data.get_quotes_batch(tickers)),
+        ("plot_performance", None, lambda: plot_performance(
+            ctx["price_matrix"], reference_indices={"CAC 40": "^FCHI"}, end_date_ui=end_date, force_start_date=start_date)),
+        ("plot_portfolio_simulation", None, lambda: plot_portfolio_simulation(
+            ctx["price_matrix"], 1_000_000, end_date_ui=end_date, max_traces=20, force_start_date=start_date)),
+        ("calculate_portfolio_stats", None, lambda: calculate_portfolio_stats(
+            ctx["price_matrix"], ctx["load_portfolio"], start_date, end_date)),
+        ("create_scrolling_ticker", None, lambda: create_scrolling_ticker(
+            ctx["load_portfolio"], ctx["get_quotes_batch (froid)"], {})),
+        ("tableaux par pays", None, lambda: country_tables(
+            ctx["load_portfolio"], ctx["sector_country"], ctx["get_quotes_batch (froid)"])),
+    ]
+
+    results = {}
+    for name, setup, fn in stages:
+        if name == "tableaux par pays":
+            ctx["sector_country"] = market_data.load_sector_country_data(tickers)
+        timings = []
+        for _ in range(repeat):
+            if setup is not None:
+                setup()
+            t0 = time.perf_counter()
+            ctx[name] = fn()
+            timings.append(time.perf_counter() - t0)
+
+        # Pic mémoire mesuré sur une exécution supplémentaire (tracemalloc ralentit l'exécution)
+        if setup is not None:
+            setup()
+        tracemalloc.start()
+        ctx[name] = fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        results[name] = {
+            "p50_s": float(np.percentile(timings, 50)),
+            "p95_s": float(np.percentile(timings, 95)),
+            "max_s": float(max(timings)),
+            "peak_mb": peak / 1e6
+        }
+    return results
+
+
+def run_risk_scenario(n_tickers, years, repeat, seed):
+    """
+    Mesure risk_metrics seul (un indice, portefeuille équipondéré) sur une matrice simulée :
+    objectif inférieur à la seconde pour 1 000 tickers sur 20 ans.
+
+    Returns:
+        dict: {"risk_metrics": {p50_s, p95_s, max_s, peak_mb}}
+    """
+    rng = np.random.default_rng(seed)
+    n_dates = TRADING_DAYS * years
+    dates = pd.bdate_range(end=datetime.now(), periods=n_dates)
+    values = 100 * np.cumprod(1 + rng.normal(0.0003, 0.015, (n_dates, n_tickers)), axis=0)
+    # Cotations tardives : une valeur sur dix commence en cours de période
+    late = rng.integers(0, n_dates // 2, n_tickers // 10)
+    for col, first in zip(range(0, n_tickers, 10), late):
+        values[:first, col] = np.nan
+    prices = PriceMatrix(dates, [f"S{i:04d}" for i in range(n_tickers)], values)
+    benchmark = pd.Series(4000 * np.cumprod(1 + rng.normal(0.0002, 0.01, n_dates)), index=dates)
+    portfolio = PortfolioEngine(prices).run(1.0).total_value
+
+    def run():
+        return risk_metrics(prices, {"Indice": benchmark}, portfolio)
+
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"risk_metrics": {
+        "p50_s": float(np.percentile(timings, 50)),
+        "p95_s": float(np.percentile(timings, 95)),
+        "max_s": float(max(timings)),
+        "peak_mb": peak / 1e6
+    }}
+
+
+def compare(results, baseline, tolerance, min_seconds, min_mb):
+    """
+    Compare les mesures à la référence.
+
+    Returns:
+        list: Régressions (scénario, étape, mesure, référence, valeur)
+    """
+    regressions = []
+    for scenario, stages in results.items():
+        for stage, m in stages.items():
+            ref = baseline.get(scenario, {}).get(stage)
+            if ref is None:
+                continue
+            if m["p50_s"] > ref["p50_s"] * (1 + tolerance) and m["p50_s"] - ref["p50_s"] > min_seconds:
+                regressions.append((scenario, stage, "p50_s", ref["p50_s"], m["p50_s"]))
+            if m["peak_mb"] > ref["peak_mb"] * (1 + tolerance) and m["peak_mb"] - ref["peak_mb"] > min_mb:
+                regressions.append((scenario, stage, "peak_mb", ref["peak_mb"], m["peak_mb"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de bout en bout de la chaîne de données et d'analyse")
+    parser.add_argument('--tickers', type=int, nargs='+', default=[100, 500, 2000], help="Tailles d'univers")
+    parser.add_argument('--years', type=int, nargs='+', default=[1, 5, 20], help="Profondeurs d'historique (années)")
+    parser.add_argument('--repeat', type=int, default=3, help="Nombre de répétitions par étape")
+    parser.add_argument('--seed', type=int, default=0, help="Graine du fournisseur synthétique")
+    parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE, default=None,
+                        help="Enregistre les mesures comme référence")
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, default=None,
+                        help="Compare à une référence ; code de sortie 1 en cas de régression")
+    parser.add_argument('--risk-tickers', type=int, default=1000, help="Univers de la mesure des indicateurs de risque")
+    parser.add_argument('--risk-years', type=int, default=20, help="Profondeur de la mesure des indicateurs de risque (années)")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Dégradation relative tolérée")
+    parser.add_argument('--min-seconds', type=float, default=0.02, help="Écart de latence ignoré en deçà (s)")
+    parser.add_argument('--min-mb', type=float, default=1.0, help="Écart de mémoire ignoré en deçà (Mo)")
+    args = parser.parse_args()
+
+    results = {}
+    try:
+        for n_tickers in args.tickers:
+            for years in args.years:
+                scenario = f"{n_tickers}x{years}a"
+                results[scenario] = run_scenario(n_tickers, years, args.repeat, args.seed)
+                print(f"\n{n_tickers} tickers, {years} an(s)")
+                for stage, m in results[scenario].items():
+                    print(f"  {stage:<30} p50 {m['p50_s']:8.3f}s  p95 {m['p95_s']:8.3f}s  "
+                          f"max {m['max_s']:8.3f}s  pic {m['peak_mb']:8.1f} Mo")
+        scenario = f"risque {args.risk_tickers}x{args.risk_years}a"
+        results[scenario] = run_risk_scenario(args.risk_tickers, args.risk_years, args.repeat, args.seed)
+        m = results[scenario]["risk_metrics"]
+        print(f"\nIndicateurs de risque, {args.risk_tickers} tickers, {args.risk_years} an(s)")
+        print(f"  {'risk_metrics':<30} p50 {m['p50_s']:8.3f}s  p95 {m['p95_s']:8.3f}s  "
+              f"max {m['max_s']:8.3f}s  pic {m['peak_mb']:8.1f} Mo  "
+              f"({'sous' if m['p95_s'] < 1.0 else 'AU-DELÀ de'} l'objectif d'une seconde)")
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        payload = {
+            "meta": {
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "pandas": pd.__version__,
+                "machine": platform.machine(),
+                "repeat": args.repeat,
+                "seed": args.seed
+            },
+            "results": results
+        }
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        print(f"\nRéférence enregistrée : {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance, args.min_seconds, args.min_mb)
+        if regressions:
+            print(f"\n{len(regressions)} régression(s) par rapport à {args.compare} :")
+            for scenario, stage, metric, ref, value in regressions:
+                print(f"  {scenario} {stage} {metric} : {ref:.3f} -> {value:.3f}")
+            sys.exit(1)
+        print(f"\nAucune régression par rapport à {args.compare}")
+
+
+if __name__ == '__main__':
+    main()
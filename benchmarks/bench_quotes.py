@@ -0,0 +1,86 @@
+# bench_quotes.py
+
+# Benchmark du chargement à froid des cotations :
+# boucle historique get_stock_data (1 appel par ticker) vs get_quotes_batch (téléchargements groupés).
+# Les appels réseau sont remplacés par un fournisseur synthétique local qui simule la latence d'un aller-retour.
+#
+# Usage : python -m benchmarks.bench_quotes [--latency 0.05] [--tickers 100] [--repeat 3]
+
+import argparse
+import sys
+import os
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import market_data
+from src.providers import MarketDataProvider, SyntheticProvider, set_provider
+
+
+class LatencyProvider(MarketDataProvider):
+    """Fournisseur local : délègue à un autre fournisseur en simulant la latence d'un aller-retour par requête."""
+
+    def __init__(self, inner, latency):
+        self.inner = inner
+        self.latency = latency
+
+    def get_info(self, ticker):
+        time.sleep(self.latency)
+        return self.inner.get_info(ticker)
+
+    def get_history(self, ticker, start=None, end=None, period=None):
+        time.sleep(self.latency)
+        return self.inner.get_history(ticker, start, end, period)
+
+    def download_closes(self, tickers, period="5d"):
+        # Un seul aller-retour pour tout le lot, comme yf.download
+        time.sleep(self.latency)
+        return self.inner.download_closes(tickers, period)
+
+
+def run_loop(tickers):
+    """Reproduit l'ancien get_all_stock_data de app.py."""
+    return {t: market_data.get_stock_data(t) for t in tickers}
+
+
+def run_batch(tickers):
+    return market_data.get_quotes_batch(tickers)
+
+
+def bench(func, tickers, repeat):
+    timings = []
+    for _ in range(repeat):
+        market_data.clear_caches()
+        t0 = time.perf_counter()
+        func(tickers)
+        timings.append(time.perf_counter() - t0)
+    return min(timings), float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chargement à froid des cotations")
+    parser.add_argument('--latency', type=float, default=0.05, help="Latence simulée par aller-retour (s)")
+    parser.add_argument('--tickers', type=int, default=100, help="Nombre de tickers")
+    parser.add_argument('--repeat', type=int, default=3, help="Nombre de répétitions")
+    args = parser.parse_args()
+
+    tickers = [f"T{i:04d}" for i in range(args.tickers)]
+
+    synthetic = SyntheticProvider(seed=0)
+    # Préchauffage du générateur synthétique : seule la latence simulée est mesurée
+    synthetic.download_closes(tickers)
+    set_provider(LatencyProvider(synthetic, args.latency))
+
+    loop_best, loop_median = bench(run_loop, tickers, args.repeat)
+    batch_best, batch_median = bench(run_batch, tickers, args.repeat)
+
+    print(f"{args.tickers} tickers, latence simulée {args.latency * 1000:.0f} ms")
+    print(f"  boucle get_stock_data : min {loop_best:.3f}s  médiane {loop_median:.3f}s")
+    print(f"  get_quotes_batch      : min {batch_best:.3f}s  médiane {batch_median:.3f}s")
+    print(f"  accélération          : x{loop_median / batch_median:.1f}")
+
+
+if __name__ == '__main__':
+    main()
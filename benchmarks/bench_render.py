@@ -0,0 +1,198 @@
+# bench_render.py
+
+# Benchmark du rendu de app.py sans navigateur (streamlit.testing AppTest), sur le fournisseur
+# synthétique local : durée de la première exécution et des réexécutions, part des chargements
+# de données et de l'affichage, nombre d'éléments et taille des messages envoyés au navigateur.
+# Compare à une référence enregistrée (code de sortie 1 en cas de régression).
+#
+# Usage : python -m benchmarks.bench_render [--reruns 5] [--save-baseline [FICHIER]] [--compare [FICHIER]]
+
+import argparse
+import collections
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+# Données synthétiques, stockages temporaires et mesure par section (src/profiling.py),
+# fixés avant le chargement de la configuration
+WORK_DIR = tempfile.mkdtemp(prefix="komorebi-render-")
+os.environ.setdefault("KOMOREBI_DATA_PROVIDER", "synthetic")
+os.environ.setdefault("KOMOREBI_HISTORY_STORE_DIR", os.path.join(WORK_DIR, "history"))
+os.environ.setdefault("KOMOREBI_ARCHIVE_DIR", os.path.join(WORK_DIR, "archive"))
+os.environ.setdefault("KOMOREBI_SNAPSHOT_DIR", os.path.join(WORK_DIR, "snapshot"))
+os.environ.setdefault("KOMOREBI_MARKET_STORE_PATH", os.path.join(WORK_DIR, "market.db"))
+os.environ.setdefault("KOMOREBI_FETCH_RATE", "0")
+os.environ["KOMOREBI_USE_REFRESHER"] = "0"
+os.environ["KOMOREBI_PROFILING"] = "1"
+
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(ROOT, "app.py")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "render.json")
+
+# Sections de chargement des données (le reste de l'exécution est de l'affichage)
+DATA_PREFIXES = ("data_loader.", "market_data.")
+
+
+def tree_stats(block):
+    """
+    Compte les éléments d'une zone de la page et la taille de leurs messages.
+
+    Returns:
+        tuple: (Counter type -> nombre, Counter type -> octets)
+    """
+    counts, sizes = collections.Counter(), collections.Counter()
+
+    def walk(node):
+        for child in getattr(node, "children", {}).values():
+            counts[child.type] += 1
+            proto = getattr(child, "proto", None)
+            if proto is not None and hasattr(proto, "ByteSize"):
+                sizes[child.type] += proto.ByteSize()
+            walk(child)
+
+    walk(block)
+    return counts, sizes
+
+
+def data_seconds(run):
+    """Durée des chargements de données d'une exécution (sections non imbriquées dans une autre)."""
+    total = 0.0
+    for section in run.sections:
+        parents = section.path.split("/")[:-1]
+        if section.name.startswith(DATA_PREFIXES) and not any(p.startswith(DATA_PREFIXES) for p in parents):
+            total += section.wall_s
+    return total
+
+
+def measure(reruns, timeout):
+    """
+    Exécute app.py puis le réexécute `reruns` fois dans la même session.
+
+    Returns:
+        dict: Durées, éléments et octets émis, détail par section de la dernière exécution
+    """
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    t0 = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - t0
+    if at.exception:
+        raise RuntimeError(f"Exception dans app.py : {at.exception[0].value}")
+
+    timings = []
+    for _ in range(reruns):
+        t0 = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - t0)
+
+    runs = at.session_state["profile_runs"]
+    warm_runs = runs[1:]
+    data = [data_seconds(r) for r in warm_runs]
+    ui = [r.wall_s - d for r, d in zip(warm_runs, data)]
+    main_counts, main_sizes = tree_stats(at.main)
+    sidebar_counts, _ = tree_stats(at.sidebar)
+    steps = {s.name: s.wall_s for s in runs[-1].sections if s.depth == 0}
+
+    return {
+        "cold_s": cold,
+        "cold_data_s": data_seconds(runs[0]),
+        "rerun_p50_s": float(np.percentile(timings, 50)),
+        "rerun_p95_s": float(np.percentile(timings, 95)),
+        "data_p50_s": float(np.percentile(data, 50)),
+        "ui_p50_s": float(np.percentile(ui, 50)),
+        "elements": dict(main_counts),
+        "element_count": sum(main_counts.values()),
+        "sidebar_element_count": sum(sidebar_counts.values()),
+        "payload_bytes": dict(main_sizes),
+        "total_bytes": sum(main_sizes.values()),
+        "steps_s": steps
+    }
+
+
+def compare(result, baseline, tolerance, min_seconds, min_bytes):
+    """
+    Compare les mesures à la référence.
+
+    Returns:
+        list: Régressions (mesure, référence, valeur)
+    """
+    regressions = []
+    for key in ("rerun_p50_s", "ui_p50_s", "data_p50_s"):
+        if key in baseline and result[key] > baseline[key] * (1 + tolerance) and result[key] - baseline[key] > min_seconds:
+            regressions.append((key, baseline[key], result[key]))
+    if "total_bytes" in baseline and result["total_bytes"] > baseline["total_bytes"] * (1 + tolerance) \
+            and result["total_bytes"] - baseline["total_bytes"] > min_bytes:
+        regressions.append(("total_bytes", baseline["total_bytes"], result["total_bytes"]))
+    if "element_count" in baseline and result["element_count"] > baseline["element_count"]:
+        regressions.append(("element_count", baseline["element_count"], result["element_count"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du rendu de app.py (AppTest, données synthétiques)")
+    parser.add_argument('--reruns', type=int, default=5, help="Nombre de réexécutions mesurées")
+    parser.add_argument('--timeout', type=float, default=300, help="Délai maximal d'une exécution (s)")
+    parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE, default=None,
+                        help="Enregistre les mesures comme référence")
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, default=None,
+                        help="Compare à une référence ; code de sortie 1 en cas de régression")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Dégradation relative tolérée")
+    parser.add_argument('--min-seconds', type=float, default=0.05, help="Écart de durée ignoré en deçà (s)")
+    parser.add_argument('--min-bytes', type=int, default=10_000, help="Écart de taille ignoré en deçà (octets)")
+    args = parser.parse_args()
+
+    try:
+        result = measure(args.reruns, args.timeout)
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    print(f"Première exécution : {result['cold_s']:.2f}s (dont données {result['cold_data_s']:.2f}s)")
+    print(f"Réexécutions ({args.reruns}) : p50 {result['rerun_p50_s']:.3f}s  p95 {result['rerun_p95_s']:.3f}s  "
+          f"(données {result['data_p50_s']:.3f}s, affichage {result['ui_p50_s']:.3f}s)")
+    print(f"Éléments : {result['element_count']} ({result['sidebar_element_count']} dans la barre latérale, non comptés)")
+    for kind, n in sorted(result["elements"].items(), key=lambda kv: -result["payload_bytes"].get(kv[0], 0)):
+        print(f"  {kind:<16} {n:4d}  {result['payload_bytes'].get(kind, 0) / 1e3:10.1f} Ko")
+    print(f"Taille totale : {result['total_bytes'] / 1e3:.1f} Ko")
+    print("Sections (dernière exécution) :")
+    for name, seconds in result["steps_s"].items():
+        print(f"  {name:<42} {seconds:.3f}s")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        payload = {
+            "meta": {
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "reruns": args.reruns
+            },
+            "results": result
+        }
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        print(f"\nRéférence enregistrée : {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(result, baseline, args.tolerance, args.min_seconds, args.min_bytes)
+        if regressions:
+            print(f"\n{len(regressions)} régression(s) par rapport à {args.compare} :")
+            for key, ref, value in regressions:
+                print(f"  {key} : {ref:.3f} -> {value:.3f}")
+            sys.exit(1)
+        print(f"\nAucune régression par rapport à {args.compare}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+# backtest_runner.py
+
+# Balayage de paramètres (date d'entrée, durée de détention, rééquilibrage)
+# réparti sur un pool de processus qui partagent la matrice de prix en mémoire partagée.
+
+import argparse
+import concurrent.futures
+import os
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from src.price_matrix import PriceMatrix
+from src.rebalancing import simulate_rebalancing
+
+# Durées de détention usuelles, en jours ouvrés
+HOLDING_PERIODS = {
+    "6 mois": 126,
+    "1 an": 252,
+    "2 ans": 504,
+    "3 ans": 756
+}
+
+# Matrice de prix attachée dans chaque processus de travail
+_worker_prices = None
+_worker_shm = None
+
+def build_scenarios(dates, holding_periods=None, rebalances=(None,), step=1, drift_threshold=None):
+    """
+    Construit la grille de scénarios (indices de début et de fin dans la matrice).
+
+    Args:
+        dates (DatetimeIndex): Dates de la matrice de prix
+        holding_periods (dict, optional): Libellé -> durée en jours ouvrés
+            (None : détention jusqu'à la dernière date, pour chaque date d'entrée)
+        rebalances (tuple): Fréquences de rééquilibrage à tester (None, "monthly", "quarterly", ...)
+        step (int): Pas entre deux dates d'entrée, en jours ouvrés
+        drift_threshold (float, optional): Bande de dérive appliquée à tous les scénarios
+
+    Returns:
+        list: Scénarios (indice début, indice fin, libellé durée, fréquence, seuil de dérive)
+    """
+    last = len(dates) - 1
+    scenarios = []
+    for i0 in range(0, last, step):
+        if holding_periods is None:
+            periods = [("Jusqu'à aujourd'hui", last)]
+        else:
+            periods = [(label, i0 + days) for label, days in holding_periods.items() if i0 + days <= last]
+        for label, i1 in periods:
+            for frequency in rebalances:
+                scenarios.append((i0, i1, label, frequency, drift_threshold))
+    return scenarios
+
+def _attach(name, shape, dtype, dates, tickers):
+    """Initialise un processus de travail : attache la matrice partagée sans la copier."""
+    global _worker_prices, _worker_shm
+    if sys.version_info >= (3, 13):
+        # Le segment appartient au processus principal : pas de suivi dans le processus de travail
+        _worker_shm = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        # Avant 3.13, l'attachement inscrit le segment au resource_tracker. Les processus du pool
+        # partagent celui du processus principal (son descripteur est transmis par toutes les
+        # méthodes de démarrage POSIX) : l'inscription double la sienne, retirée par son unlink().
+        _worker_shm = shared_memory.SharedMemory(name=name)
+    values = np.ndarray(shape, dtype=dtype, buffer=_worker_shm.buf)
+    _worker_prices = PriceMatrix(dates, tickers, values)
+
+def _row(prices, i0, i1, label, frequency, growth, turnover=0.0, costs=0.0):
+    days = i1 - i0
+    return {
+        "start": prices.dates[i0],
+        "end": prices.dates[i1],
+        "holding_period": label,
+        "rebalance": frequency or "none",
+        "return_pct": (growth - 1) * 100,
+        "annualized_pct": (growth ** (252 / days) - 1) * 100 if days > 0 and growth > 0 else np.nan,
+        "turnover_pct": turnover * 100,
+        "costs": costs
+    }
+
+def _run_chunk(chunk, initial_investment, cost_bps, prices=None):
+    """Exécute un lot de scénarios sur la matrice du processus."""
+    prices = prices if prices is not None else _worker_prices
+    rows = []
+
+    # Achat-conservation équipondéré : croissance = moyenne des rapports de prix fin/début,
+    # calculée pour tout le lot en une seule opération
+    hold = [s for s in chunk if s[3] is None and s[4] is None]
+    if hold:
+        i0s = np.array([s[0] for s in hold])
+        i1s = np.array([s[1] for s in hold])
+        base = prices.values[i0s]
+        ratios = np.where(np.nan_to_num(base) > 0, prices.values[i1s] / np.where(base > 0, base, 1.0), np.nan)
+        growths = np.nanmean(ratios, axis=1)
+        rows.extend(_row(prices, s[0], s[1], s[2], None, g) for s, g in zip(hold, growths))
+
+    for i0, i1, label, frequency, drift_threshold in chunk:
+        if frequency is None and drift_threshold is None:
+            continue
+        result = simulate_rebalancing(
+            prices, initial_investment, frequency=frequency, drift_threshold=drift_threshold,
+            cost_bps=cost_bps, start_date=prices.dates[i0], end_date=prices.dates[i1]
+        )
+        growth = result.final_value / initial_investment
+        rows.append(_row(prices, i0, i1, label, frequency, growth, result.total_turnover, result.total_costs))
+    return rows
+
+def run_scenarios(prices, scenarios, initial_investment=1.0, cost_bps=10.0, max_workers=None, chunk_size=64):
+    """
+    Évalue les scénarios en parallèle.
+
+    La matrice de prix est copiée une seule fois dans un segment de mémoire
+    partagée ; chaque processus l'attache à son démarrage et ne reçoit ensuite
+    que des indices de scénarios.
+
+    Args:
+        prices (PriceMatrix): Matrice des clôtures alignées
+        scenarios (list): Scénarios produits par build_scenarios
+        initial_investment (float): Montant initial de chaque scénario
+        cost_bps (float): Coût de transaction en points de base
+        max_workers (int, optional): Nombre de processus (1 : exécution dans le processus courant)
+        chunk_size (int): Nombre de scénarios par tâche
+
+    Returns:
+        DataFrame: Une ligne par scénario
+    """
+    chunks = [scenarios[i:i + chunk_size] for i in range(0, len(scenarios), chunk_size)]
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if max_workers == 1 or len(chunks) <= 1:
+        rows = [row for chunk in chunks for row in _run_chunk(chunk, initial_investment, cost_bps, prices)]
+        return _sorted(rows)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(prices.values.nbytes, 1))
+    try:
+        shared = np.ndarray(prices.values.shape, dtype=prices.values.dtype, buffer=shm.buf)
+        shared[:] = prices.values
+        initargs = (shm.name, prices.values.shape, prices.values.dtype, prices.dates, prices.tickers)
+
+        rows = []
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=_attach, initargs=initargs) as executor:
+            futures = [executor.submit(_run_chunk, chunk, initial_investment, cost_bps) for chunk in chunks]
+            for future in concurrent.futures.as_completed(futures):
+                rows.extend(future.result())
+        del shared
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return _sorted(rows)
+
+def _sorted(rows):
+    """Résultats triés indépendamment de l'ordre d'achèvement des tâches."""
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).sort_values(["start", "holding_period", "rebalance"]).reset_index(drop=True)
+
+def to_heatmap(results, values="return_pct", rebalance="none"):
+    """
+    Met en forme les résultats pour une carte de chaleur (dates d'entrée x durées).
+
+    Args:
+        results (DataFrame): Résultats de run_scenarios
+        values (str): Colonne à afficher
+        rebalance (str): Stratégie de rééquilibrage retenue
+
+    Returns:
+        DataFrame: Tableau croisé date d'entrée x durée de détention
+    """
+    subset = results[results["rebalance"] == rebalance]
+    table = subset.pivot_table(index="start", columns="holding_period", values=values)
+    ordered = [c for c in list(HOLDING_PERIODS) + ["Jusqu'à aujourd'hui"] if c in table.columns]
+    return table[ordered + [c for c in table.columns if c not in ordered]]
+
+def main():
+    """Point d'entrée en ligne de commande : balayage sur le portefeuille 100 valeurs."""
+    from src.market_data import load_portfolio, get_price_matrix
+
+    parser = argparse.ArgumentParser(description="Balayage de backtests sur les dates d'entrée")
+    parser.add_argument("--start", default="2023-01-05", help="Première date de l'historique")
+    parser.add_argument("--step", type=int, default=5, help="Pas entre deux dates d'entrée (jours ouvrés)")
+    parser.add_argument("--rebalance", default="none,monthly,quarterly", help="Fréquences testées, séparées par des virgules")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus")
+    parser.add_argument("--output", default="backtests.csv", help="Fichier CSV des résultats")
+    args = parser.parse_args()
+
+    tickers = load_portfolio()["ticker"].tolist()
+    prices = get_price_matrix(tickers, pd.Timestamp(args.start).to_pydatetime())
+    rebalances = tuple(None if r == "none" else r for r in args.rebalance.split(","))
+
+    scenarios = build_scenarios(prices.dates, HOLDING_PERIODS, rebalances, step=args.step)
+    results = run_scenarios(prices, scenarios, max_workers=args.workers)
+    results.to_csv(args.output, index=False)
+    print(f"{len(results)} scénarios évalués -> {args.output}")
+    print(to_heatmap(results).tail())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# config.py
+
+# Configuration de l'application, surchargeable par variables d'environnement
+
+import os
+
+def _env(name, default):
+    """Lit une variable d'environnement KOMOREBI_* avec une valeur par défaut."""
+    return os.environ.get(f"KOMOREBI_{name}", default)
+
+# Répertoire racine du projet (les chemins relatifs sont résolus depuis ici)
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Fournisseur de données de marché : "yfinance", "replay", "record" ou "synthetic"
+DATA_PROVIDER = _env("DATA_PROVIDER", "yfinance")
+
+# Répertoire des données enregistrées pour le fournisseur "replay" / "record"
+REPLAY_DIR = _env("REPLAY_DIR", os.path.join(PROJECT_ROOT, "data", "replay"))
+
+# Graine du fournisseur synthétique (résultats déterministes)
+SYNTHETIC_SEED = int(_env("SYNTHETIC_SEED", "42"))
+
+# Stockage persistant des historiques OHLCV (un fichier Parquet par ticker)
+HISTORY_STORE_DIR = _env("HISTORY_STORE_DIR", os.path.join(PROJECT_ROOT, "data", "cache", "history"))
+
+# Ordonnanceur de requêtes partagé par les chargeurs (src/fetch_scheduler.py)
+FETCH_MAX_CONCURRENCY = int(_env("FETCH_MAX_CONCURRENCY", "20"))   # requêtes simultanées
+FETCH_RATE = float(_env("FETCH_RATE", "50"))                        # requêtes par seconde (0 : pas de limite)
+FETCH_BURST = int(_env("FETCH_BURST", "100"))                       # capacité du seau à jetons
+FETCH_MAX_RETRIES = int(_env("FETCH_MAX_RETRIES", "3"))             # nouvelles tentatives après un échec
+FETCH_BACKOFF_BASE = float(_env("FETCH_BACKOFF_BASE", "0.5"))       # délai initial de l'attente exponentielle (s)
+FETCH_BACKOFF_MAX = float(_env("FETCH_BACKOFF_MAX", "8"))           # délai maximal entre deux tentatives (s)
+FETCH_TIMEOUT = float(_env("FETCH_TIMEOUT", "15"))                  # délai maximal d'une requête (s)
+
+# Durées de validité du cache des données de marché (secondes) ; au-delà, la valeur
+# périmée est servie pendant son rafraîchissement en arrière-plan (src/tiered_cache.py)
+CACHE_TTL_STATIC = float(_env("CACHE_TTL_STATIC", str(7 * 24 * 3600)))     # nom, secteur, pays, devise
+CACHE_TTL_FUNDAMENTALS = float(_env("CACHE_TTL_FUNDAMENTALS", "3600"))      # capitalisation, PER, rendement
+CACHE_TTL_QUOTES = float(_env("CACHE_TTL_QUOTES", "60"))                    # cours et clôture précédente
+
+# Rafraîchisseur en arrière-plan (python -m src.refresher) : l'application lit le stockage partagé
+USE_REFRESHER = _env("USE_REFRESHER", "0") == "1"
+MARKET_STORE_PATH = _env("MARKET_STORE_PATH", os.path.join(PROJECT_ROOT, "data", "cache", "market.db"))
+REFRESH_INTERVAL = float(_env("REFRESH_INTERVAL", "60"))               # cotations (s)
+REFRESH_SLOW_INTERVAL = float(_env("REFRESH_SLOW_INTERVAL", "900"))    # historiques et fondamentaux (s)
+STORE_MAX_AGE = float(_env("STORE_MAX_AGE", "3600"))                   # au-delà, donnée ignorée et retéléchargée (s)
+
+# Durée de validité des historiques conservés en mémoire (s)
+HISTORY_CACHE_TTL = float(_env("HISTORY_CACHE_TTL", "60"))
+
+# Instantané de la matrice de prix partagé entre sessions (fichiers projetés en mémoire)
+SNAPSHOT_DIR = _env("SNAPSHOT_DIR", os.path.join(PROJECT_ROOT, "data", "cache", "snapshot"))
+SNAPSHOT_TTL = float(_env("SNAPSHOT_TTL", "60"))                       # âge maximal avant reconstruction (s)
+
+# Archive OHLCV projetée en mémoire (un fichier par champ, dates x tickers)
+ARCHIVE_DIR = _env("ARCHIVE_DIR", os.path.join(PROJECT_ROOT, "data", "cache", "archive"))
+
+# Rendu progressif de la page : graphiques affichés dès les premiers historiques chargés
+STREAMING_RENDER = _env("STREAMING_RENDER", "1") == "1"
+
+# Journal des récupérations (source, latence, tentatives, ancienneté par ticker)
+FETCH_LEDGER_SIZE = int(_env("FETCH_LEDGER_SIZE", "5000"))             # enregistrements conservés
+DIAGNOSTICS = _env("DIAGNOSTICS", "0") == "1"                          # panneau de diagnostic dans la page
+# Données simulées à la place d'une action introuvable (sinon la valeur est signalée absente)
+SYNTHETIC_FALLBACK = _env("SYNTHETIC_FALLBACK", "0") == "1"
+
+# Mesure des exécutions de l'application (src/profiling.py)
+PROFILING = _env("PROFILING", "0") == "1"                              # panneau des durées dans la barre latérale
+PROFILE_LOG = _env("PROFILE_LOG", "")                                  # fichier JSON Lines des exécutions (vide : aucun)
+
+# Taux sans risque annuel des ratios de Sharpe et de Sortino (src/risk.py)
+RISK_FREE_RATE = float(_env("RISK_FREE_RATE", "0.0"))
@@ -0,0 +1,252 @@
+# covariance.py
+
+# Matrices de covariance et de corrélation des rendements quotidiens sur une fenêtre glissante,
+# avec rétrécissement de Ledoit-Wolf vers une cible diagonale. Les statistiques suffisantes
+# (sommes, produits croisés, moments d'ordre 4) sont mises à jour par ajouts et retraits de rang 1
+# à chaque nouvelle séance ; les matrices sont conservées en triangle supérieur compact.
+
+import collections
+
+import numpy as np
+import pandas as pd
+
+from src.risk import TRADING_DAYS
+
+def _triangle(p):
+    """Indices du triangle supérieur (diagonale comprise) d'une matrice p x p."""
+    return np.triu_indices(p)
+
+class SymmetricMatrix:
+    """
+    Matrice symétrique conservée en triangle supérieur compact (p(p+1)/2 valeurs).
+
+    Args:
+        labels (list): Libellés des lignes et des colonnes
+        packed (ndarray): Triangle supérieur, ligne par ligne (np.triu_indices)
+    """
+
+    def __init__(self, labels, packed):
+        self.labels = list(labels)
+        self.packed = packed
+
+    @classmethod
+    def from_array(cls, labels, array):
+        return cls(labels, np.ascontiguousarray(array[_triangle(len(labels))]))
+
+    @property
+    def nbytes(self):
+        return self.packed.nbytes
+
+    def to_array(self):
+        """Renvoie la matrice complète (p x p)."""
+        p = len(self.labels)
+        full = np.empty((p, p))
+        rows, cols = _triangle(p)
+        full[rows, cols] = self.packed
+        full[cols, rows] = self.packed
+        return full
+
+    def to_frame(self, order=None):
+        """
+        Renvoie la matrice complète sous forme de DataFrame.
+
+        Args:
+            order (ndarray, optional): Permutation des lignes et des colonnes (voir cluster_order)
+        """
+        full = self.to_array()
+        labels = np.asarray(self.labels, dtype=object)
+        if order is not None:
+            full = full[np.ix_(order, order)]
+            labels = labels[order]
+        return pd.DataFrame(full, index=labels, columns=labels)
+
+class CovarianceModel:
+    """
+    Covariance des rendements quotidiens sur les `window` dernières séances.
+    Un rendement manquant (avant la première cotation) compte comme un rendement nul.
+
+    Args:
+        tickers (list): Tickers (colonnes)
+        dates (DatetimeIndex): Dates des rendements de la fenêtre
+        returns (ndarray): Rendements (dates x tickers)
+        last_prices (ndarray): Derniers prix (rendement de la séance suivante)
+        window (int): Durée de la fenêtre (séances)
+    """
+
+    def __init__(self, tickers, dates, returns, last_prices, window):
+        self.tickers = list(tickers)
+        self.window = window
+        self.last_prices = np.asarray(last_prices, dtype=np.float64)
+        returns = np.nan_to_num(np.asarray(returns, dtype=np.float64), nan=0.0, posinf=0.0, neginf=0.0)
+        self._rows = collections.deque(returns, maxlen=window)
+        self.dates = collections.deque(pd.DatetimeIndex(dates), maxlen=window)
+
+        # Statistiques suffisantes : produits croisés (produit matriciel BLAS, triangle compact),
+        # sommes, normes au carré et moments d'ordre 4 des lignes
+        norms = np.einsum('ij,ij->i', returns, returns)
+        self._cross = (returns.T @ returns)[_triangle(len(self.tickers))]
+        self._sum = returns.sum(axis=0)
+        self._weighted = returns.T @ norms
+        self._norm2 = float(norms.sum())
+        self._norm4 = float(norms @ norms)
+
+    @classmethod
+    def from_prices(cls, prices, window=TRADING_DAYS):
+        """
+        Construit le modèle sur les `window` derniers rendements d'une matrice de clôtures.
+
+        Args:
+            prices (PriceMatrix): Matrice des clôtures alignées
+            window (int): Durée de la fenêtre (séances)
+        """
+        values = prices.values[-window - 1:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = values[1:] / values[:-1] - 1
+        return cls(prices.tickers, prices.dates[-len(returns):], returns, values[-1], window)
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def end(self):
+        return self.dates[-1] if self.dates else None
+
+    def _update(self, row, sign):
+        norm = float(row @ row)
+        rows, cols = _triangle(len(self.tickers))
+        self._cross += sign * row[rows] * row[cols]
+        self._sum += sign * row
+        self._weighted += sign * norm * row
+        self._norm2 += sign * norm
+        self._norm4 += sign * norm * norm
+
+    def copy(self):
+        clone = object.__new__(CovarianceModel)
+        clone.__dict__.update(self.__dict__)
+        clone._rows = collections.deque(self._rows, maxlen=self.window)
+        clone.dates = collections.deque(self.dates, maxlen=self.window)
+        for name in ("_cross", "_sum", "_weighted", "last_prices"):
+            setattr(clone, name, getattr(self, name).copy())
+        return clone
+
+    def append(self, date, prices):
+        """
+        Ajoute une séance : ajout du rendement entrant et retrait du sortant (rang 1, O(tickers²)).
+
+        Args:
+            date (Timestamp): Date de la séance
+            prices (ndarray): Clôture de chaque ticker
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            row = np.nan_to_num(prices / self.last_prices - 1, nan=0.0, posinf=0.0, neginf=0.0)
+        if len(self._rows) == self.window:
+            self._update(self._rows[0], -1.0)
+        self._update(row, 1.0)
+        self._rows.append(row)
+        self.dates.append(pd.Timestamp(date))
+        self.last_prices = np.where(np.isfinite(prices), prices, self.last_prices)
+
+    def _moments(self):
+        """Covariance empirique (1/n) compacte et termes du rétrécissement de Ledoit-Wolf."""
+        n = len(self._rows)
+        p = len(self.tickers)
+        rows, cols = _triangle(p)
+        mean = self._sum / n
+        sample = self._cross / n - mean[rows] * mean[cols]
+
+        # Somme des normes^4 des rendements centrés, développée sur les statistiques suffisantes
+        m2 = float(mean @ mean)
+        off = np.where(rows == cols, 1.0, 2.0)
+        mgm = float((off * self._cross) @ (mean[rows] * mean[cols]))
+        centered4 = (self._norm4 + 4 * mgm + n * m2 * m2 - 4 * float(mean @ self._weighted)
+                     + 2 * m2 * self._norm2 - 4 * m2 * float(self._sum @ mean))
+        return sample, off, centered4, n, p, rows == cols
+
+    def covariance(self, shrink=True, annualize=False):
+        """
+        Matrice de covariance, rétrécie selon Ledoit-Wolf (2004) vers mu * I.
+
+        Args:
+            shrink (bool): Applique le rétrécissement
+            annualize (bool): Covariance annualisée (x TRADING_DAYS)
+
+        Returns:
+            SymmetricMatrix: Covariance (tickers x tickers)
+        """
+        sample, off, centered4, n, p, diagonal = self._moments()
+        packed = sample
+        if shrink:
+            delta = self._shrinkage(sample, off, centered4, n, p, diagonal)
+            mu = sample[diagonal].sum() / p
+            packed = (1 - delta) * sample
+            packed[diagonal] += delta * mu
+        if annualize:
+            packed = packed * TRADING_DAYS
+        return SymmetricMatrix(self.tickers, packed)
+
+    @staticmethod
+    def _shrinkage(sample, off, centered4, n, p, diagonal):
+        mu = sample[diagonal].sum() / p
+        frob = float(off @ (sample * sample))
+        d2 = (frob - 2 * mu * sample[diagonal].sum() + p * mu * mu) / p
+        b2 = (centered4 - n * frob) / (n * n) / p
+        return float(min(max(b2, 0.0), d2) / d2) if d2 > 0 else 0.0
+
+    @property
+    def shrinkage(self):
+        """Intensité du rétrécissement de Ledoit-Wolf (0 : covariance empirique, 1 : cible)."""
+        if len(self) < 2:
+            return 0.0
+        sample, off, centered4, n, p, diagonal = self._moments()
+        return self._shrinkage(sample, off, centered4, n, p, diagonal)
+
+    def correlation(self, shrink=True):
+        """
+        Matrice de corrélation déduite de la covariance (rétrécie par défaut).
+
+        Returns:
+            SymmetricMatrix: Corrélations (NaN pour un ticker sans variation)
+        """
+        cov = self.covariance(shrink)
+        p = len(self.tickers)
+        rows, cols = _triangle(p)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std = np.sqrt(cov.packed[rows == cols])
+            packed = cov.packed / (std[rows] * std[cols])
+        return SymmetricMatrix(self.tickers, np.clip(packed, -1.0, 1.0))
+
+def _fiedler(affinity):
+    """Vecteur de Fiedler du laplacien normalisé d'un graphe d'affinité."""
+    scale = 1 / np.sqrt(affinity.sum(axis=1))
+    laplacian = np.eye(len(affinity)) - scale[:, None] * affinity * scale[None, :]
+    _, vectors = np.linalg.eigh(laplacian)
+    return vectors[:, 1] * scale
+
+def cluster_order(correlation, min_size=4):
+    """
+    Ordre des tickers qui regroupe les valeurs corrélées (sériation spectrale) : bissections
+    récursives selon le signe du vecteur de Fiedler du graphe d'affinité (1 + corrélation) / 2,
+    chaque groupe étant trié selon ce vecteur.
+
+    Args:
+        correlation (SymmetricMatrix or ndarray): Matrice de corrélation
+        min_size (int): Taille en deçà de laquelle un groupe n'est plus divisé
+
+    Returns:
+        ndarray: Permutation des indices
+    """
+    corr = correlation.to_array() if isinstance(correlation, SymmetricMatrix) else np.asarray(correlation)
+    affinity = (1 + np.nan_to_num(corr)) / 2
+
+    def order(indices):
+        if len(indices) < max(min_size, 3):
+            return indices
+        fiedler = _fiedler(affinity[np.ix_(indices, indices)])
+        indices = indices[np.argsort(fiedler, kind='stable')]
+        split = int((np.sort(fiedler) < 0).sum())
+        if split in (0, len(indices)):
+            return indices
+        return np.concatenate([order(indices[:split]), order(indices[split:])])
+
+    return order(np.arange(len(corr)))
@@ -0,0 +1,159 @@
+# fetch_ledger.py
+
+# Journal des récupérations de données de marché : pour chaque ticker chargé, la source
+# (téléchargement, stockage, cache, repli simulé), la latence, le nombre de nouvelles
+# tentatives et l'ancienneté de la donnée servie.
+
+import collections
+import contextvars
+import functools
+import inspect
+import threading
+import time
+
+import pandas as pd
+
+from src import config
+
+# Sources possibles d'une donnée
+SOURCES = (
+    "live",       # téléchargée auprès du fournisseur
+    "store",      # lue dans le stockage du rafraîchisseur
+    "cache",      # servie par le cache en mémoire, à jour
+    "stale",      # servie périmée par le cache, rafraîchie en arrière-plan
+    "fallback",   # remplacée par des données simulées
+    "error"       # indisponible
+)
+
+# Fonction de chargement en cours (la plus externe) dans le thread ou le contexte courant
+_function = contextvars.ContextVar("fetch_function", default=None)
+
+def traced(name):
+    """
+    Décorateur : les enregistrements faits pendant l'appel sont attribués à `name`,
+    sauf s'ils le sont déjà à une fonction appelante. Les générateurs sont pris en charge
+    (attribution pendant chaque reprise, pas entre deux éléments produits).
+
+    Args:
+        name (str): Nom de la fonction de chargement
+    """
+    def decorator(fn):
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def gen_wrapper(*args, **kwargs):
+                gen = fn(*args, **kwargs)
+                while True:
+                    token = _function.set(_function.get() or name)
+                    try:
+                        item = next(gen)
+                    except StopIteration:
+                        return
+                    finally:
+                        _function.reset(token)
+                    yield item
+            return gen_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            token = _function.set(_function.get() or name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _function.reset(token)
+        return wrapper
+    return decorator
+
+class FetchLedger:
+    """
+    Journal borné des récupérations, partagé entre threads.
+
+    Les enregistrements faits hors de toute fonction de chargement (rafraîchissements
+    en arrière-plan, rafraîchisseur) sont attribués à "arrière-plan".
+    """
+
+    COLUMNS = ["Horodatage", "Fonction", "Donnée", "Ticker", "Source",
+               "Latence (s)", "Tentatives", "Ancienneté (s)", "Erreur"]
+
+    def __init__(self, maxlen=None):
+        self._records = collections.deque(maxlen=maxlen or config.FETCH_LEDGER_SIZE)
+        self._lock = threading.Lock()
+
+    def record(self, kind, ticker, source, latency=0.0, retries=0, staleness=None, error=None):
+        """
+        Enregistre la récupération d'une donnée.
+
+        Args:
+            kind (str): Nature de la donnée ("fundamentals", "quotes", "history", "stock_data")
+            ticker (str): Symbole de l'action
+            source (str): Source de la donnée (voir SOURCES)
+            latency (float): Durée de la récupération (secondes)
+            retries (int): Nouvelles tentatives
+            staleness (float, optional): Ancienneté de la donnée servie (secondes)
+            error (Exception, optional): Erreur de récupération
+        """
+        entry = (time.time(), _function.get() or "arrière-plan", kind, ticker, source,
+                 latency, retries, staleness, None if error is None else f"{type(error).__name__}: {error}")
+        with self._lock:
+            self._records.append(entry)
+
+    def record_many(self, kind, tickers, source, latency=0.0, retries=0, staleness=None, error=None):
+        """Enregistre une même récupération pour plusieurs tickers (téléchargement groupé)."""
+        for ticker in tickers:
+            self.record(kind, ticker, source, latency, retries, staleness, error)
+
+    def to_frame(self):
+        """
+        Renvoie le journal.
+
+        Returns:
+            DataFrame: Un enregistrement par ligne (colonnes COLUMNS), du plus ancien au plus récent
+        """
+        with self._lock:
+            records = list(self._records)
+        df = pd.DataFrame(records, columns=self.COLUMNS)
+        df["Horodatage"] = pd.to_datetime(df["Horodatage"], unit="s")
+        return df
+
+    def summary(self):
+        """
+        Synthèse par ticker, triée par temps de récupération cumulé décroissant :
+        les tickers lents ou en échec qui dominent la durée des rafraîchissements.
+
+        Returns:
+            DataFrame: Appels, latence cumulée et maximale, tentatives, replis, erreurs,
+                part servie par un cache et ancienneté maximale, indexés par ticker
+        """
+        df = self.to_frame()
+        if df.empty:
+            return pd.DataFrame(columns=["Appels", "Latence totale (s)", "Latence max (s)", "Tentatives",
+                                         "Replis", "Erreurs", "Cache (%)", "Ancienneté max (s)"])
+        source = df["Source"]
+        summary = df.assign(
+            fallback=source.eq("fallback"),
+            error=source.eq("error"),
+            cached=source.isin(["cache", "stale", "store"])
+        ).groupby("Ticker").agg(**{
+            "Appels": ("Source", "size"),
+            "Latence totale (s)": ("Latence (s)", "sum"),
+            "Latence max (s)": ("Latence (s)", "max"),
+            "Tentatives": ("Tentatives", "sum"),
+            "Replis": ("fallback", "sum"),
+            "Erreurs": ("error", "sum"),
+            "Cache (%)": ("cached", "mean"),
+            "Ancienneté max (s)": ("Ancienneté (s)", "max")
+        })
+        summary["Cache (%)"] *= 100
+        return summary.sort_values("Latence totale (s)", ascending=False)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+_ledger = None
+
+def get_fetch_ledger():
+    """Renvoie le journal des récupérations partagé par le processus."""
+    global _ledger
+    if _ledger is None:
+        _ledger = FetchLedger()
+    return _ledger
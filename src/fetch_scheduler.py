@@ -0,0 +1,283 @@
+# fetch_scheduler.py
+
+# Ordonnanceur asynchrone des requêtes de données de marché, partagé par tous les chargeurs :
+# concurrence bornée, limitation de débit (seau à jetons), attente exponentielle avec gigue,
+# délai maximal par requête et métriques de débit / d'erreurs.
+
+import asyncio
+import collections
+import concurrent.futures
+import queue
+import random
+import threading
+import time
+
+from src import config
+
+# Erreurs définitives : inutile de réessayer (donnée absente du fournisseur)
+NON_RETRYABLE = (KeyError, NotImplementedError)
+
+# Threads des tâches de fond (rafraîchissements de cache), qui attendent elles-mêmes des requêtes
+BACKGROUND_WORKERS = 2
+
+class TokenBucket:
+    """
+    Seau à jetons partagé entre threads : `rate` jetons par seconde, au plus `capacity` en réserve.
+    Les jetons peuvent être réservés à découvert ; l'appelant attend alors le délai renvoyé.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Réserve un jeton et renvoie le délai d'attente nécessaire (en secondes)."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+class FetchMetrics:
+    """Compteurs de l'ordonnanceur (débit, erreurs, latences), partagés entre threads."""
+
+    def __init__(self, window=1000):
+        self._lock = threading.Lock()
+        self._latencies = collections.deque(maxlen=window)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.monotonic()
+            self.requests = 0
+            self.successes = 0
+            self.failures = 0
+            self.retries = 0
+            self.timeouts = 0
+            self.throttle_wait = 0.0
+            self._latencies.clear()
+
+    def record_attempt(self, latency, timed_out=False):
+        with self._lock:
+            self.requests += 1
+            self._latencies.append(latency)
+            if timed_out:
+                self.timeouts += 1
+
+    def record_result(self, ok, retries):
+        with self._lock:
+            if ok:
+                self.successes += 1
+            else:
+                self.failures += 1
+            self.retries += retries
+
+    def record_throttle(self, delay):
+        with self._lock:
+            self.throttle_wait += delay
+
+    def snapshot(self):
+        """
+        Renvoie l'état des compteurs.
+
+        Returns:
+            dict: Requêtes, succès, échecs, tentatives, débit (req/s), taux d'erreur et latences
+        """
+        with self._lock:
+            elapsed = max(time.monotonic() - self.started, 1e-9)
+            latencies = sorted(self._latencies)
+            done = self.successes + self.failures
+
+            def pct(q):
+                return latencies[min(int(q * len(latencies)), len(latencies) - 1)] if latencies else 0.0
+
+            return {
+                "requests": self.requests,
+                "successes": self.successes,
+                "failures": self.failures,
+                "retries": self.retries,
+                "timeouts": self.timeouts,
+                "throughput_rps": self.requests / elapsed,
+                "error_rate": self.failures / done if done else 0.0,
+                "latency_p50_s": pct(0.50),
+                "latency_p95_s": pct(0.95),
+                "throttle_wait_s": self.throttle_wait
+            }
+
+class FetchScheduler:
+    """
+    Exécute des fonctions de récupération bloquantes (appels au fournisseur de données)
+    sur une boucle asyncio dédiée, partagée par tous les appels du processus, avec
+    concurrence bornée, limitation de débit, nouvelles tentatives et délai maximal.
+
+    La limite de concurrence vaut pour le processus entier (chargements en flux,
+    rafraîchissements en arrière-plan, cotations, fondamentaux). Une requête dont le délai
+    est dépassé est abandonnée, mais son thread ne peut être interrompu : sa place n'est
+    libérée qu'à la fin effective de l'appel bloquant.
+    """
+
+    def __init__(self, max_concurrency=None, rate=None, burst=None, max_retries=None,
+                 backoff_base=None, backoff_max=None, timeout=None):
+        self.max_concurrency = max_concurrency or config.FETCH_MAX_CONCURRENCY
+        self.max_retries = config.FETCH_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = config.FETCH_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = config.FETCH_BACKOFF_MAX if backoff_max is None else backoff_max
+        self.timeout = config.FETCH_TIMEOUT if timeout is None else timeout
+        self.bucket = TokenBucket(
+            config.FETCH_RATE if rate is None else rate,
+            config.FETCH_BURST if burst is None else burst
+        )
+        self.metrics = FetchMetrics()
+        # Boucle, places de concurrence et threads partagés, créés au premier appel
+        self._loop = None
+        self._semaphore = None
+        self._executor = None
+        self._background = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_loop(self):
+        """Démarre (une fois) la boucle asyncio du processus dans un thread dédié."""
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                    ready.set()
+                    loop.run_forever()
+
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix="fetch"
+                )
+                # Pool distinct : une tâche de fond qui occupe une place de requête et attend
+                # d'autres requêtes pourrait bloquer le pool
+                self._background = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=BACKGROUND_WORKERS, thread_name_prefix="fetch-background"
+                )
+                threading.Thread(target=run, name="fetch-scheduler", daemon=True).start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    def submit(self, fn, *args):
+        """
+        Exécute fn(*args) en arrière-plan sur les threads de fond de l'ordonnanceur.
+        Les requêtes lancées par fn passent par l'ordonnanceur comme les autres.
+
+        Returns:
+            concurrent.futures.Future: Résultat de l'appel
+        """
+        self._ensure_loop()
+        return self._background.submit(fn, *args)
+
+    def _backoff(self, attempt):
+        """Attente exponentielle avec gigue complète."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _release(self, future):
+        """Rend la place d'un appel terminé (l'erreur d'un appel abandonné est ignorée)."""
+        self._semaphore.release()
+        if not future.cancelled():
+            future.exception()
+
+    async def _call(self, fn, item):
+        """Renvoie (résultat, erreur, durée totale en secondes, nouvelles tentatives)."""
+        loop = asyncio.get_running_loop()
+        error = None
+        started = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            delay = self.bucket.reserve()
+            if delay:
+                self.metrics.record_throttle(delay)
+                await asyncio.sleep(delay)
+
+            # La place est rendue à la fin de l'appel bloquant, même abandonné après le délai
+            await self._semaphore.acquire()
+            t0 = time.perf_counter()
+            future = loop.run_in_executor(self._executor, fn, item)
+            future.add_done_callback(self._release)
+            try:
+                result = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+                self.metrics.record_attempt(time.perf_counter() - t0)
+                self.metrics.record_result(True, attempt)
+                return result, None, time.perf_counter() - started, attempt
+            except Exception as e:
+                error = e
+                timed_out = isinstance(e, asyncio.TimeoutError)
+                self.metrics.record_attempt(time.perf_counter() - t0, timed_out)
+
+            if isinstance(error, NON_RETRYABLE) or attempt == self.max_retries:
+                self.metrics.record_result(False, attempt)
+                return None, error, time.perf_counter() - started, attempt
+            await asyncio.sleep(self._backoff(attempt))
+
+    def iter_completed(self, fn, items, trace=False):
+        """
+        Exécute fn(item) pour chaque élément et produit les résultats dans l'ordre d'achèvement.
+
+        Args:
+            fn (callable): Fonction bloquante appliquée à chaque élément
+            items (iterable): Éléments à traiter (tickers, lots de tickers, ...)
+            trace (bool): Ajoute à chaque résultat le couple (durée totale en secondes,
+                nouvelles tentatives), attentes comprises
+
+        Yields:
+            tuple: (indice, élément, résultat, erreur[, trace]) ; résultat vaut None en cas d'erreur
+        """
+        items = list(items)
+        if not items:
+            return
+        loop = self._ensure_loop()
+        results = queue.Queue()
+
+        async def one(index, item):
+            try:
+                result, error, elapsed, retries = await self._call(fn, item)
+            except Exception as e:
+                result, error, elapsed, retries = None, e, 0.0, 0
+            results.put((index, item, result, error, (elapsed, retries)))
+
+        tasks = [asyncio.run_coroutine_threadsafe(one(i, item), loop) for i, item in enumerate(items)]
+        try:
+            for _ in range(len(items)):
+                entry = results.get()
+                yield entry if trace else entry[:4]
+        finally:
+            # Consommateur interrompu : les requêtes pas encore lancées sont annulées
+            for task in tasks:
+                task.cancel()
+
+    def map(self, fn, items, trace=False):
+        """
+        Exécute fn(item) pour chaque élément et renvoie les résultats dans l'ordre des éléments.
+
+        Returns:
+            list: Couples (résultat, erreur), un par élément ; triplets
+                (résultat, erreur, (durée, nouvelles tentatives)) si `trace`
+        """
+        items = list(items)
+        out = [(None, None)] * len(items)
+        for index, _, result, error, stats in self.iter_completed(fn, items, trace=True):
+            out[index] = (result, error, stats) if trace else (result, error)
+        return out
+
+_scheduler = None
+
+def get_scheduler():
+    """Renvoie l'ordonnanceur partagé par tous les chargeurs du processus."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = FetchScheduler()
+    return _scheduler
+
+def get_fetch_metrics():
+    """Renvoie les métriques de l'ordonnanceur partagé (voir FetchMetrics.snapshot)."""
+    return get_scheduler().metrics.snapshot()
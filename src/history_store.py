@@ -0,0 +1,221 @@
+# history_store.py
+
+# Stockage persistant des historiques OHLCV (un fichier Parquet par ticker)
+# avec mise à jour incrémentale : seules les séances manquantes sont téléchargées.
+
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src import config
+
+class HistoryStore:
+    """
+    Stockage local des historiques, persistant entre les redémarrages.
+
+    Arborescence :
+        <directory>/<TICKER>.parquet     historique OHLCV
+        <directory>/<TICKER>.meta.json   date de début couverte et date de mise à jour
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or config.HISTORY_STORE_DIR
+        os.makedirs(self.directory, exist_ok=True)
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def _path(self, ticker, ext):
+        return os.path.join(self.directory, f"{ticker}.{ext}")
+
+    def _lock(self, ticker):
+        """Verrou d'un ticker : une seule mise à jour à la fois dans le processus."""
+        with self._locks_lock:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def _write_atomic(self, path, write):
+        """
+        Écrit dans un fichier temporaire propre à l'écrivain puis le renomme : pas de fichier
+        partiel en cas d'arrêt, ni de fichier temporaire partagé entre écrivains concurrents
+        (sessions, rafraîchissement en arrière-plan, processus du rafraîchisseur).
+        """
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def load(self, ticker):
+        """
+        Charge l'historique stocké d'un ticker.
+
+        Args:
+            ticker (str): Symbole de l'action
+
+        Returns:
+            DataFrame: Historique stocké (None si absent ou illisible)
+        """
+        path = self._path(ticker, "parquet")
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except Exception:
+            return None
+
+    def load_meta(self, ticker):
+        """Renvoie les métadonnées du ticker ({} si absentes)."""
+        path = self._path(ticker, "meta.json")
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def save(self, ticker, hist, covered_start):
+        """
+        Enregistre l'historique complet d'un ticker.
+
+        Args:
+            ticker (str): Symbole de l'action
+            hist (DataFrame): Historique OHLCV (index de dates sans fuseau horaire)
+            covered_start (Timestamp): Date de début effectivement demandée à la source
+        """
+        self._write_atomic(self._path(ticker, "parquet"), hist.to_parquet)
+        meta = {
+            "start": pd.Timestamp(covered_start).isoformat(),
+            "updated": datetime.now().isoformat()
+        }
+
+        def write_meta(tmp):
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+        self._write_atomic(self._path(ticker, "meta.json"), write_meta)
+
+    def read(self, ticker, start_date, end_date=None, max_age=None):
+        """
+        Lit la fenêtre demandée sans rien télécharger.
+
+        Args:
+            ticker (str): Symbole de l'action
+            start_date (datetime): Date de début de la fenêtre
+            end_date (datetime, optional): Date de fin (exclue)
+            max_age (float, optional): Ancienneté maximale de la dernière mise à jour (secondes)
+
+        Returns:
+            DataFrame: Historique sur [start_date, end_date) (None si non couvert ou trop ancien)
+        """
+        meta = self.load_meta(ticker)
+        start = pd.Timestamp(start_date).normalize()
+        if "start" not in meta or start < pd.Timestamp(meta["start"]):
+            return None
+        if max_age is not None and (datetime.now() - datetime.fromisoformat(meta["updated"])).total_seconds() > max_age:
+            return None
+        stored = self.load(ticker)
+        if stored is None:
+            return None
+        window = stored[stored.index >= start]
+        if end_date is not None:
+            window = window[window.index < pd.Timestamp(end_date)]
+        return window
+
+    @staticmethod
+    def _adjusted_since(stored, tail):
+        """
+        Indique si les prix stockés ne sont plus ajustés comme ceux de la queue téléchargée
+        (historiques ajustés des divisions et dividendes) : division ou dividende nouveau
+        dans la queue, ou ouverture de la séance commune différente (l'ouverture ne change
+        plus en cours de séance, contrairement aux autres champs de la dernière séance).
+        """
+        last = stored.index[-1]
+        events = [c for c in ("Dividends", "Stock Splits") if c in tail.columns]
+        if events:
+            new_events = tail.loc[tail.index > last, events].fillna(0).to_numpy()
+            if (new_events != 0).any():
+                return True
+            if last in tail.index and all(c in stored.columns for c in events):
+                before = stored.loc[last, events].fillna(0).to_numpy(dtype=np.float64)
+                after = tail.loc[[last], events].iloc[-1].fillna(0).to_numpy(dtype=np.float64)
+                if not np.array_equal(before, after):
+                    return True
+        if "Open" in tail.columns and last in tail.index:
+            before = float(stored.loc[last, "Open"])
+            after = float(tail.loc[[last], "Open"].iloc[-1])
+            if not np.isclose(before, after, rtol=1e-6, equal_nan=True):
+                return True
+        return False
+
+    def update(self, ticker, provider, start_date, end_date=None):
+        """
+        Complète l'historique stocké puis renvoie la fenêtre demandée.
+
+        Seules les séances manquantes sont téléchargées : la queue depuis la dernière
+        date stockée (incluse, la dernière séance pouvant être partielle) si elle
+        précède la fin de la fenêtre et, si la fenêtre demandée commence plus tôt
+        que la couverture, le début manquant. Si la queue révèle un nouvel ajustement
+        (division, dividende), tout l'historique couvert est téléchargé de nouveau.
+
+        Args:
+            ticker (str): Symbole de l'action
+            provider (MarketDataProvider): Source des données manquantes
+            start_date (datetime): Date de début de la fenêtre
+            end_date (datetime, optional): Date de fin (exclue)
+
+        Returns:
+            DataFrame: Historique sur [start_date, end_date)
+        """
+        start = pd.Timestamp(start_date).normalize()
+        with self._lock(ticker):
+            stored = self.load(ticker)
+
+            if stored is None or stored.empty:
+                merged = provider.get_history(ticker, start=start, end=end_date)
+                covered_start = start
+            else:
+                covered_start = pd.Timestamp(self.load_meta(ticker).get("start", stored.index[0]))
+                parts = []
+                if start < covered_start:
+                    head = provider.get_history(ticker, start=start, end=covered_start)
+                    parts.append(head)
+                    covered_start = start
+                parts.append(stored)
+                # Queue inutile si le stockage couvre déjà la fin de la fenêtre (exclue)
+                if end_date is None or pd.Timestamp(end_date) > stored.index[-1]:
+                    tail = provider.get_history(ticker, start=stored.index[-1], end=end_date)
+                    full = None
+                    if not tail.empty and self._adjusted_since(stored, tail):
+                        # Prix stockés ajustés autrement : historique couvert téléchargé de nouveau
+                        full = provider.get_history(ticker, start=covered_start, end=end_date)
+                    parts = [full] if full is not None and not full.empty else parts + [tail]
+
+                parts = [p for p in parts if not p.empty]
+                merged = pd.concat(parts) if parts else stored.iloc[:0]
+                merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+
+            if not merged.empty:
+                self.save(ticker, merged, covered_start)
+
+        window = merged[merged.index >= start]
+        if end_date is not None:
+            window = window[window.index < pd.Timestamp(end_date)]
+        return window
+
+_store = None
+
+def get_history_store():
+    """Renvoie le stockage d'historiques partagé par le processus."""
+    global _store
+    if _store is None:
+        _store = HistoryStore()
+    return _store
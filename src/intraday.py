@@ -0,0 +1,143 @@
+# intraday.py
+
+# Mise à jour incrémentale des séries du portefeuille (base 100 et valeur) :
+# entre deux nouvelles séances, seul le dernier point est recalculé à partir des cotations.
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.portfolio_engine import PortfolioEngine
+from src.profiling import profiled
+
+class IncrementalPortfolioSeries:
+    """
+    Séries du portefeuille équipondéré conservées d'un rafraîchissement à l'autre.
+
+    Le calcul complet (O(tickers x jours)) n'est refait que lorsque l'historique
+    gagne une séance ou que l'univers change ; sinon le point du jour est
+    recalculé à partir des dernières cotations (O(tickers)). Les séries sont conservées
+    dans des tableaux préalloués et exposées en vues en lecture seule, sans copie.
+    """
+
+    # Points du jour ajoutés au-delà de l'historique avant réallocation
+    SPARE_POINTS = 8
+
+    def __init__(self, start_date, initial_investment):
+        self.start_date = start_date
+        self.initial_investment = initial_investment
+        self._perf = np.empty(0)
+        self._value = np.empty(0)
+        self._size = 0
+        self._index = pd.DatetimeIndex([])
+        self.full_rebuilds = 0
+        self.incremental_updates = 0
+        self._tickers = None
+        self._history_end = None
+        self._history_len = 0
+        self._base = None
+        self._shares = None
+        self._valid = None
+        self._last_prices = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _view(data, size, index):
+        view = data[:size]
+        view.flags.writeable = False
+        return pd.Series(view, index=index, copy=False)
+
+    @property
+    def performance(self):
+        """Performance base 100 (vue en lecture seule ; le point du jour suit les mises à jour)."""
+        return self._view(self._perf, self._size, self._index)
+
+    @property
+    def value(self):
+        """Valeur du portefeuille (vue en lecture seule ; le point du jour suit les mises à jour)."""
+        return self._view(self._value, self._size, self._index)
+
+    def _rebuild(self, prices, end_date):
+        """Recalcule les séries complètes à partir de la matrice de prix."""
+        window, _, shares, _ = PortfolioEngine(prices).allocate(
+            self.initial_investment, start_date=self.start_date, end_date=end_date
+        )
+        valid = shares > 0
+        if not len(window) or not valid.any():
+            self._size = 0
+            self._index = pd.DatetimeIndex([])
+            self._valid = valid
+            return
+
+        base = window.values[0]
+        values = window.values[:, valid]
+        n = len(window)
+        self._perf = np.empty(n + self.SPARE_POINTS)
+        self._value = np.empty(n + self.SPARE_POINTS)
+        self._perf[:n] = np.nanmean(values / base[valid] * 100, axis=1)
+        self._value[:n] = values @ shares[valid]
+        self._size = n
+        self._index = window.dates
+
+        self._tickers = list(prices.tickers)
+        self._history_end = window.dates[-1]
+        self._history_len = n
+        self._base = base
+        self._shares = shares
+        self._valid = valid
+        self._last_prices = window.values[-1].copy()
+        self.full_rebuilds += 1
+
+    def _apply_quotes(self, quotes, now):
+        """Recalcule le point du jour à partir des cotations (O(tickers))."""
+        latest = quotes['current_price'].reindex(self._tickers).to_numpy(dtype=np.float64)
+        # Cotation manquante ou nulle : dernier prix connu
+        latest = np.where(np.nan_to_num(latest) > 0, latest, self._last_prices)
+
+        valid = self._valid
+        perf = float(np.nanmean(latest[valid] / self._base[valid] * 100))
+        value = float(latest[valid] @ self._shares[valid])
+
+        # Point du jour : séance en cours, ou dernière séance ouvrée le week-end
+        today = pd.offsets.BDay().rollback(pd.Timestamp(now).normalize())
+        if today < self._history_end:
+            return
+        if today != self._index[-1]:
+            # Nouveau jour sans nouvelle séance dans l'historique : un point de plus
+            if self._size == len(self._perf):
+                self._perf = np.concatenate([self._perf, np.empty(self.SPARE_POINTS)])
+                self._value = np.concatenate([self._value, np.empty(self.SPARE_POINTS)])
+            self._size += 1
+            self._index = self._index.append(pd.DatetimeIndex([today]))
+        self._perf[self._size - 1] = perf
+        self._value[self._size - 1] = value
+        self.incremental_updates += 1
+
+    @profiled()
+    def sync(self, prices, quotes=None, end_date=None, now=None):
+        """
+        Met les séries à jour.
+
+        Args:
+            prices (PriceMatrix): Matrice des clôtures alignées
+            quotes (DataFrame, optional): Cotations indexées par ticker (get_quotes_batch)
+            end_date (datetime, optional): Date de fin de la fenêtre
+            now (datetime, optional): Instant courant (pour dater le point du jour)
+
+        Returns:
+            tuple: (performance base 100, valeur du portefeuille), vues en lecture seule
+        """
+        with self._lock:
+            window_end = prices.window(self.start_date, end_date).dates
+            needs_rebuild = (
+                self._tickers != list(prices.tickers)
+                or not len(window_end)
+                or window_end[-1] != self._history_end
+                or len(window_end) != self._history_len
+            )
+            if needs_rebuild:
+                self._rebuild(prices, end_date)
+            if quotes is not None and self._tickers is not None and self._size:
+                self._apply_quotes(quotes, now or pd.Timestamp.now())
+            return self.performance, self.value
@@ -0,0 +1,1001 @@
+# market_data.py
+
+# Cœur de la couche de données, sans dépendance à Streamlit : utilisable depuis l'application
+# (via l'adaptateur src/data_loader.py), un traitement par lots, un pool de processus ou un benchmark.
+# La progression et les incidents sont signalés par des fonctions de rappel :
+#     on_progress(terminés, total, ticker)
+#     on_event(niveau, message)   niveau : "info", "warning" ou "error"
+
+import collections
+import os
+import threading
+import time
+import pandas as pd
+from datetime import datetime, timedelta
+from src import config
+from src.stock_utils import get_country_from_ticker
+from src.providers import get_provider
+from src.history_store import get_history_store
+from src.market_store import get_market_store
+from src.snapshot import get_snapshot_store, snapshot_key
+from src.ohlcv_archive import get_ohlcv_archive
+from src.price_matrix import PriceMatrix
+from src.portfolio_engine import PortfolioEngine
+from src.risk import risk_metrics, TRADING_DAYS
+from src.rolling import RollingAnalytics
+from src.covariance import CovarianceModel
+from src.synthetic_market import SyntheticMarket, sector_of
+from src.fetch_scheduler import get_scheduler
+from src.fetch_ledger import get_fetch_ledger, traced
+from src.profiling import profiled
+from src.tiered_cache import TieredCache, TIER_TTLS, split_tiers, tiers_for, ttl_for
+
+# Champs de .info utilisés pour les cotations
+QUOTE_FIELDS = ('currentPrice', 'regularMarketPrice', 'previousClose', 'regularMarketPreviousClose')
+
+# Champs de .info des fiches détaillées (get_stock_data) et des métriques (load_metrics)
+DETAIL_FIELDS = ('sector', 'industry', 'country', 'trailingPE', 'dividendYield', 'trailingEps', 'marketCap')
+METRIC_FIELDS = (
+    'longName', 'country', 'sector', 'industry', 'exchange', 'currency', 'fiftyTwoWeekLow',
+    'fiftyTwoWeekHigh', 'fiftyDayAverage', 'twoHundredDayAverage', 'marketCap', 'trailingPE',
+    'dividendYield', 'recommendationKey'
+)
+
+# Composition du portefeuille
+PORTFOLIO_CSV = os.path.join(config.PROJECT_ROOT, "data", "Portefeuille_100_business_models.csv")
+
+@profiled()
+def load_portfolio(path=PORTFOLIO_CSV):
+    """
+    Chargement des données du portefeuille.
+    
+    Arguments:
+        path (str): Fichier CSV du portefeuille
+        
+    Returns:
+        DataFrame: Composition du portefeuille (lève une exception si le fichier est illisible)
+    """
+    df = pd.read_csv(path)
+    # Remplacer SEBP.PA par SK.PA si nécessaire
+    df['ticker'] = df['ticker'].replace('SEBP.PA', 'SK.PA')
+    return df
+
+# Caches partagés par les chargeurs : données fondamentales (.info) par (ticker, niveau),
+# cotations par ticker, historiques en mémoire par (tickers, dates, champs)
+FUNDAMENTALS_CACHE_SIZE = 3 * 5000
+QUOTES_CACHE_SIZE = 5000
+FRAMES_CACHE_SIZE = 8
+_fundamentals_cache = TieredCache(FUNDAMENTALS_CACHE_SIZE)
+_quotes_cache = TieredCache(QUOTES_CACHE_SIZE)
+_frames_cache = TieredCache(FRAMES_CACHE_SIZE)
+
+def fetch_fundamentals(tickers):
+    """
+    Télécharge les données fondamentales (.info), sans cache ni stockage
+    (utilisé par get_fundamentals et par le rafraîchisseur).
+    
+    Arguments:
+        tickers (list): Liste des symboles d'actions
+        
+    Returns:
+        dict: ticker -> (info, erreur) ; info vaut None en cas d'erreur
+    """
+    provider = get_provider()
+    ledger = get_fetch_ledger()
+    result = {}
+    for ticker, (info, error, (elapsed, retries)) in zip(tickers, get_scheduler().map(provider.get_info, tickers, trace=True)):
+        ledger.record("fundamentals", ticker, "live" if error is None else "error", elapsed, retries, 0.0, error)
+        result[ticker] = (info, error)
+    return result
+
+def _load_fundamentals(tickers):
+    """Lit le stockage partagé du rafraîchisseur s'il est activé, puis télécharge les tickers manquants."""
+    result = {}
+    if config.USE_REFRESHER:
+        stored = get_market_store().read_fundamentals(tickers, config.STORE_MAX_AGE)
+        result = {t: (info, None) for t, info in stored.items()}
+        get_fetch_ledger().record_many("fundamentals", stored, "store")
+    missing = [t for t in tickers if t not in result]
+    if missing:
+        result.update(fetch_fundamentals(missing))
+    return result
+
+def _load_fundamental_tiers(keys):
+    """Charge les .info des tickers demandés, répartis en entrées (ticker, niveau) de tous les niveaux."""
+    tickers = list(dict.fromkeys(ticker for ticker, _ in keys))
+    result = {}
+    for ticker, (info, error) in _load_fundamentals(tickers).items():
+        parts = split_tiers(info) if error is None else dict.fromkeys(TIER_TTLS)
+        for tier, part in parts.items():
+            result[(ticker, tier)] = (part, error)
+    return result
+
+def _record_cached(kind, cache, tickers, ttl, tier=None):
+    """Enregistre au journal les tickers servis par un cache en mémoire (à jour ou périmés)."""
+    ledger = get_fetch_ledger()
+    for ticker in tickers:
+        age = cache.age(ticker if tier is None else (ticker, tier))
+        if age is not None:
+            ledger.record(kind, ticker, "cache" if age <= ttl else "stale", staleness=age)
+
+@profiled()
+@traced("get_fundamentals")
+def get_fundamentals(tickers, fields=None, max_age=None):
+    """
+    Récupère les données fondamentales (.info) d'une liste de tickers.
+    Les champs de chaque niveau (statiques, fondamentaux, cours) sont des entrées de cache
+    distinctes, chacune à sa durée de validité : des cours périmés ne font pas recharger
+    les fondamentaux des appelants qui ne les lisent pas. Une donnée périmée est servie
+    immédiatement et rafraîchie en arrière-plan.
+    
+    Arguments:
+        tickers (list): Liste des symboles d'actions
+        fields (iterable, optional): Champs utilisés, qui fixent les niveaux lus
+            (tous par défaut) et donc la durée de validité
+        max_age (float, optional): Durée de validité imposée (secondes)
+        
+    Returns:
+        dict: ticker -> (info, erreur) ; info (champs des niveaux lus) vaut None en cas d'erreur
+    """
+    tiers = tiers_for(fields)
+    _record_cached("fundamentals", _fundamentals_cache, tickers,
+                   ttl_for(fields) if max_age is None else max_age, tier=tiers[-1])
+    result = {ticker: ({}, None) for ticker in tickers}
+    for tier in tiers:
+        ttl = TIER_TTLS[tier] if max_age is None else max_age
+        keys = [(ticker, tier) for ticker in tickers]
+        for (ticker, _), (part, error) in _fundamentals_cache.get_many(keys, _load_fundamental_tiers, ttl).items():
+            info, previous = result[ticker]
+            if previous is None:
+                result[ticker] = (None, error) if error is not None else ({**info, **part}, None)
+    return result
+
+def clear_caches():
+    """Vide les caches de données de marché (changement de fournisseur, mesures à froid)."""
+    _fundamentals_cache.clear()
+    _quotes_cache.clear()
+    _frames_cache.clear()
+    _risk_results.clear()
+    _reference_series.clear()
+    _rolling_analytics.clear()
+    _covariance_models.clear()
+
+@profiled()
+@traced("get_stock_data")
+def get_stock_data(ticker, detailed=False):
+    """
+    Récupère les données récentes d'une action.
+    Si elle est introuvable, l'erreur est levée ; avec SYNTHETIC_FALLBACK, des données
+    simulées sont renvoyées à la place (source "fallback", inscrite au journal).
+    
+    Arguments:
+        ticker (str): Symbole de l'action
+        detailed (bool): Si True, récupère des données plus détaillées
+        
+    Returns:
+        dict: Dictionnaire contenant les données de l'action et leur source ("live" ou "fallback")
+    """
+    ledger = get_fetch_ledger()
+    t0 = time.perf_counter()
+    try:
+        provider = get_provider()
+        # Données fondamentales partagées : cours (et champs détaillés) à leurs durées de validité
+        fields = QUOTE_FIELDS + DETAIL_FIELDS if detailed else QUOTE_FIELDS
+        info, error = get_fundamentals([ticker], fields=fields)[ticker]
+        if error is not None:
+            raise error
+        
+        # Données actuelles
+        current_price = info.get('currentPrice', info.get('regularMarketPrice', 0))
+        previous_close = info.get('previousClose', info.get('regularMarketPreviousClose', 0))
+        
+        # Alternative avec historical si prix non disponible
+        if current_price == 0 or previous_close == 0:
+            hist = provider.get_history(ticker, period="2d")
+            if not hist.empty:
+                current_price = hist['Close'].iloc[-1]
+                if len(hist) > 1:
+                    previous_close = hist['Close'].iloc[-2]
+                else:
+                    previous_close = current_price
+        
+        change = current_price - previous_close
+        percent_change = (change / previous_close) * 100 if previous_close else 0
+        
+        result = {
+            'current_price': current_price,
+            'previous_close': previous_close,
+            'change': change,
+            'percent_change': percent_change,
+            'source': "live"
+        }
+        
+        if detailed:
+            # Données financières
+            sector = info.get('sector', "Non disponible")
+            industry = info.get('industry', "Non disponible")
+            country = info.get('country', "USA")  # Pays par défaut
+            
+            # Métriques financières
+            pe_ratio = info.get('trailingPE', 0)
+            dividend_yield = info.get('dividendYield', 0)
+            
+            # Performance annuelle (YTD)
+            history = provider.get_history(ticker, period="ytd")
+            if not history.empty:
+                ytd_start = history.iloc[0]['Close']
+                ytd_current = history.iloc[-1]['Close']
+                ytd_change = ((ytd_current - ytd_start) / ytd_start) * 100
+            else:
+                ytd_change = 0
+            
+            # BPA
+            eps = info.get('trailingEps', 0)
+            market_cap = info.get('marketCap', 0) / 1_000_000_000  # Conversion en milliards
+            
+            # Historique des prix pour le graphique
+            hist = provider.get_history(ticker, period="1y")
+            
+            # Ajouter les données détaillées
+            result.update({
+                'sector': sector,
+                'industry': industry,
+                'country': country,
+                'pe_ratio': pe_ratio,
+                'dividend_yield': dividend_yield,
+                'ytd_change': ytd_change,
+                'eps': eps,
+                'market_cap': market_cap,
+                'history': hist
+            })
+        
+        ledger.record("stock_data", ticker, "live", time.perf_counter() - t0, staleness=0.0)
+        return result
+    except Exception as e:
+        if not config.SYNTHETIC_FALLBACK:
+            ledger.record("stock_data", ticker, "error", time.perf_counter() - t0, error=e)
+            raise
+        # Données simulées, signalées comme telles
+        ledger.record("stock_data", ticker, "fallback", time.perf_counter() - t0, error=e)
+        return _synthetic_stock_data(ticker, detailed)
+
+def _synthetic_stock_data(ticker, detailed=False):
+    """
+    Données simulées d'une action (même format que get_stock_data), tirées du marché
+    synthétique : déterministes pour un ticker et une graine donnés.
+
+    Arguments:
+        ticker (str): Symbole de l'action
+        detailed (bool): Si True, ajoute métriques et historique sur un an
+
+    Returns:
+        dict: Dictionnaire contenant les données simulées de l'action
+    """
+    today = pd.Timestamp.today().normalize()
+    market = SyntheticMarket(config.SYNTHETIC_SEED, start=today - timedelta(days=365))
+    hist = market.history(ticker, today)
+    current_price = float(hist['Close'].iloc[-1])
+    previous_close = float(hist['Close'].iloc[-2])
+    change = current_price - previous_close
+
+    result = {
+        'current_price': current_price,
+        'previous_close': previous_close,
+        'change': change,
+        'percent_change': (change / previous_close) * 100,
+        'source': "fallback"
+    }
+
+    if detailed:
+        ytd = hist.loc[hist.index >= today.replace(month=1, day=1), 'Close']
+        eps = current_price / market.uniform(ticker, 'pe', 8, 40)
+        result.update({
+            'sector': sector_of(ticker),
+            'industry': "Non disponible",
+            'country': get_country_from_ticker(ticker),
+            'pe_ratio': current_price / eps,
+            'dividend_yield': market.uniform(ticker, 'dividend_yield', 0.5, 4.5),
+            'ytd_change': (ytd.iloc[-1] / ytd.iloc[0] - 1) * 100 if len(ytd) else 0,
+            'eps': eps,
+            'market_cap': market.uniform(ticker, 'market_cap', 10, 500),
+            'history': hist
+        })
+
+    return result
+
+QUOTE_COLUMNS = ['current_price', 'previous_close', 'change', 'percent_change']
+
+def _quotes_from_closes(closes):
+    """
+    Calcule les cotations à partir d'un tableau de clôtures (dates x tickers).
+
+    Arguments:
+        closes (DataFrame): Clôtures quotidiennes, une colonne par ticker
+
+    Returns:
+        DataFrame: Cotations indexées par ticker (colonnes QUOTE_COLUMNS)
+    """
+    rows = {}
+    for ticker in closes.columns:
+        serie = closes[ticker].dropna()
+        if serie.empty:
+            continue
+        current_price = float(serie.iloc[-1])
+        previous_close = float(serie.iloc[-2]) if len(serie) > 1 else current_price
+        rows[ticker] = (current_price, previous_close)
+
+    quotes = pd.DataFrame.from_dict(rows, orient='index', columns=['current_price', 'previous_close'], dtype='float64')
+    quotes['change'] = quotes['current_price'] - quotes['previous_close']
+    quotes['percent_change'] = (quotes['change'] / quotes['previous_close'].where(quotes['previous_close'] != 0)) * 100
+    quotes['percent_change'] = quotes['percent_change'].fillna(0.0)
+    return quotes[QUOTE_COLUMNS]
+
+def download_quotes(tickers, chunk_size=50):
+    """
+    Télécharge les cotations par lots, sans cache ni stockage
+    (utilisé par get_quotes_batch et par le rafraîchisseur).
+    
+    Arguments:
+        tickers (list): Liste des symboles d'actions
+        chunk_size (int): Nombre de tickers par requête
+        
+    Returns:
+        dict: ticker -> (ligne de cotation, erreur)
+    """
+    chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+
+    provider = get_provider()
+    ledger = get_fetch_ledger()
+    frames = []
+    results = get_scheduler().map(lambda chunk: provider.download_closes(chunk, "5d"), chunks, trace=True)
+    for chunk, (closes, error, (elapsed, retries)) in zip(chunks, results):
+        if error is None and not closes.empty:
+            frame = _quotes_from_closes(closes)
+            frames.append(frame)
+            # Durée du téléchargement groupé, attribuée à chacun de ses tickers
+            ledger.record_many("quotes", [t for t in chunk if t in frame.index], "live", elapsed, retries, 0.0)
+
+    # Les tickers absents du téléchargement groupé passent par la récupération unitaire
+    loaded = set().union(*(frame.index for frame in frames))
+    result = {}
+    for ticker in tickers:
+        if ticker in loaded:
+            continue
+        try:
+            data = get_stock_data(ticker)
+            result[ticker] = (pd.Series(data)[QUOTE_COLUMNS].to_numpy(dtype='float64'), None)
+        except Exception as e:
+            result[ticker] = (None, e)
+
+    if frames:
+        quotes = pd.concat(frames)
+        quotes = quotes[~quotes.index.duplicated(keep='last')]
+        result.update((t, (row, None)) for t, row in zip(quotes.index, quotes.to_numpy()))
+    return result
+
+def _load_quotes(tickers, chunk_size=50):
+    """Lit le stockage partagé du rafraîchisseur s'il est activé, puis télécharge les tickers manquants."""
+    result = {}
+    if config.USE_REFRESHER:
+        stored = get_market_store().read_quotes(tickers, config.STORE_MAX_AGE)
+        result = {t: (row, None) for t, row in stored.items()}
+        get_fetch_ledger().record_many("quotes", stored, "store")
+    missing = [t for t in tickers if t not in result]
+    if missing:
+        result.update(download_quotes(missing, chunk_size))
+    return result
+
+@profiled()
+@traced("get_quotes_batch")
+def get_quotes_batch(tickers, chunk_size=50):
+    """
+    Récupère les cotations (dernier prix et clôture précédente) d'une liste de tickers
+    en quelques téléchargements groupés au lieu d'un appel par ticker.
+    Les cotations plus anciennes que CACHE_TTL_QUOTES sont servies immédiatement
+    et rafraîchies en arrière-plan.
+
+    Arguments:
+        tickers (list): Liste des symboles d'actions
+        chunk_size (int): Nombre de tickers par téléchargement groupé
+
+    Returns:
+        DataFrame: Cotations indexées par ticker avec les colonnes
+            current_price, previous_close, change, percent_change
+    """
+    tickers = list(tickers)
+    _record_cached("quotes", _quotes_cache, tickers, ttl_for(QUOTE_FIELDS))
+    cached = _quotes_cache.get_many(
+        tickers, lambda keys: _load_quotes(keys, chunk_size), ttl_for(QUOTE_FIELDS)
+    )
+    rows = {t: row for t, (row, error) in cached.items() if error is None}
+    quotes = pd.DataFrame.from_dict(rows, orient='index', columns=QUOTE_COLUMNS, dtype='float64')
+    return quotes.reindex(tickers)
+
+@traced("iter_histories")
+def iter_histories(tickers, start_date, end_date, on_progress=None, on_event=None):
+    """
+    Télécharge (ou complète) les historiques en parallèle et les produit au fil de l'eau,
+    dans l'ordre d'achèvement.
+    
+    Arguments:
+        tickers (list): Liste des symboles d'actions
+        start_date (datetime): Date de début (None : historique direct, sans stockage)
+        end_date (datetime): Date de fin
+        on_progress (callable, optional): on_progress(terminés, total, ticker)
+        on_event (callable, optional): on_event(niveau, message) pour les erreurs de récupération
+    
+    Yields:
+        tuple: (ticker, DataFrame d'historique) pour chaque ticker chargé
+    """
+    provider = get_provider()
+    store = get_history_store()
+    ledger = get_fetch_ledger()
+    
+    def fetch_ticker_data(ticker):
+        """Renvoie (historique, source)."""
+        if start_date is None:
+            return provider.get_history(ticker, start=start_date, end=end_date), "live"
+        if config.USE_REFRESHER:
+            # Historique tenu à jour par le rafraîchisseur : lecture seule
+            hist = store.read(ticker, start_date, end_date, max_age=config.STORE_MAX_AGE)
+            if hist is not None:
+                return hist, "store"
+        return store.update(ticker, provider, start_date, end_date), "live"
+    
+    # Téléchargements parallèles via l'ordonnanceur partagé (débit limité, nouvelles tentatives)
+    completed = get_scheduler().iter_completed(fetch_ticker_data, tickers, trace=True)
+    for i, (_, ticker, fetched, error, (elapsed, retries)) in enumerate(completed):
+        if error is not None:
+            ledger.record("history", ticker, "error", elapsed, retries, error=error)
+            if on_event is not None:
+                on_event("warning", f"Erreur lors de la récupération des données pour {ticker}: {error}")
+        else:
+            hist, source = fetched
+            ledger.record("history", ticker, source, elapsed, retries, 0.0 if source == "live" else None)
+            if hist is not None and not hist.empty:
+                yield ticker, hist
+        if on_progress is not None:
+            on_progress(i + 1, len(tickers), ticker)
+
+# Types compacts des champs d'historique conservés en mémoire (projection à l'ingestion)
+COMPACT_DTYPES = {
+    'Open': 'float32',
+    'High': 'float32',
+    'Low': 'float32',
+    'Close': 'float32',
+    'Volume': 'int64',
+    'Dividends': 'float32',
+    'Stock Splits': 'float32'
+}
+
+# Mémoire des historiques projetés, par entrée de cache : (tickers, début, fin, champs) -> octets avant / après
+_history_memory = {}
+
+def compact_history(hist, fields):
+    """
+    Ne conserve que les champs demandés, au format compact (prix float32, volume int64).
+    
+    Arguments:
+        hist (DataFrame): Historique OHLCV complet
+        fields (tuple): Champs à conserver
+        
+    Returns:
+        DataFrame: Historique projeté
+    """
+    projected = hist[[f for f in fields if f in hist.columns]]
+    if 'Volume' in projected.columns and projected['Volume'].isna().any():
+        projected = projected.assign(Volume=projected['Volume'].fillna(0))
+    return projected.astype({c: COMPACT_DTYPES[c] for c in projected.columns if c in COMPACT_DTYPES})
+
+def _load_historical_frames(tickers, start_date=None, end_date=None, fields=None, on_progress=None, on_event=None):
+    """Historiques en mémoire (un DataFrame par ticker), projetés sur `fields` si fourni."""
+    if end_date is None:
+        end_date = datetime.now()
+    histories = iter_histories(tickers, start_date, end_date, on_progress, on_event)
+    if fields is None:
+        return dict(histories)
+    
+    data = {}
+    raw_bytes = compact_bytes = 0
+    for ticker, hist in histories:
+        data[ticker] = compact_history(hist, fields)
+        raw_bytes += hist.memory_usage(deep=True).sum()
+        compact_bytes += data[ticker].memory_usage(deep=True).sum()
+    _history_memory[(tuple(tickers), str(start_date), str(end_date), tuple(fields))] = (raw_bytes, compact_bytes)
+    return data
+
+def get_history_memory_report():
+    """
+    Mémoire économisée par la projection des historiques, par entrée de cache.
+    
+    Returns:
+        DataFrame: Tickers, dates, champs, octets complets, octets projetés et gain
+    """
+    rows = [
+        {
+            "Tickers": len(universe), "Début": start, "Fin": end, "Champs": ", ".join(fields),
+            "Complet (Mo)": raw / 1e6, "Projeté (Mo)": compact / 1e6,
+            "Économie (%)": (1 - compact / raw) * 100 if raw else 0.0
+        }
+        for (universe, start, end, fields), (raw, compact) in _history_memory.items()
+    ]
+    return pd.DataFrame(rows)
+
+_archive_lock = threading.Lock()
+
+@profiled()
+@traced("get_historical_data")
+def get_historical_data(tickers, start_date=None, end_date=None, fields=None, lazy=False,
+                        on_progress=None, on_event=None):
+    """
+    Récupère les données historiques pour une liste de tickers.
+    Les historiques sont conservés sur disque : seules les séances manquantes
+    depuis la dernière mise à jour sont téléchargées (aucune si le rafraîchisseur
+    tient le stockage à jour).
+    
+    Avec `fields`, seuls les champs demandés (par exemple ("Close",)) sont conservés,
+    au format compact (prix float32, volume int64). Avec `lazy`, le résultat est une
+    vue paresseuse sur l'archive OHLCV projetée en mémoire (prix float64, volume int64) :
+    les champs demandés sont lus ticker par ticker, à l'accès.
+    
+    Arguments:
+        tickers (list): Liste des symboles d'actions
+        start_date (datetime, optional): Date de début
+        end_date (datetime, optional): Date de fin
+        fields (tuple, optional): Champs conservés (Open, High, Low, Close, Volume, ...)
+        lazy (bool): Vue paresseuse sur l'archive (nécessite start_date)
+        on_progress (callable, optional): on_progress(terminés, total, ticker)
+        on_event (callable, optional): on_event(niveau, message)
+        
+    Returns:
+        dict: Dictionnaire de DataFrames avec historique des prix
+            (ArchiveView, de même interface, si `lazy`)
+    """
+    if fields is not None:
+        fields = tuple(fields)
+    if not lazy or start_date is None:
+        # Résultat partagé (non copié) ; rafraîchi en arrière-plan, sans rappels, une fois périmé
+        key = (tuple(tickers), start_date, end_date, fields)
+        
+        caller = threading.current_thread()
+        
+        def load(keys):
+            # Les rappels ne sont utilisés que dans le thread appelant (pas lors du rafraîchissement)
+            callbacks = (on_progress, on_event) if threading.current_thread() is caller else (None, None)
+            return {keys[0]: (_load_historical_frames(tickers, start_date, end_date, fields, *callbacks), None)}
+        
+        age = _frames_cache.age(key)
+        if age is not None:
+            source = "cache" if age <= config.HISTORY_CACHE_TTL else "stale"
+            get_fetch_ledger().record_many("history", tickers, source, staleness=age)
+        entry, _ = _frames_cache.get_many([key], load, config.HISTORY_CACHE_TTL)[key]
+        return entry
+    
+    archive = get_ohlcv_archive(tickers, start_date)
+    ttl = config.STORE_MAX_AGE if config.USE_REFRESHER else config.SNAPSHOT_TTL
+    with _archive_lock:
+        if not archive.covers(tickers, start_date, ttl):
+            histories = iter_histories(tickers, start_date, None, on_progress, on_event)
+            archive.update(tickers, start_date, datetime.now(), histories)
+        else:
+            get_fetch_ledger().record_many("history", tickers, "store")
+    return archive.view(tickers, fields or ("Close",), start_date, end_date)
+
+@profiled()
+def build_price_matrix(tickers, start_date, end_date=None, on_progress=None, on_event=None):
+    """
+    Construit la matrice des clôtures alignées sur les jours ouvrés et propagées vers l'avant.
+    
+    Arguments:
+        tickers (list): Liste des symboles d'actions
+        start_date (datetime): Date de début
+        end_date (datetime, optional): Date de fin
+        on_progress (callable, optional): on_progress(terminés, total, ticker)
+        on_event (callable, optional): on_event(niveau, message)
+        
+    Returns:
+        PriceMatrix: Matrice des clôtures (dates x tickers)
+    """
+    if end_date is None:
+        end_date = datetime.now()
+    # Seules les clôtures sont lues dans l'archive
+    hist_data = get_historical_data(tickers, start_date, end_date, fields=("Close",), lazy=True,
+                                    on_progress=on_progress, on_event=on_event)
+    # Colonnes dans l'ordre du portefeuille
+    ordered = {t: hist_data[t] for t in tickers if t in hist_data}
+    return PriceMatrix.from_history(ordered, start_date, end_date)
+
+_snapshot_lock = threading.Lock()
+
+@profiled()
+@traced("get_price_matrix")
+def get_price_matrix(tickers, start_date, end_date=None, on_progress=None, on_event=None):
+    """
+    Renvoie la matrice des clôtures, partagée par toutes les sessions et tous les processus :
+    sans date de fin, elle est lue dans un instantané projeté en mémoire (lecture seule,
+    sans copie) reconstruit et republié au plus toutes les SNAPSHOT_TTL secondes
+    (ou publié par le rafraîchisseur).
+    
+    Arguments:
+        tickers (list): Liste des symboles d'actions
+        start_date (datetime): Date de début
+        end_date (datetime, optional): Date de fin (calcul dédié, hors instantané)
+        on_progress (callable, optional): on_progress(terminés, total, ticker)
+        on_event (callable, optional): on_event(niveau, message)
+        
+    Returns:
+        PriceMatrix: Matrice des clôtures (dates x tickers)
+    """
+    if end_date is not None:
+        return build_price_matrix(tickers, start_date, end_date, on_progress, on_event)
+    
+    # Avec le rafraîchisseur, c'est lui qui republie l'instantané après chaque mise à jour
+    ttl = config.STORE_MAX_AGE if config.USE_REFRESHER else config.SNAPSHOT_TTL
+    store = get_snapshot_store()
+    key = snapshot_key(tickers, start_date)
+    snapshot = store.load(key)
+    if snapshot is None or snapshot.age > ttl:
+        # Une seule reconstruction par processus ; les autres sessions réutilisent son résultat
+        with _snapshot_lock:
+            snapshot = store.load(key)
+            if snapshot is None or snapshot.age > ttl:
+                prices = build_price_matrix(tickers, start_date, on_progress=on_progress, on_event=on_event)
+                snapshot = store.publish(key, prices)
+                return snapshot.prices
+    get_fetch_ledger().record_many("history", tickers, "cache", staleness=snapshot.age)
+    return snapshot.prices
+
+@traced("stream_price_matrix")
+def stream_price_matrix(tickers, start_date, first_batch=10, on_progress=None, on_event=None):
+    """
+    Produit la matrice des clôtures au fur et à mesure de l'arrivée des historiques
+    (ordre d'achèvement) : une première matrice partielle dès `first_batch` tickers,
+    puis à chaque doublement du nombre de tickers chargés, enfin la matrice complète,
+    lue dans l'archive OHLCV et publiée comme instantané partagé. Si l'instantané est à jour
+    (ou l'archive couvre l'univers), seule la matrice complète est produite.
+    
+    Arguments:
+        tickers (list): Liste des symboles d'actions
+        start_date (datetime): Date de début
+        first_batch (int): Nombre de tickers de la première matrice partielle
+        on_progress (callable, optional): on_progress(terminés, total, ticker)
+        on_event (callable, optional): on_event(niveau, message)
+        
+    Yields:
+        tuple: (PriceMatrix, complète) ; complète vaut True pour la dernière matrice
+    """
+    ttl = config.STORE_MAX_AGE if config.USE_REFRESHER else config.SNAPSHOT_TTL
+    store = get_snapshot_store()
+    key = snapshot_key(tickers, start_date)
+    snapshot = store.load(key)
+    if snapshot is not None and snapshot.age <= ttl:
+        get_fetch_ledger().record_many("history", tickers, "cache", staleness=snapshot.age)
+        yield snapshot.prices, True
+        return
+    
+    # Une seule reconstruction par processus ; les sessions en attente réutilisent l'instantané publié
+    with _snapshot_lock:
+        snapshot = store.load(key)
+        if snapshot is not None and snapshot.age <= ttl:
+            get_fetch_ledger().record_many("history", tickers, "cache", staleness=snapshot.age)
+            yield snapshot.prices, True
+            return
+        
+        end_date = datetime.now()
+        archive = get_ohlcv_archive(tickers, start_date)
+        with _archive_lock:
+            if archive.covers(tickers, start_date, ttl):
+                get_fetch_ledger().record_many("history", tickers, "store")
+            else:
+                loaded = {}
+                next_yield = first_batch
+                for ticker, hist in iter_histories(tickers, start_date, end_date, on_progress, on_event):
+                    loaded[ticker] = hist
+                    if len(loaded) >= next_yield and len(loaded) < len(tickers):
+                        next_yield *= 2
+                        # Colonnes dans l'ordre du portefeuille
+                        partial = {t: loaded[t][['Close']] for t in tickers if t in loaded}
+                        yield PriceMatrix.from_history(partial, start_date, end_date), False
+                archive.update(tickers, start_date, end_date, loaded.items())
+                del loaded
+            closes = archive.view(tickers, ("Close",), start_date, end_date)
+        
+        prices = PriceMatrix.from_history({t: closes[t] for t in tickers if t in closes}, start_date, end_date)
+        yield store.publish(key, prices).prices, True
+
+# Indicateurs de risque par (univers, fenêtre, dernière ligne de prix, indices, poids),
+# les plus récents conservés : une nouvelle ligne de prix donne une nouvelle entrée
+_risk_results = collections.OrderedDict()
+_risk_lock = threading.Lock()
+RISK_CACHE_SIZE = 8
+
+@profiled()
+@traced("get_risk_metrics")
+def get_risk_metrics(prices, benchmarks=None, start_date=None, weights=None):
+    """
+    Indicateurs de risque du portefeuille et de chaque valeur (voir risk.risk_metrics) :
+    volatilité, perte maximale, Sharpe, Sortino, bêta et corrélation avec chaque indice.
+    Calculés en une passe sur la matrice ; les RISK_CACHE_SIZE derniers résultats sont conservés
+    par univers, fenêtre et dernière ligne de prix.
+    
+    Arguments:
+        prices (PriceMatrix): Matrice des clôtures (dates x tickers)
+        benchmarks (dict, optional): Nom -> ticker de l'indice de référence
+        start_date (datetime, optional): Début de la fenêtre (date d'achat du portefeuille)
+        weights (array-like or dict, optional): Poids du portefeuille (équipondéré par défaut)
+        
+    Returns:
+        DataFrame: Une ligne pour le portefeuille puis une par valeur
+    """
+    window = prices.window(start_date)
+    benchmarks = dict(benchmarks or {})
+    if window.empty:
+        return risk_metrics(window, benchmarks)
+    if isinstance(weights, dict):
+        weights_key = tuple(sorted(weights.items()))
+    else:
+        weights_key = None if weights is None else tuple(weights)
+    key = (tuple(window.tickers), window.dates[0], window.dates[-1], len(window),
+           window.values[-1].tobytes(), tuple(benchmarks.items()), weights_key)
+    
+    with _risk_lock:
+        metrics = _risk_results.get(key)
+        if metrics is not None:
+            _risk_results.move_to_end(key)
+            return metrics
+    
+    # Indices chargés comme les historiques des valeurs (stockage et cache partagés), hors du
+    # verrou : un indice lent à charger ne bloque pas les autres sessions (deux sessions
+    # simultanées peuvent alors calculer le même résultat)
+    hist = get_historical_data(list(benchmarks.values()), window.dates[0], fields=("Close",)) if benchmarks else {}
+    closes = {name: hist[t]['Close'] for name, t in benchmarks.items() if t in hist and not hist[t].empty}
+    portfolio = PortfolioEngine(window).run(1.0, weights).total_value
+    metrics = risk_metrics(window, closes, portfolio)
+    with _risk_lock:
+        _risk_results[key] = metrics
+        _risk_results.move_to_end(key)
+        while len(_risk_results) > RISK_CACHE_SIZE:
+            _risk_results.popitem(last=False)
+    return metrics
+
+# Indices de référence en base 100 par (dates du graphique, historique de chaque indice),
+# les plus récents conservés : un graphique redessiné sans nouvelle donnée les réutilise
+_reference_series = collections.OrderedDict()
+_reference_lock = threading.Lock()
+REFERENCE_CACHE_SIZE = 8
+
+@profiled()
+@traced("get_reference_performance")
+def get_reference_performance(reference_indices, start_date, dates):
+    """
+    Performance base 100 des indices de référence sur les dates d'un graphique (cours propagés
+    vers l'avant), à partir des historiques partagés avec les indicateurs de risque et les
+    statistiques glissantes. Recalculée seulement si les dates ou un historique changent.
+    
+    Arguments:
+        reference_indices (dict): Nom -> ticker de l'indice
+        start_date (datetime): Date de début des historiques
+        dates (DatetimeIndex): Dates du graphique (la première sert de base 100)
+        
+    Returns:
+        dict: Nom -> Series base 100 (indices sans historique ou sans cours initial omis)
+    """
+    if not reference_indices or not len(dates):
+        return {}
+    hist = get_historical_data(list(reference_indices.values()), start_date, fields=("Close",))
+    closes = {name: hist[t]['Close'] for name, t in reference_indices.items() if t in hist and not hist[t].empty}
+    key = (dates[0], dates[-1], len(dates),
+           tuple((name, reference_indices[name], len(c), float(c.iloc[-1])) for name, c in closes.items()))
+    with _reference_lock:
+        if key in _reference_series:
+            _reference_series.move_to_end(key)
+            return _reference_series[key]
+    
+    series = {}
+    for name, close in closes.items():
+        close = close.astype('float64')
+        close = close[~close.index.duplicated(keep='last')]
+        aligned = close.reindex(close.index.union(dates)).ffill().reindex(dates)
+        if aligned.iloc[0] > 0:
+            series[name] = aligned / aligned.iloc[0] * 100
+    with _reference_lock:
+        _reference_series[key] = series
+        while len(_reference_series) > REFERENCE_CACHE_SIZE:
+            _reference_series.popitem(last=False)
+    return series
+
+# Statistiques glissantes conservées par (univers, date d'achat, indice), les plus récemment
+# utilisées : une séance ajoutée à la matrice est intégrée sans recalcul complet
+_rolling_analytics = collections.OrderedDict()
+_rolling_lock = threading.Lock()
+ROLLING_CACHE_SIZE = 8
+
+@profiled()
+@traced("get_rolling_stats")
+def get_rolling_stats(prices, start_date, benchmark=None):
+    """
+    Statistiques glissantes (30, 90 et 252 séances) du portefeuille équipondéré et de
+    chaque valeur : rendement, volatilité annualisée et corrélation à l'indice de référence
+    (voir rolling.RollingAnalytics).
+    
+    Arguments:
+        prices (PriceMatrix): Matrice des clôtures (dates x tickers)
+        start_date (datetime): Date d'achat du portefeuille (début des séries)
+        benchmark (str, optional): Ticker de l'indice de référence
+        
+    Returns:
+        RollingSnapshot: Statistiques glissantes figées (colonne "Portefeuille" puis une par valeur)
+    """
+    key = (tuple(prices.tickers), start_date, benchmark)
+    with _rolling_lock:
+        analytics = _rolling_analytics.get(key)
+        if analytics is None:
+            analytics = _rolling_analytics[key] = RollingAnalytics(start_date)
+        _rolling_analytics.move_to_end(key)
+        while len(_rolling_analytics) > ROLLING_CACHE_SIZE:
+            _rolling_analytics.popitem(last=False)
+    closes = None
+    if benchmark is not None:
+        hist = get_historical_data([benchmark], start_date, fields=("Close",))
+        if benchmark in hist and not hist[benchmark].empty:
+            closes = hist[benchmark]['Close']
+    return analytics.sync(prices, closes)
+
+# Modèles de covariance par (univers, fenêtre, dernière séance, dernière ligne de prix),
+# les plus récents conservés
+_covariance_models = collections.OrderedDict()
+_covariance_lock = threading.Lock()
+COVARIANCE_CACHE_SIZE = 8
+
+@profiled()
+@traced("get_covariance_model")
+def get_covariance_model(prices, window=TRADING_DAYS):
+    """
+    Covariance et corrélation des rendements quotidiens sur les `window` dernières séances
+    de la matrice (voir covariance.CovarianceModel).
+    Un modèle est conservé par (univers, fenêtre, dernière séance, dernière ligne de prix) :
+    un cours révisé en séance donne un nouveau modèle ; lorsque la matrice gagne une séance,
+    le modèle de la veille est mis à jour (rang 1) au lieu d'être recalculé.
+    
+    Arguments:
+        prices (PriceMatrix): Matrice des clôtures alignées
+        window (int): Durée de la fenêtre (séances)
+        
+    Returns:
+        CovarianceModel: Modèle (covariance(), correlation(), shrinkage)
+    """
+    def row_key(i):
+        return (prices.dates[i], prices.values[i].tobytes()) if len(prices) >= -i else (None, None)
+    
+    universe = (tuple(prices.tickers), window)
+    key = universe + row_key(-1)
+    with _covariance_lock:
+        model = _covariance_models.get(key)
+        if model is None and len(prices) > 1:
+            previous = _covariance_models.get(universe + row_key(-2))
+            if previous is not None:
+                model = previous.copy()
+                model.append(prices.dates[-1], prices.values[-1])
+        if model is None:
+            model = CovarianceModel.from_prices(prices, window)
+        _covariance_models[key] = model
+        _covariance_models.move_to_end(key)
+        while len(_covariance_models) > COVARIANCE_CACHE_SIZE:
+            _covariance_models.popitem(last=False)
+    return model
+
+@profiled()
+@traced("load_sector_country_data")
+def load_sector_country_data(tickers):
+    """
+    Récupère secteur et pays pour chaque ticker à partir des données fondamentales partagées.
+    
+    Arguments:
+        tickers (list): Liste des symboles d'actions
+        
+    Returns:
+        DataFrame: DataFrame avec secteur et pays pour chaque ticker
+    """
+    def sector_country(ticker, info):
+        sector = info.get("sector", "Non disponible")
+        country = info.get("country", "Non disponible")
+        
+        # Fallback si le pays n'est pas disponible via l'API
+        if not country or country == "Non disponible":
+            country = get_country_from_ticker(ticker)
+            
+        return {
+            "Ticker": ticker,
+            "Sector": sector,
+            "Country": country
+        }
+    
+    fundamentals = get_fundamentals(tickers, fields=("sector", "country"))
+    data = []
+    for ticker in tickers:
+        info, error = fundamentals[ticker]
+        if error is None:
+            data.append(sector_country(ticker, info))
+        else:
+            data.append({
+                "Ticker": ticker,
+                "Sector": "Non disponible",
+                "Country": get_country_from_ticker(ticker)  # Utilise le fallback même en cas d'erreur
+            })
+    
+    return pd.DataFrame(data)
+
+@profiled()
+@traced("load_metrics")
+def load_metrics(tickers):
+    """
+    Charge les métriques détaillées pour une liste de tickers.
+    
+    Arguments:
+        tickers (list): Liste des symboles d'actions
+        
+    Returns:
+        DataFrame: DataFrame avec les métriques pour chaque ticker
+    """
+    rows = []
+    # Fondamentaux à leur durée de validité ; cours issus des téléchargements groupés
+    fundamentals = get_fundamentals(tickers, fields=METRIC_FIELDS)
+    quotes = get_quotes_batch(tickers)
+    
+    for ticker in tickers:
+        info, error = fundamentals[ticker]
+        try:
+            if error is not None:
+                raise error
+            
+            # helpers
+            def txt(k): return info.get(k, None)
+            def num(k):
+                v = info.get(k, None)
+                return float(v) if v is not None else None
+            def quote(column):
+                v = quotes.at[ticker, column]
+                return None if pd.isna(v) else float(v)
+            
+            rows.append({
+                "Ticker":           ticker,
+                "Nom complet":      txt("longName"),
+                "Pays":             txt("country"),
+                "Secteur":          txt("sector"),
+                "Industrie":        txt("industry"),
+                "Exchange":         txt("exchange"),
+                "Devise":           txt("currency"),
+                "Prix Actuel":      quote("current_price"),
+                "Clôture Prec.":    quote("previous_close"),
+                "52-sem. Bas":      num("fiftyTwoWeekLow"),
+                "52-sem. Haut":     num("fiftyTwoWeekHigh"),
+                "Moyenne 50j":      num("fiftyDayAverage"),
+                "Moyenne 200j":     num("twoHundredDayAverage"),
+                "Market Cap":       num("marketCap"),
+                "PER (TTM)":        num("trailingPE"),
+                "Div Yield":        num("dividendYield"),
+                "Reco Analyses":    txt("recommendationKey"),
+            })
+        except Exception as e:
+            rows.append({
+                "Ticker":           ticker,
+                "Nom complet":      f"Erreur : {str(e)}",
+                "Pays":             None,
+                "Secteur":          None,
+                "Industrie":        None,
+                "Exchange":         None,
+                "Devise":           None,
+                "Prix Actuel":      None,
+                "Clôture Prec.":    None,
+                "52-sem. Bas":      None,
+                "52-sem. Haut":     None,
+                "Moyenne 50j":      None,
+                "Moyenne 200j":     None,
+                "Market Cap":       None,
+                "PER (TTM)":        None,
+                "Div Yield":        None,
+                "Reco Analyses":    None,
+            })
+    
+    dfm = pd.DataFrame(rows).set_index("Ticker")
+    return dfm
\ No newline at end of file
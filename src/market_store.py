@@ -0,0 +1,133 @@
+# market_store.py
+
+# Stockage local partagé des cotations et des données fondamentales (SQLite),
+# alimenté par le rafraîchisseur (src/refresher.py) et lu par l'application.
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from src import config
+
+class MarketStore:
+    """
+    Base SQLite partagée entre processus (mode WAL : lectures concurrentes pendant l'écriture).
+
+    Tables :
+        quotes        ticker, current_price, previous_close, change, percent_change, updated
+        fundamentals  ticker, info (JSON), updated
+        status        clé -> valeur (date du dernier rafraîchissement, ...)
+    """
+
+    def __init__(self, path=None):
+        self.path = path or config.MARKET_STORE_PATH
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS quotes (
+                    ticker TEXT PRIMARY KEY,
+                    current_price REAL, previous_close REAL, change REAL, percent_change REAL,
+                    updated REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS fundamentals (
+                    ticker TEXT PRIMARY KEY,
+                    info TEXT NOT NULL,
+                    updated REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS status (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+
+    def _connect(self):
+        # Une connexion par thread (les connexions SQLite ne se partagent pas entre threads)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def _select(self, table, columns, tickers, max_age):
+        tickers = list(tickers)
+        if not tickers:
+            return []
+        min_updated = time.time() - max_age if max_age is not None else 0
+        marks = ",".join("?" * len(tickers))
+        query = f"SELECT ticker, {columns} FROM {table} WHERE updated >= ? AND ticker IN ({marks})"
+        return self._connect().execute(query, [min_updated, *tickers]).fetchall()
+
+    def write_quotes(self, quotes):
+        """
+        Enregistre des cotations.
+
+        Args:
+            quotes (dict): ticker -> (current_price, previous_close, change, percent_change)
+        """
+        now = time.time()
+        rows = [(t, *(float(v) for v in row), now) for t, row in quotes.items()]
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO quotes VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def read_quotes(self, tickers, max_age=None):
+        """
+        Lit les cotations enregistrées.
+
+        Args:
+            tickers (list): Liste des symboles d'actions
+            max_age (float, optional): Âge maximal accepté (secondes)
+
+        Returns:
+            dict: ticker -> ndarray (current_price, previous_close, change, percent_change)
+        """
+        rows = self._select("quotes", "current_price, previous_close, change, percent_change", tickers, max_age)
+        return {r[0]: np.array(r[1:], dtype=np.float64) for r in rows}
+
+    def write_fundamentals(self, infos):
+        """
+        Enregistre des données fondamentales.
+
+        Args:
+            infos (dict): ticker -> info (dictionnaire .info)
+        """
+        now = time.time()
+        rows = [(t, json.dumps(info, default=str), now) for t, info in infos.items()]
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO fundamentals VALUES (?, ?, ?)", rows)
+
+    def read_fundamentals(self, tickers, max_age=None):
+        """
+        Lit les données fondamentales enregistrées.
+
+        Args:
+            tickers (list): Liste des symboles d'actions
+            max_age (float, optional): Âge maximal accepté (secondes)
+
+        Returns:
+            dict: ticker -> info
+        """
+        rows = self._select("fundamentals", "info", tickers, max_age)
+        return {r[0]: json.loads(r[1]) for r in rows}
+
+    def set_status(self, key, value):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO status VALUES (?, ?)", (key, str(value)))
+
+    def get_status(self, key, default=None):
+        row = self._connect().execute("SELECT value FROM status WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+_store = None
+
+def get_market_store():
+    """Renvoie le stockage de cotations partagé par le processus."""
+    global _store
+    if _store is None:
+        _store = MarketStore()
+    return _store
@@ -0,0 +1,444 @@
+# ohlcv_archive.py
+
+# Archive OHLCV projetée en mémoire : un fichier .npy (dates x tickers) par champ et par
+# segment de dates, avec index des dates et des tickers. Les lectures ne chargent que les
+# champs, lignes et colonnes demandés ; les mises à jour n'écrivent que les séances récentes.
+
+import collections.abc
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import config
+
+# Champs archivés et type de stockage : float (NaN pour les séances sans cotation) et volume
+# entier (0 sans cotation ; la présence d'une séance se lit dans Close)
+FIELD_DTYPES = {
+    "Open": np.float64,
+    "High": np.float64,
+    "Low": np.float64,
+    "Close": np.float64,
+    "Volume": np.int64,
+    "Dividends": np.float64,
+    "Stock Splits": np.float64
+}
+
+# Champs comparés à la dernière séance du segment de base pour détecter un historique réajusté
+CHECKED_FIELDS = ("Open", "Close", "Dividends", "Stock Splits")
+
+# Nombre maximal de séances du segment de fin avant fusion dans un nouveau segment de base
+TAIL_ROWS = 64
+
+def _missing(dtype):
+    """Valeur d'une séance sans cotation pour un type de stockage."""
+    return 0 if np.issubdtype(dtype, np.integer) else np.nan
+
+def _write_history(arrays, dates, col, hist):
+    """Écrit l'historique d'un ticker dans la colonne `col`, pour les lignes de `dates` qu'il couvre."""
+    rows = dates.get_indexer(hist.index.normalize())
+    keep = rows >= 0
+    for field, array in arrays.items():
+        if field in hist.columns:
+            values = hist[field].to_numpy(dtype=np.float64)[keep]
+            if np.issubdtype(array.dtype, np.integer):
+                values = np.nan_to_num(values).astype(array.dtype)
+            array[rows[keep], col] = values
+
+def _column(pieces, cols):
+    """Lit des colonnes à travers les segments (une seule lecture si un seul segment)."""
+    if len(pieces) == 1:
+        return np.asarray(pieces[0][:, cols])
+    return np.concatenate([p[:, cols] for p in pieces])
+
+class ArchiveView(collections.abc.Mapping):
+    """
+    Vue paresseuse sur l'archive, utilisable comme le dictionnaire ticker -> DataFrame
+    de get_historical_data : l'historique d'un ticker n'est lu qu'à son accès,
+    et seulement pour les champs demandés.
+
+    Attributes:
+        dates (DatetimeIndex): Jours ouvrés de la vue
+        tickers (list): Tickers présents dans la vue (au moins une cotation)
+        fields (tuple): Champs lisibles
+    """
+
+    def __init__(self, dates, tickers, positions, arrays, closes):
+        self.dates = dates
+        self.tickers = list(tickers)
+        self.fields = tuple(arrays)
+        self._selected = set(self.tickers)
+        self._positions = positions
+        # Champ -> tranches des segments (dates x tickers) ; Close indique les séances cotées
+        self._arrays = arrays
+        self._closes = closes
+
+    def __getitem__(self, ticker):
+        col = self._positions[ticker]
+        data = {f: _column(pieces, col) for f, pieces in self._arrays.items()}
+        frame = pd.DataFrame(data, index=self.dates)
+        # Jours ouvrés sans séance (fériés, avant la cotation) : lignes absentes comme dans l'historique source
+        closes = data["Close"] if "Close" in data else _column(self._closes, col)
+        return frame[~np.isnan(closes)]
+
+    def __contains__(self, ticker):
+        # Sans lecture des données (Mapping.__contains__ passerait par __getitem__)
+        return ticker in self._selected
+
+    def __iter__(self):
+        return iter(self.tickers)
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def field(self, name):
+        """
+        Lit un champ pour tous les tickers de la vue.
+
+        Returns:
+            ndarray: Tableau (dates x tickers) ; seules les colonnes de la vue sont lues
+        """
+        cols = np.array([self._positions[t] for t in self.tickers], dtype=np.intp)
+        return _column(self._arrays[name], cols)
+
+def archive_key(tickers, start_date):
+    """Identifiant d'une archive : univers de tickers (sans ordre) et date de début."""
+    raw = json.dumps([sorted(tickers), pd.Timestamp(start_date).normalize().isoformat()])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+class OHLCVArchive:
+    """
+    Archive OHLCV versionnée d'un univers de tickers (voir get_ohlcv_archive).
+
+    Une version est formée de deux segments de lignes : un segment de base (séances
+    terminées lors de sa construction) partagé par les versions successives, et un
+    segment de fin (séances récentes, dont celle en cours) réécrit à chaque mise à jour.
+    Une mise à jour n'écrit donc que les séances récentes ; le segment de base n'est
+    reconstruit que si un historique a été réajusté (division, dividende) ou si le
+    segment de fin dépasse TAIL_ROWS séances.
+
+    Arborescence :
+        <directory>/current.json            version courante et date de mise à jour (remplacée atomiquement)
+        <directory>/<version>/meta.json     dates couvertes, tickers, segments de la version
+        <directory>/<segment>/dates.npy     index des dates du segment (jours ouvrés, datetime64[ns])
+        <directory>/<segment>/<champ>.npy   valeurs (dates x tickers)
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or config.ARCHIVE_DIR
+        os.makedirs(self.directory, exist_ok=True)
+        # Version ouverte par le processus : (version, meta, dates, {champ: [memmap par segment]}, built_at)
+        self._opened = None
+        self._lock = threading.Lock()
+
+    def _pointer(self):
+        try:
+            with open(os.path.join(self.directory, "current.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _open(self):
+        """Ouvre (ou réutilise) la version courante ; None si l'archive est vide."""
+        pointer = self._pointer()
+        if pointer is None:
+            return None
+        with self._lock:
+            if self._opened is not None and self._opened[0] == pointer["version"]:
+                self._opened = self._opened[:4] + (pointer.get("built_at", self._opened[4]),)
+                return self._opened
+            try:
+                with open(os.path.join(self.directory, pointer["version"], "meta.json"), encoding="utf-8") as f:
+                    meta = json.load(f)
+                dates, arrays = [], {f: [] for f in meta["fields"]}
+                for segment in meta["segments"]:
+                    path = os.path.join(self.directory, segment)
+                    dates.append(np.load(os.path.join(path, "dates.npy")))
+                    for f in meta["fields"]:
+                        arrays[f].append(np.load(os.path.join(path, f"{f}.npy"), mmap_mode="r"))
+            except (OSError, ValueError, KeyError):
+                return self._opened
+            dates = pd.DatetimeIndex(np.concatenate(dates) if dates else np.array([], dtype="datetime64[ns]"))
+            self._opened = (pointer["version"], meta, dates, arrays, pointer.get("built_at", meta["built_at"]))
+            return self._opened
+
+    def covers(self, tickers, start_date, max_age=None):
+        """
+        Indique si l'archive contient les tickers depuis la date demandée.
+
+        Args:
+            tickers (list): Liste des symboles d'actions
+            start_date (datetime): Date de début
+            max_age (float, optional): Ancienneté maximale de la dernière mise à jour (secondes)
+        """
+        opened = self._open()
+        if opened is None:
+            return False
+        meta = opened[1]
+        if pd.Timestamp(start_date).normalize() < pd.Timestamp(meta["start"]):
+            return False
+        if max_age is not None and time.time() - opened[4] > max_age:
+            return False
+        return set(tickers) <= set(meta["tickers"])
+
+    def _new_segment(self, dates, n_tickers, in_memory=False):
+        """
+        Crée un segment rempli de valeurs manquantes.
+
+        Returns:
+            tuple: (nom du segment, {champ: tableau}) ; tableaux en mémoire si `in_memory`
+                (à enregistrer avec _save_segment), projetés sur les fichiers sinon
+        """
+        arrays = {}
+        if in_memory:
+            for field, dtype in FIELD_DTYPES.items():
+                arrays[field] = np.full((len(dates), n_tickers), _missing(dtype), dtype=dtype)
+            return None, arrays
+        name = f"{time.time_ns()}-{os.getpid()}"
+        path = os.path.join(self.directory, name)
+        os.makedirs(path)
+        np.save(os.path.join(path, "dates.npy"), dates.to_numpy(dtype="datetime64[ns]"))
+        for field, dtype in FIELD_DTYPES.items():
+            arrays[field] = np.lib.format.open_memmap(
+                os.path.join(path, f"{field}.npy"), mode="w+", dtype=dtype, shape=(len(dates), n_tickers)
+            )
+            arrays[field][:] = _missing(dtype)
+        return name, arrays
+
+    def _save_segment(self, dates, arrays):
+        """Enregistre un segment construit en mémoire ; renvoie son nom."""
+        name = f"{time.time_ns()}-{os.getpid()}"
+        path = os.path.join(self.directory, name)
+        os.makedirs(path)
+        np.save(os.path.join(path, "dates.npy"), dates.to_numpy(dtype="datetime64[ns]"))
+        for field, array in arrays.items():
+            np.save(os.path.join(path, f"{field}.npy"), array)
+        return name
+
+    def _publish(self, tickers, dates, segments, base_rows, present, previous=None):
+        """Écrit les métadonnées d'une version puis la désigne comme courante."""
+        built_at = time.time()
+        version = segments[-1]
+        meta = {
+            "start": dates[0].isoformat(),
+            "end": dates[-1].isoformat(),
+            "tickers": list(tickers),
+            "present": [t for t in tickers if t in present],
+            "fields": list(FIELD_DTYPES),
+            "segments": segments,
+            "base_rows": base_rows,
+            "built_at": built_at
+        }
+        with open(os.path.join(self.directory, version, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        self._write_pointer(version, built_at)
+        # Les segments de la version précédente restent lisibles par les processus qui l'ont ouverte
+        self._cleanup(set(segments) | set(previous[1]["segments"] if previous else ()), version)
+
+    def _write_pointer(self, version, built_at):
+        tmp = os.path.join(self.directory, f"current.json.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": version, "built_at": built_at}, f)
+        os.replace(tmp, os.path.join(self.directory, "current.json"))
+
+    def build(self, tickers, start_date, end_date, histories):
+        """
+        Construit une nouvelle version complète de l'archive, un ticker à la fois :
+        seul l'historique en cours d'écriture est en mémoire.
+
+        Args:
+            tickers (list): Tickers de l'archive (ordre des colonnes)
+            start_date (datetime): Première date
+            end_date (datetime): Dernière date
+            histories (iterable): Couples (ticker, DataFrame OHLCV), dans n'importe quel ordre
+        """
+        dates = pd.bdate_range(pd.Timestamp(start_date).normalize(), pd.Timestamp(end_date).normalize())
+        if len(dates) == 0:
+            return
+        positions = {t: i for i, t in enumerate(tickers)}
+        previous = self._open()
+
+        # Dernière séance (peut-être en cours) dans le segment de fin, les autres dans la base
+        base_dates, tail_dates = dates[:-1], dates[-1:]
+        base_name, base = self._new_segment(base_dates, len(tickers)) if len(base_dates) else (None, {})
+        _, tail = self._new_segment(tail_dates, len(tickers), in_memory=True)
+        present = set()
+        for ticker, hist in histories:
+            if hist is None or hist.empty or ticker not in positions:
+                continue
+            _write_history(base, base_dates, positions[ticker], hist)
+            _write_history(tail, tail_dates, positions[ticker], hist)
+            present.add(ticker)
+
+        for array in base.values():
+            array.flush()
+        del base
+        segments = [base_name] if base_name else []
+        segments.append(self._save_segment(tail_dates, tail))
+        self._publish(tickers, dates, segments, len(base_dates), present, previous)
+
+    @staticmethod
+    def _matches_base(base, base_dates, col, hist):
+        """Compare la dernière séance d'un historique comprise dans le segment de base à celui-ci."""
+        index = hist.index.normalize()
+        pos = np.flatnonzero(index <= base_dates[-1])[-1]
+        row = base_dates.get_indexer([index[pos]])[0]
+        if row < 0:
+            return True
+        for field in CHECKED_FIELDS:
+            if field not in hist.columns:
+                continue
+            before = float(base[field][row, col])
+            after = float(hist[field].iloc[pos])
+            if field in ("Dividends", "Stock Splits"):
+                before, after = np.nan_to_num(before), np.nan_to_num(after)
+            if not np.isclose(before, after, rtol=1e-6, equal_nan=True):
+                return False
+        return True
+
+    def update(self, tickers, start_date, end_date, histories):
+        """
+        Met à jour l'archive : seules les séances postérieures au segment de base sont
+        réécrites. Si rien n'a changé, seule la date de mise à jour est renouvelée ; si un
+        historique a été réajusté, ou si l'univers ou la date de début diffèrent, la version
+        est reconstruite.
+
+        Args:
+            tickers (list): Tickers de l'archive (ordre des colonnes)
+            start_date (datetime): Première date
+            end_date (datetime): Dernière date
+            histories (iterable): Couples (ticker, DataFrame OHLCV), dans n'importe quel ordre
+        """
+        tickers = list(tickers)
+        start = pd.Timestamp(start_date).normalize()
+        dates = pd.bdate_range(start, pd.Timestamp(end_date).normalize())
+        previous = self._open()
+        if previous is None or previous[1]["tickers"] != tickers or pd.Timestamp(previous[1]["start"]) != start:
+            return self.build(tickers, start_date, end_date, histories)
+        _, meta, old_dates, old_arrays, _ = previous
+        base_rows = meta["base_rows"]
+        if base_rows == 0 or len(dates) <= base_rows or not dates[:base_rows].equals(old_dates[:base_rows]):
+            return self.build(tickers, start_date, end_date, histories)
+
+        positions = {t: i for i, t in enumerate(tickers)}
+        base = {f: pieces[0] for f, pieces in old_arrays.items()}
+        base_dates = old_dates[:base_rows]
+        tail_dates = dates[base_rows:]
+        _, tail = self._new_segment(tail_dates, len(tickers), in_memory=True)
+        present = set(meta["present"])
+        # Historiques réajustés depuis la construction de la base (seuls conservés en mémoire)
+        revised = {}
+        for ticker, hist in histories:
+            if hist is None or hist.empty or ticker not in positions:
+                continue
+            col = positions[ticker]
+            _write_history(tail, tail_dates, col, hist)
+            in_base = (hist.index.normalize() <= base_dates[-1]).any()
+            if in_base and (ticker not in present or not self._matches_base(base, base_dates, col, hist)):
+                revised[ticker] = hist
+            present.add(ticker)
+
+        if revised or len(tail_dates) > TAIL_ROWS:
+            return self._merge(tickers, dates, base, base_rows, tail, revised, present, previous)
+
+        old_tail = {f: pieces[1] for f, pieces in old_arrays.items()} if len(meta["segments"]) > 1 else None
+        if (old_tail is not None and tail_dates.equals(old_dates[base_rows:])
+                and sorted(present) == sorted(meta["present"])
+                and all(np.array_equal(tail[f], old_tail[f], equal_nan=True) for f in tail)):
+            # Aucune séance nouvelle ni révisée : la version courante reste valable
+            self._write_pointer(previous[0], time.time())
+            return
+        self._publish(tickers, dates, [meta["segments"][0], self._save_segment(tail_dates, tail)],
+                      base_rows, present, previous)
+
+    def _merge(self, tickers, dates, base, base_rows, tail, revised, present, previous):
+        """Nouveau segment de base : ancienne base et séances terminées de la fin, historiques réajustés réécrits."""
+        new_base_dates, tail_dates = dates[:-1], dates[-1:]
+        name, merged = self._new_segment(new_base_dates, len(tickers))
+        positions = {t: i for i, t in enumerate(tickers)}
+        for field, array in merged.items():
+            array[:base_rows] = base[field]
+            array[base_rows:] = tail[field][:-1]
+        for ticker, hist in revised.items():
+            col = positions[ticker]
+            for field, array in merged.items():
+                array[:, col] = _missing(array.dtype)
+            _write_history(merged, new_base_dates, col, hist)
+        for array in merged.values():
+            array.flush()
+        del merged
+        last = self._save_segment(tail_dates, {f: a[-1:] for f, a in tail.items()})
+        self._publish(tickers, dates, [name, last], len(new_base_dates), present, previous)
+
+    def _cleanup(self, keep, current):
+        """
+        Supprime les segments antérieurs à la version courante qui ne font partie ni de
+        celle-ci ni de la précédente (les projections déjà ouvertes restent valides).
+        """
+        current_ns = int(current.split("-")[0])
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            stamp = name.split("-")[0]
+            if os.path.isdir(path) and name not in keep and stamp.isdigit() and int(stamp) < current_ns:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def view(self, tickers=None, fields=("Close",), start_date=None, end_date=None):
+        """
+        Renvoie une vue paresseuse sur l'archive (aucune donnée lue à ce stade).
+
+        Args:
+            tickers (list, optional): Tickers demandés (tous par défaut)
+            fields (tuple): Champs demandés
+            start_date (datetime, optional): Date de début incluse
+            end_date (datetime, optional): Date de fin exclue
+
+        Returns:
+            ArchiveView: Vue ticker -> DataFrame des champs demandés
+        """
+        opened = self._open()
+        if opened is None:
+            raise KeyError("Archive OHLCV vide")
+        _, meta, dates, arrays, _ = opened
+        i0 = 0 if start_date is None else dates.searchsorted(pd.Timestamp(start_date).normalize())
+        i1 = len(dates) if end_date is None else dates.searchsorted(pd.Timestamp(end_date))
+
+        def pieces(field):
+            # Tranches [i0, i1) de chaque segment
+            out, offset = [], 0
+            for array in arrays[field]:
+                lo, hi = max(i0 - offset, 0), min(i1 - offset, len(array))
+                if lo < hi:
+                    out.append(array[lo:hi])
+                offset += len(array)
+            return out or [arrays[field][0][:0]]
+
+        positions = {t: i for i, t in enumerate(meta["tickers"])}
+        present = set(meta["present"])
+        wanted = meta["tickers"] if tickers is None else tickers
+        selected = [t for t in wanted if t in present]
+        return ArchiveView(dates[i0:i1], selected, positions, {f: pieces(f) for f in fields}, pieces("Close"))
+
+_archives = {}
+_archives_lock = threading.Lock()
+
+def get_ohlcv_archive(tickers, start_date):
+    """
+    Renvoie l'archive OHLCV d'un univers et d'une date de début, partagée par le processus.
+    Chaque univers a son répertoire (<ARCHIVE_DIR>/<clé>, voir archive_key) : les appelants
+    qui suivent des univers différents (application, backtests, rafraîchisseur) ont chacun
+    leur archive.
+
+    Args:
+        tickers (list): Univers archivé
+        start_date (datetime): Première date de l'historique
+    """
+    key = archive_key(tickers, start_date)
+    with _archives_lock:
+        if key not in _archives:
+            _archives[key] = OHLCVArchive(os.path.join(config.ARCHIVE_DIR, key))
+        return _archives[key]
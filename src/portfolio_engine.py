@@ -0,0 +1,145 @@
+# portfolio_engine.py
+
+# Moteur de portefeuille vectorisé (achat initial puis conservation) sur une matrice de prix alignée
+
+import numpy as np
+import pandas as pd
+
+class PortfolioResult:
+    """
+    Résultat d'une simulation de portefeuille.
+
+    Attributes:
+        dates (DatetimeIndex): Dates de la simulation
+        tickers (list): Tickers de la matrice de prix
+        weights (ndarray): Poids cibles à l'achat (somme = 1)
+        shares (ndarray): Nombre d'actions achetées par ticker (0 si pas de prix initial)
+        invested (ndarray): Montant investi par ticker
+        total_value (Series): Valeur totale du portefeuille au fil du temps
+        initial_investment (float): Montant initial
+    """
+
+    def __init__(self, prices, weights, shares, invested, total_value, initial_investment):
+        self._prices = prices
+        self.dates = prices.dates
+        self.tickers = prices.tickers
+        self.weights = weights
+        self.shares = shares
+        self.invested = invested
+        self.total_value = total_value
+        self.initial_investment = initial_investment
+
+    @property
+    def valid(self):
+        """Masque des tickers effectivement achetés."""
+        return self.shares > 0
+
+    def position_values(self, tickers=None):
+        """
+        Valeur de chaque ligne au fil du temps (calculée à la demande).
+
+        Args:
+            tickers (list, optional): Sous-ensemble de tickers (tous les tickers achetés par défaut)
+
+        Returns:
+            DataFrame: Valeurs des positions (dates x tickers)
+        """
+        if tickers is None:
+            cols = np.flatnonzero(self.valid)
+        else:
+            cols = np.array([self._prices.position(t) for t in tickers], dtype=np.intp)
+        values = self._prices.values[:, cols] * self.shares[cols]
+        return pd.DataFrame(values, index=self.dates, columns=[self.tickers[i] for i in cols])
+
+    @property
+    def final_value(self):
+        return float(self.total_value.iloc[-1]) if len(self.total_value) else float(self.initial_investment)
+
+    @property
+    def gain_loss(self):
+        return self.final_value - self.initial_investment
+
+    @property
+    def percent_change(self):
+        return self.gain_loss / self.initial_investment * 100 if self.initial_investment else 0.0
+
+class PortfolioEngine:
+    """
+    Calcule un portefeuille acheté à la première date puis conservé,
+    en quelques opérations NumPy sur la matrice de prix.
+
+    Les montants alloués aux tickers sans prix initial ne sont pas investis
+    (comme dans la simulation historique de l'application).
+    """
+
+    def __init__(self, prices):
+        self.prices = prices
+
+    def _weights(self, weights):
+        n = len(self.prices.tickers)
+        if weights is None:
+            return np.full(n, 1.0 / n)
+        if isinstance(weights, dict):
+            weights = [weights.get(t, 0.0) for t in self.prices.tickers]
+        w = np.asarray(weights, dtype=np.float64)
+        if w.shape != (n,):
+            raise ValueError(f"{n} poids attendus, {w.size} reçus")
+        total = w.sum()
+        if total <= 0:
+            raise ValueError("La somme des poids doit être positive")
+        return w / total
+
+    def allocate(self, initial_investment, weights=None, start_date=None, end_date=None):
+        """
+        Calcule les parts achetées à la première date de la fenêtre, sans valoriser la série.
+
+        Args:
+            initial_investment (float): Montant initial
+            weights (array-like or dict, optional): Poids par ticker (équipondéré par défaut)
+            start_date (datetime, optional): Date d'achat
+            end_date (datetime, optional): Date de fin
+
+        Returns:
+            tuple: (fenêtre PriceMatrix, poids, parts, montants investis)
+        """
+        window = self.prices.window(start_date, end_date)
+        w = self._weights(weights)
+        invested = initial_investment * w
+
+        n_tickers = len(window.tickers)
+        base = window.values[0] if len(window) else np.full(n_tickers, np.nan)
+        valid = np.nan_to_num(base) > 0
+        shares = np.zeros(n_tickers)
+        shares[valid] = invested[valid] / base[valid]
+        return window, w, shares, np.where(valid, invested, 0.0)
+
+    def run(self, initial_investment, weights=None, start_date=None, end_date=None):
+        """
+        Simule l'achat des actions à la première date de la fenêtre puis leur conservation.
+
+        Args:
+            initial_investment (float): Montant initial
+            weights (array-like or dict, optional): Poids par ticker (équipondéré par défaut)
+            start_date (datetime, optional): Date d'achat
+            end_date (datetime, optional): Date de fin
+
+        Returns:
+            PortfolioResult: Parts, montants investis et valeur totale
+        """
+        window, w, shares, invested = self.allocate(initial_investment, weights, start_date, end_date)
+        valid = shares > 0
+
+        # Produit matrice-vecteur : les prix sont propagés vers l'avant, pas de NaN après l'achat
+        if valid.all():
+            total = window.values @ shares
+        else:
+            total = window.values[:, valid] @ shares[valid]
+
+        return PortfolioResult(
+            window,
+            w,
+            shares,
+            invested,
+            pd.Series(total, index=window.dates),
+            initial_investment
+        )
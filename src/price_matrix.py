@@ -0,0 +1,88 @@
+# price_matrix.py
+
+# Matrice de prix alignée (dates x tickers) : représentation unique de l'historique en mémoire
+
+import numpy as np
+import pandas as pd
+
+class PriceMatrix:
+    """
+    Clôtures alignées sur les jours ouvrés et propagées vers l'avant (ffill).
+
+    Attributes:
+        dates (DatetimeIndex): Jours ouvrés, sans fuseau horaire
+        tickers (list): Symboles des actions, dans l'ordre des colonnes
+        values (ndarray): Tableau float64 contigu de forme (len(dates), len(tickers)),
+            NaN avant la première cotation d'un ticker
+    """
+
+    def __init__(self, dates, tickers, values):
+        self.dates = pd.DatetimeIndex(dates)
+        self.tickers = list(tickers)
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self._positions = {t: i for i, t in enumerate(self.tickers)}
+
+    @classmethod
+    def from_history(cls, hist_data, start_date, end_date, field='Close'):
+        """
+        Construit la matrice à partir d'un dictionnaire d'historiques (une seule passe).
+
+        Args:
+            hist_data (dict): Dictionnaire ticker -> DataFrame d'historique
+            start_date (datetime): Date de début
+            end_date (datetime): Date de fin
+            field (str): Colonne de prix à utiliser
+
+        Returns:
+            PriceMatrix: Matrice alignée
+        """
+        dates = pd.bdate_range(pd.Timestamp(start_date).normalize(), pd.Timestamp(end_date).normalize())
+        series = {t: h[field] for t, h in hist_data.items() if h is not None and not h.empty}
+        if not series:
+            return cls(dates, [], np.empty((len(dates), 0)))
+
+        closes = pd.concat(series, axis=1)
+        # Les séances hors jours ouvrés (et les cotations antérieures) alimentent le ffill
+        closes = closes.reindex(closes.index.union(dates)).ffill().reindex(dates)
+        return cls(dates, closes.columns, closes.to_numpy(dtype=np.float64))
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def empty(self):
+        return self.values.size == 0
+
+    def position(self, ticker):
+        """Renvoie l'indice de colonne d'un ticker (None si absent)."""
+        return self._positions.get(ticker)
+
+    def column(self, ticker):
+        """Renvoie la série de prix d'un ticker (vue sur la matrice)."""
+        return self.values[:, self._positions[ticker]]
+
+    def window(self, start_date=None, end_date=None):
+        """
+        Restreint la matrice à une plage de dates (vue sans copie des prix).
+
+        Args:
+            start_date (datetime, optional): Date de début incluse
+            end_date (datetime, optional): Date de fin incluse
+
+        Returns:
+            PriceMatrix: Sous-matrice
+        """
+        i0 = 0 if start_date is None else self.dates.searchsorted(pd.Timestamp(start_date))
+        i1 = len(self.dates) if end_date is None else self.dates.searchsorted(pd.Timestamp(end_date), side='right')
+        return PriceMatrix(self.dates[i0:i1], self.tickers, self.values[i0:i1])
+
+    def first_valid_dates(self):
+        """Renvoie la première date cotée de chaque ticker (NaT si jamais coté)."""
+        valid = ~np.isnan(self.values)
+        idx = valid.argmax(axis=0)
+        firsts = np.where(valid.any(axis=0), self.dates.to_numpy()[idx], np.datetime64('NaT'))
+        return pd.DatetimeIndex(firsts)
+
+    def to_frame(self):
+        """Renvoie la matrice sous forme de DataFrame (dates x tickers)."""
+        return pd.DataFrame(self.values, index=self.dates, columns=self.tickers)
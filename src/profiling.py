@@ -0,0 +1,212 @@
+# profiling.py
+
+# Instrumentation légère des exécutions de l'application : durée, lignes traitées et
+# succès du cache des fonctions de src/ et des sections de app.py, par exécution.
+# Sans exécution en cours (start_run), les décorateurs se contentent d'appeler la fonction.
+
+import contextlib
+import contextvars
+import functools
+import json
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from src import config
+
+# Exécution en cours et sections ouvertes dans le thread ou le contexte courant
+_run = contextvars.ContextVar("profile_run", default=None)
+_stack = contextvars.ContextVar("profile_stack", default=())
+
+def count_rows(result):
+    """Nombre de lignes d'un résultat (DataFrame, matrice, dictionnaire, liste), None sinon."""
+    if hasattr(result, "shape"):
+        return int(result.shape[0]) if result.shape else None
+    if hasattr(result, "__len__") and not isinstance(result, (str, bytes, tuple)):
+        return len(result)
+    return None
+
+class Section:
+    """Mesure d'une section ; `rows` et `cache` peuvent être renseignés pendant son exécution."""
+
+    def __init__(self, name, path, depth, rows=None, cache=None):
+        self.name = name
+        self.path = path
+        self.depth = depth
+        self.rows = rows
+        self.cache = cache
+        self.wall_s = None
+
+    def to_dict(self):
+        return {"name": self.name, "path": self.path, "depth": self.depth,
+                "wall_s": self.wall_s, "rows": self.rows, "cache": self.cache}
+
+class ProfileRun:
+    """
+    Mesures d'une exécution (un rerun de app.py, un lot, un benchmark).
+
+    Args:
+        label (str, optional): Libellé de l'exécution
+    """
+
+    def __init__(self, label=None):
+        self.label = label
+        self.started_at = datetime.now()
+        self.wall_s = None
+        self.sections = []
+        self._t0 = time.perf_counter()
+        self._step = None
+
+    def _close_step(self):
+        if self._step is not None:
+            self._step.wall_s = time.perf_counter() - self._step_t0
+            self.sections.append(self._step)
+            self._step = None
+            _stack.set(())
+
+    def step(self, name, rows=None):
+        """
+        Commence une section de premier niveau qui dure jusqu'à la suivante (ou à la fin
+        de l'exécution) : instrumente un script sans le réindenter. Les fonctions et
+        sections mesurées entre-temps lui sont rattachées.
+
+        Returns:
+            Section: Mesure en cours (`rows` peut être renseigné ensuite)
+        """
+        self._close_step()
+        self._step = Section(name, name, 0, rows)
+        self._step_t0 = time.perf_counter()
+        _stack.set((self._step,))
+        return self._step
+
+    def finish(self):
+        """Termine l'exécution ; l'ajoute au journal PROFILE_LOG s'il est configuré."""
+        self._close_step()
+        self.wall_s = time.perf_counter() - self._t0
+        if _run.get() is self:
+            _run.set(None)
+        if config.PROFILE_LOG:
+            with open(config.PROFILE_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps(self.to_dict(), ensure_ascii=False) + "\n")
+        return self
+
+    def to_dict(self):
+        return {
+            "label": self.label,
+            "started_at": self.started_at.isoformat(),
+            "wall_s": self.wall_s,
+            "sections": [s.to_dict() for s in self.sections]
+        }
+
+    def to_frame(self):
+        """
+        Returns:
+            DataFrame: Une ligne par section (chemin parent/enfant), dans l'ordre de fin d'exécution
+        """
+        return pd.DataFrame(
+            [(s.path, s.depth, s.wall_s, s.rows, s.cache) for s in self.sections],
+            columns=["Section", "Niveau", "Durée (s)", "Lignes", "Cache"]
+        )
+
+    def summary(self):
+        """
+        Synthèse par section, triée par durée cumulée décroissante.
+
+        Returns:
+            DataFrame: Appels, durée cumulée, lignes traitées, succès et échecs du cache
+        """
+        df = self.to_frame()
+        return df.assign(
+            hit=df["Cache"].eq("hit"), miss=df["Cache"].eq("miss")
+        ).groupby("Section").agg(**{
+            "Appels": ("Niveau", "size"),
+            "Durée (s)": ("Durée (s)", "sum"),
+            "Lignes": ("Lignes", "sum"),
+            "Cache (succès)": ("hit", "sum"),
+            "Cache (échecs)": ("miss", "sum")
+        }).sort_values("Durée (s)", ascending=False)
+
+def start_run(label=None):
+    """Commence une exécution mesurée dans le contexte courant et la renvoie."""
+    run = ProfileRun(label)
+    _run.set(run)
+    _stack.set(())
+    return run
+
+def current_run():
+    """Exécution mesurée en cours, None sinon."""
+    return _run.get()
+
+def step(name, rows=None):
+    """Commence une section de premier niveau de l'exécution en cours (voir ProfileRun.step)."""
+    run = _run.get()
+    return None if run is None else run.step(name, rows)
+
+@contextlib.contextmanager
+def section(name, rows=None):
+    """
+    Mesure un bloc de code dans l'exécution en cours.
+
+    Args:
+        name (str): Nom de la section
+        rows (int, optional): Lignes traitées (modifiable via l'objet produit)
+
+    Yields:
+        Section: Mesure en cours (None hors exécution mesurée)
+    """
+    run = _run.get()
+    if run is None:
+        yield None
+        return
+    stack = _stack.get()
+    current = Section(name, "/".join([s.name for s in stack] + [name]), len(stack), rows)
+    token = _stack.set(stack + (current,))
+    t0 = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.wall_s = time.perf_counter() - t0
+        _stack.reset(token)
+        run.sections.append(current)
+
+def profiled(name=None, rows=count_rows, cached=False):
+    """
+    Décorateur : mesure chaque appel de la fonction dans l'exécution en cours.
+
+    Args:
+        name (str, optional): Nom de la section (module.fonction par défaut)
+        rows (callable, optional): Nombre de lignes traitées à partir du résultat
+        cached (bool): Fonction mise en cache (st.cache_data) : l'appel est compté comme
+            un succès du cache sauf si le corps de la fonction, marqué par cache_miss, s'exécute
+    """
+    def decorator(fn):
+        label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _run.get() is None:
+                return fn(*args, **kwargs)
+            with section(label) as current:
+                if cached:
+                    current.cache = "hit"
+                result = fn(*args, **kwargs)
+                if rows is not None:
+                    current.rows = rows(result)
+                return result
+        return wrapper
+    return decorator
+
+def cache_miss(fn):
+    """Décorateur du corps d'une fonction en cache : signale à la section englobante un échec du cache."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        stack = _stack.get()
+        if stack:
+            stack[-1].cache = "miss"
+        return fn(*args, **kwargs)
+    return wrapper
+
+def runs_to_json(runs):
+    """Exporte une liste d'exécutions en JSON (suivi des tendances)."""
+    return json.dumps([run.to_dict() for run in runs], ensure_ascii=False, indent=2)
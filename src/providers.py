@@ -0,0 +1,284 @@
+# providers.py
+
+# Fournisseurs de données de marché interchangeables (yfinance, rejeu hors-ligne, synthétique)
+
+import json
+import os
+import re
+import zlib
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from src import config
+from src.synthetic_market import SECTORS, SyntheticMarket, sector_of
+from src.stock_utils import get_country_from_ticker, determine_currency, get_exchange_name
+
+def period_start(period, end=None):
+    """
+    Convertit une période yfinance ("2d", "5d", "1mo", "1y", "ytd", "max") en date de début.
+
+    Args:
+        period (str): Période au format yfinance
+        end (datetime, optional): Date de fin (aujourd'hui par défaut)
+
+    Returns:
+        datetime: Date de début correspondante (None pour "max")
+    """
+    end = end or datetime.now()
+    if period == "max":
+        return None
+    if period == "ytd":
+        return datetime(end.year, 1, 1)
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if not match:
+        raise ValueError(f"Période non reconnue : {period}")
+    n, unit = int(match.group(1)), match.group(2)
+    if unit == "d":
+        # Les périodes en jours comptent des séances, pas des jours calendaires
+        return (pd.Timestamp(end) - pd.offsets.BDay(n)).to_pydatetime()
+    days = {"wk": 7, "mo": 31, "y": 366}[unit]
+    return end - timedelta(days=n * days)
+
+def _slice_history(hist, start=None, end=None, period=None):
+    """Restreint un historique complet à la fenêtre demandée (même convention que yfinance : fin exclue)."""
+    if start is None and period is not None:
+        start = period_start(period, end)
+    if start is not None:
+        hist = hist[hist.index >= pd.Timestamp(start).normalize()]
+    if end is not None:
+        hist = hist[hist.index < pd.Timestamp(end)]
+    return hist
+
+class MarketDataProvider:
+    """
+    Interface commune des fournisseurs de données de marché.
+
+    Les historiques renvoyés ont un index de dates sans fuseau horaire
+    et les colonnes de yfinance (Open, High, Low, Close, Volume, ...).
+    """
+    name = "base"
+
+    def get_info(self, ticker):
+        """Renvoie le dictionnaire de fondamentaux (équivalent de yf.Ticker(ticker).info)."""
+        raise NotImplementedError
+
+    def get_history(self, ticker, start=None, end=None, period=None):
+        """Renvoie l'historique OHLCV d'un ticker sur la fenêtre demandée."""
+        raise NotImplementedError
+
+    def download_closes(self, tickers, period="5d"):
+        """
+        Renvoie les clôtures d'un lot de tickers (dates x tickers).
+        Implémentation par défaut : un appel get_history par ticker.
+        """
+        closes = {}
+        for ticker in tickers:
+            try:
+                hist = self.get_history(ticker, period=period)
+            except Exception:
+                continue
+            if not hist.empty:
+                closes[ticker] = hist['Close']
+        return pd.DataFrame(closes)
+
+class YFinanceProvider(MarketDataProvider):
+    """Données en direct via l'API yfinance."""
+    name = "yfinance"
+
+    def get_info(self, ticker):
+        return yf.Ticker(ticker).info
+
+    def get_history(self, ticker, start=None, end=None, period=None):
+        if start is None and period is not None:
+            hist = yf.Ticker(ticker).history(period=period)
+        else:
+            hist = yf.Ticker(ticker).history(start=start, end=end)
+        if not hist.empty:
+            hist.index = hist.index.tz_localize(None)
+        return hist
+
+    def download_closes(self, tickers, period="5d"):
+        raw = yf.download(
+            tickers,
+            period=period,
+            interval="1d",
+            group_by="column",
+            auto_adjust=False,
+            progress=False,
+            threads=False
+        )
+        if raw is None or raw.empty:
+            return pd.DataFrame()
+
+        closes = raw['Close']
+        # Un seul ticker : yfinance peut renvoyer une Series
+        if isinstance(closes, pd.Series):
+            closes = closes.to_frame(name=tickers[0])
+        closes.index = closes.index.tz_localize(None)
+        return closes
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Rejoue des données enregistrées sur disque, sans accès réseau.
+
+    Arborescence :
+        <directory>/info/<TICKER>.json     fondamentaux
+        <directory>/history/<TICKER>.csv   historique OHLCV complet
+    """
+    name = "replay"
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._history_cache = {}
+
+    def _path(self, kind, ticker):
+        ext = "json" if kind == "info" else "csv"
+        return os.path.join(self.directory, kind, f"{ticker}.{ext}")
+
+    def get_info(self, ticker):
+        path = self._path("info", ticker)
+        if not os.path.exists(path):
+            raise KeyError(f"Aucune donnée enregistrée pour {ticker}")
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _full_history(self, ticker):
+        if ticker not in self._history_cache:
+            path = self._path("history", ticker)
+            if not os.path.exists(path):
+                raise KeyError(f"Aucun historique enregistré pour {ticker}")
+            self._history_cache[ticker] = pd.read_csv(path, index_col=0, parse_dates=True)
+        return self._history_cache[ticker]
+
+    def get_history(self, ticker, start=None, end=None, period=None):
+        return _slice_history(self._full_history(ticker), start, end, period).copy()
+
+class RecordingProvider(MarketDataProvider):
+    """Délègue à un autre fournisseur et enregistre chaque réponse au format de ReplayProvider."""
+    name = "record"
+
+    def __init__(self, inner, directory):
+        self.inner = inner
+        self.directory = directory
+        self._replay = ReplayProvider(directory)
+        os.makedirs(os.path.join(directory, "info"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "history"), exist_ok=True)
+
+    def get_info(self, ticker):
+        info = self.inner.get_info(ticker)
+        with open(self._replay._path("info", ticker), "w", encoding="utf-8") as f:
+            json.dump(info, f, default=str)
+        return info
+
+    def get_history(self, ticker, start=None, end=None, period=None):
+        hist = self.inner.get_history(ticker, start, end, period)
+        if not hist.empty:
+            # Fusion avec l'existant pour que la couverture enregistrée ne fasse que s'étendre
+            try:
+                previous = self._replay._full_history(ticker)
+                merged = pd.concat([previous, hist])
+                merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+            except KeyError:
+                merged = hist
+            merged.to_csv(self._replay._path("history", ticker))
+            self._replay._history_cache[ticker] = merged
+        return hist
+
+class SyntheticProvider(MarketDataProvider):
+    """
+    Données de marché synthétiques déterministes (voir src/synthetic_market.py : séries
+    corrélées par un facteur de marché et des facteurs sectoriels).
+    Une même graine produit toujours les mêmes séries, sans aucun accès réseau.
+    """
+    name = "synthetic"
+
+    SECTORS = SECTORS
+
+    def __init__(self, seed=0, start=datetime(2015, 1, 1)):
+        self.seed = seed
+        self.start = start
+        self.market = SyntheticMarket(seed, start)
+        self._history_cache = {}
+
+    def _rng(self, ticker):
+        return np.random.default_rng([self.seed, zlib.crc32(ticker.encode("utf-8"))])
+
+    def preload(self, tickers):
+        """Génère en un seul panel vectorisé les historiques des tickers absents du cache."""
+        today = pd.Timestamp.today().normalize()
+        missing = [t for t in tickers if self._history_cache.get(t, (None,))[0] != today]
+        if missing:
+            for ticker, hist in self.market.frames(missing, today).items():
+                self._history_cache[ticker] = (today, hist)
+
+    def _full_history(self, ticker):
+        self.preload([ticker])
+        return self._history_cache[ticker][1]
+
+    def get_history(self, ticker, start=None, end=None, period=None):
+        return _slice_history(self._full_history(ticker), start, end, period).copy()
+
+    def get_info(self, ticker):
+        rng = self._rng(ticker)
+        closes = self._full_history(ticker)['Close']
+        last_year = closes.iloc[-252:]
+        price = float(closes.iloc[-1])
+        eps = price / rng.uniform(8, 40)
+        return {
+            'longName': ticker,
+            'sector': sector_of(ticker),
+            'industry': "Non disponible",
+            'country': get_country_from_ticker(ticker),
+            'exchange': get_exchange_name(ticker),
+            'currency': determine_currency(ticker),
+            'currentPrice': price,
+            'previousClose': float(closes.iloc[-2]),
+            'fiftyTwoWeekLow': float(last_year.min()),
+            'fiftyTwoWeekHigh': float(last_year.max()),
+            'fiftyDayAverage': float(closes.iloc[-50:].mean()),
+            'twoHundredDayAverage': float(closes.iloc[-200:].mean()),
+            'marketCap': float(rng.uniform(1e9, 5e11)),
+            'trailingPE': price / eps,
+            'trailingEps': eps,
+            'dividendYield': float(rng.uniform(0, 4)),
+            'recommendationKey': "hold"
+        }
+
+_provider = None
+
+def create_provider(kind=None):
+    """
+    Instancie le fournisseur demandé.
+
+    Args:
+        kind (str, optional): "yfinance", "replay", "record" ou "synthetic"
+            (par défaut config.DATA_PROVIDER)
+
+    Returns:
+        MarketDataProvider: Fournisseur de données
+    """
+    kind = kind or config.DATA_PROVIDER
+    if kind == "yfinance":
+        return YFinanceProvider()
+    if kind == "replay":
+        return ReplayProvider(config.REPLAY_DIR)
+    if kind == "record":
+        return RecordingProvider(YFinanceProvider(), config.REPLAY_DIR)
+    if kind == "synthetic":
+        return SyntheticProvider(seed=config.SYNTHETIC_SEED)
+    raise ValueError(f"Fournisseur de données inconnu : {kind}")
+
+def get_provider():
+    """Renvoie le fournisseur actif (créé à la première utilisation selon la configuration)."""
+    global _provider
+    if _provider is None:
+        _provider = create_provider()
+    return _provider
+
+def set_provider(provider):
+    """Remplace le fournisseur actif (benchmarks, exécution hors-ligne)."""
+    global _provider
+    _provider = provider
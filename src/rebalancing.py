@@ -0,0 +1,213 @@
+# rebalancing.py
+
+# Simulation de rééquilibrage (calendrier mensuel/trimestriel ou bande de dérive)
+# avec coûts de transaction et suivi de la rotation du portefeuille.
+
+import numpy as np
+import pandas as pd
+
+from src.profiling import profiled
+
+# Fréquences de rééquilibrage calendaire : mois autorisés pour le premier jour ouvré du mois
+FREQUENCIES = {
+    "monthly": tuple(range(1, 13)),
+    "quarterly": (1, 4, 7, 10),
+    "annually": (1,)
+}
+
+# Nombre de séances évaluées d'un bloc pour la détection de dérive
+DRIFT_BLOCK = 64
+
+def schedule_mask(dates, frequency):
+    """
+    Marque le premier jour ouvré de chaque période de rééquilibrage.
+
+    Args:
+        dates (DatetimeIndex): Dates de la simulation
+        frequency (str): "monthly", "quarterly", "annually" ou None
+
+    Returns:
+        ndarray: Masque booléen (jamais vrai à la première date, jour d'achat)
+    """
+    mask = np.zeros(len(dates), dtype=bool)
+    if frequency is None or len(dates) < 2:
+        return mask
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Fréquence de rééquilibrage inconnue : {frequency}")
+    months = dates.month.to_numpy()
+    mask[1:] = (months[1:] != months[:-1]) & np.isin(months[1:], FREQUENCIES[frequency])
+    return mask
+
+class RebalanceResult:
+    """
+    Résultat d'une simulation avec rééquilibrage.
+
+    Attributes:
+        total_value (Series): Valeur du portefeuille après coûts
+        turnover (Series): Rotation de chaque rééquilibrage (montant échangé / valeur)
+        costs (Series): Coûts de transaction de chaque rééquilibrage
+        tickers (list): Tickers investis (prix valide à la date d'achat)
+        initial_investment (float): Montant initial
+    """
+
+    def __init__(self, total_value, turnover, costs, tickers, initial_investment):
+        self.total_value = total_value
+        self.turnover = turnover
+        self.costs = costs
+        self.tickers = tickers
+        self.initial_investment = initial_investment
+
+    @property
+    def n_rebalances(self):
+        return len(self.turnover)
+
+    @property
+    def total_costs(self):
+        return float(self.costs.sum())
+
+    @property
+    def total_turnover(self):
+        return float(self.turnover.sum())
+
+    @property
+    def final_value(self):
+        return float(self.total_value.iloc[-1]) if len(self.total_value) else float(self.initial_investment)
+
+    @property
+    def gain_loss(self):
+        return self.final_value - self.initial_investment
+
+    @property
+    def percent_change(self):
+        return self.gain_loss / self.initial_investment * 100 if self.initial_investment else 0.0
+
+def simulate_rebalancing(prices, initial_investment, frequency=None, drift_threshold=None,
+                         cost_bps=10.0, weights=None, start_date=None, end_date=None):
+    """
+    Simule un portefeuille rééquilibré vers ses poids cibles.
+
+    Entre deux rééquilibrages le nombre d'actions est constant : la valeur d'un
+    segment est un seul produit matrice-vecteur et la dérive des poids est
+    évaluée en bloc sur le segment. Seul l'état courant (parts, valeur) est
+    conservé d'un segment à l'autre.
+
+    Args:
+        prices (PriceMatrix): Matrice des clôtures alignées
+        initial_investment (float): Montant initial
+        frequency (str, optional): "monthly", "quarterly", "annually" (None : pas de calendrier)
+        drift_threshold (float, optional): Écart relatif maximal d'un poids à sa cible
+            (0.25 : rééquilibrage dès qu'une ligne dépasse sa cible de ±25 %)
+        cost_bps (float): Coût de transaction en points de base du montant échangé
+        weights (array-like, optional): Poids cibles (équipondéré par défaut)
+        start_date (datetime, optional): Date d'achat
+        end_date (datetime, optional): Date de fin
+
+    Returns:
+        RebalanceResult: Valeur du portefeuille, rotation et coûts
+    """
+    window = prices.window(start_date, end_date)
+    n_dates = len(window)
+    if n_dates == 0:
+        empty = pd.Series(dtype=np.float64)
+        return RebalanceResult(empty, empty, empty, [], initial_investment)
+
+    # Univers investi : tickers avec un prix à la date d'achat, poids renormalisés
+    base = window.values[0]
+    valid = np.nan_to_num(base) > 0
+    target = np.full(len(window.tickers), 1.0) if weights is None else np.asarray(weights, dtype=np.float64)
+    target = target[valid] / target[valid].sum()
+    px = window.values[:, valid]
+    tickers = [t for t, ok in zip(window.tickers, valid) if ok]
+
+    cost_rate = cost_bps / 10_000
+    shares = initial_investment * target / px[0]
+    total = np.empty(n_dates)
+    total[0] = initial_investment
+
+    scheduled = np.flatnonzero(schedule_mask(window.dates, frequency))
+    rebalance_idx, turnover, costs = [], [], []
+
+    start = 1
+    while start < n_dates:
+        # Prochaine date calendaire (ou fin de la fenêtre)
+        k = np.searchsorted(scheduled, start)
+        stop = scheduled[k] if k < len(scheduled) else n_dates
+
+        end = min(stop + 1, n_dates)
+        if drift_threshold is not None:
+            # Dérive évaluée par blocs : le coût reste proportionnel à la longueur du segment
+            block_start = start
+            while block_start < end:
+                block_end = min(block_start + DRIFT_BLOCK, end)
+                positions = px[block_start:block_end] * shares
+                drift = np.abs(positions / positions.sum(axis=1, keepdims=True) / target - 1).max(axis=1)
+                breaches = np.flatnonzero(drift > drift_threshold)
+                if len(breaches):
+                    stop = block_start + breaches[0]
+                    end = stop + 1
+                    break
+                block_start = block_end
+
+        total[start:end] = px[start:end] @ shares
+        if stop >= n_dates:
+            break
+
+        # Rééquilibrage aux prix du jour, coûts déduits de la valeur
+        value = total[stop]
+        traded = np.abs(value * target - shares * px[stop]).sum()
+        cost = traded * cost_rate
+        shares = (value - cost) * target / px[stop]
+        total[stop] = value - cost
+
+        rebalance_idx.append(stop)
+        turnover.append(traded / value)
+        costs.append(cost)
+        start = stop + 1
+
+    reb_dates = window.dates[rebalance_idx]
+    return RebalanceResult(
+        pd.Series(total, index=window.dates),
+        pd.Series(turnover, index=reb_dates, dtype=np.float64),
+        pd.Series(costs, index=reb_dates, dtype=np.float64),
+        tickers,
+        initial_investment
+    )
+
+# Stratégies comparées dans l'application : (libellé, fréquence, seuil de dérive)
+STRATEGIES = [
+    ("Achat-conservation", None, None),
+    ("Mensuel", "monthly", None),
+    ("Trimestriel", "quarterly", None),
+    ("Bande de dérive ±25 %", None, 0.25)
+]
+
+@profiled()
+def compare_strategies(prices, initial_investment, start_date=None, end_date=None, cost_bps=10.0):
+    """
+    Compare les stratégies de rééquilibrage équipondérées sur la même fenêtre.
+
+    Args:
+        prices (PriceMatrix): Matrice des clôtures alignées
+        initial_investment (float): Montant initial
+        start_date (datetime, optional): Date d'achat
+        end_date (datetime, optional): Date de fin
+        cost_bps (float): Coût de transaction en points de base
+
+    Returns:
+        DataFrame: Une ligne par stratégie (valeur finale, performance, rotation, coûts)
+    """
+    rows = []
+    for label, frequency, drift_threshold in STRATEGIES:
+        result = simulate_rebalancing(
+            prices, initial_investment, frequency=frequency, drift_threshold=drift_threshold,
+            cost_bps=cost_bps, start_date=start_date, end_date=end_date
+        )
+        rows.append({
+            "Stratégie": label,
+            "Valeur finale (€)": result.final_value,
+            "Performance (%)": result.percent_change,
+            "Rééquilibrages": result.n_rebalances,
+            "Rotation cumulée (%)": result.total_turnover * 100,
+            "Coûts (€)": result.total_costs
+        })
+    return pd.DataFrame(rows)
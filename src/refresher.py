@@ -0,0 +1,154 @@
+# refresher.py
+
+# Rafraîchisseur autonome : télécharge périodiquement cotations, historiques et données
+# fondamentales dans le stockage local partagé, indépendamment des exécutions Streamlit.
+#
+# Utilisation :
+#     python -m src.refresher                # boucle continue
+#     python -m src.refresher --once         # un seul passage complet
+# puis lancer l'application avec KOMOREBI_USE_REFRESHER=1.
+
+import argparse
+import sys
+import time
+import traceback
+from datetime import datetime
+
+import pandas as pd
+
+from src import config
+from src.market_data import load_portfolio, download_quotes, fetch_fundamentals
+from src.fetch_scheduler import get_scheduler, get_fetch_metrics
+from src.history_store import get_history_store
+from src.market_store import get_market_store
+from src.ohlcv_archive import get_ohlcv_archive
+from src.price_matrix import PriceMatrix
+from src.providers import get_provider
+from src.snapshot import get_snapshot_store, snapshot_key
+
+def refresh_quotes(tickers):
+    """
+    Télécharge les cotations et les enregistre.
+
+    Returns:
+        int: Nombre de cotations enregistrées
+    """
+    fetched = download_quotes(list(tickers))
+    quotes = {t: row for t, (row, error) in fetched.items() if error is None}
+    store = get_market_store()
+    store.write_quotes(quotes)
+    store.set_status("quotes_updated", datetime.now().isoformat())
+    return len(quotes)
+
+def refresh_fundamentals(tickers):
+    """
+    Télécharge les données fondamentales (.info) et les enregistre.
+
+    Returns:
+        int: Nombre de tickers enregistrés
+    """
+    fetched = fetch_fundamentals(list(tickers))
+    infos = {t: info for t, (info, error) in fetched.items() if error is None}
+    store = get_market_store()
+    store.write_fundamentals(infos)
+    store.set_status("fundamentals_updated", datetime.now().isoformat())
+    return len(infos)
+
+def refresh_history(tickers, start_date):
+    """
+    Complète les historiques stockés (seules les séances manquantes sont téléchargées).
+
+    Returns:
+        int: Nombre d'historiques mis à jour
+    """
+    provider = get_provider()
+    history = get_history_store()
+    results = get_scheduler().map(lambda t: history.update(t, provider, start_date), tickers)
+    get_market_store().set_status("history_updated", datetime.now().isoformat())
+    return sum(1 for hist, error in results if error is None and hist is not None and not hist.empty)
+
+def refresh_archive(tickers, start_date):
+    """Met à jour l'archive OHLCV projetée en mémoire à partir des historiques stockés."""
+    history = get_history_store()
+    histories = ((t, history.read(t, start_date)) for t in tickers)
+    get_ohlcv_archive(tickers, start_date).update(tickers, start_date, datetime.now(), histories)
+
+def publish_snapshot(tickers, start_date):
+    """Publie l'instantané de la matrice de prix lu par les sessions de l'application."""
+    end_date = datetime.now()
+    closes = get_ohlcv_archive(tickers, start_date).view(tickers, ("Close",), start_date)
+    prices = PriceMatrix.from_history(dict(closes), start_date, end_date)
+    get_snapshot_store().publish(snapshot_key(tickers, start_date), prices)
+
+def _log(message):
+    print(f"[{datetime.now():%H:%M:%S}] {message}", flush=True)
+
+def run(tickers, start_date, interval=None, slow_interval=None, once=False):
+    """
+    Boucle de rafraîchissement : cotations à chaque passage, historiques et
+    fondamentaux tous les `slow_interval` secondes. Une erreur (fournisseur, stockage)
+    est journalisée et n'interrompt pas la boucle : le passage lent raté est retenté
+    au passage suivant.
+
+    Args:
+        tickers (list): Liste des symboles d'actions
+        start_date (datetime): Début des historiques conservés
+        interval (float, optional): Intervalle entre deux passages (secondes)
+        slow_interval (float, optional): Intervalle des historiques et fondamentaux (secondes)
+        once (bool): Un seul passage complet
+
+    Returns:
+        bool: Avec `once`, True si le passage s'est déroulé sans erreur
+    """
+    interval = config.REFRESH_INTERVAL if interval is None else interval
+    slow_interval = config.REFRESH_SLOW_INTERVAL if slow_interval is None else slow_interval
+    last_slow = None
+
+    while True:
+        t0 = time.monotonic()
+        parts = []
+        failed = False
+        try:
+            parts.append(f"{refresh_quotes(tickers)} cotations")
+        except Exception:
+            failed = True
+            _log(f"Échec du rafraîchissement des cotations :\n{traceback.format_exc()}")
+        if last_slow is None or t0 - last_slow >= slow_interval:
+            try:
+                n_history = refresh_history(tickers, start_date)
+                n_info = refresh_fundamentals(tickers)
+                refresh_archive(tickers, start_date)
+                publish_snapshot(tickers, start_date)
+                last_slow = t0
+                parts += [f"{n_history} historiques", f"{n_info} fiches"]
+            except Exception:
+                failed = True
+                _log(f"Échec du rafraîchissement des historiques et fondamentaux :\n{traceback.format_exc()}")
+        elapsed = time.monotonic() - t0
+        metrics = get_fetch_metrics()
+        _log(f"{', '.join(parts) or 'aucune donnée'} en {elapsed:.1f}s "
+             f"(erreurs {metrics['error_rate']:.0%}, p95 {metrics['latency_p95_s']:.2f}s)")
+        if once:
+            return not failed
+        time.sleep(max(0.0, interval - elapsed))
+
+def main():
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Rafraîchit le stockage local des données de marché")
+    parser.add_argument("--start", default="2023-01-05", help="Début des historiques conservés")
+    parser.add_argument("--interval", type=float, default=None, help="Intervalle des cotations (s)")
+    parser.add_argument("--slow-interval", type=float, default=None, help="Intervalle des historiques et fondamentaux (s)")
+    parser.add_argument("--once", action="store_true", help="Un seul passage puis arrêt")
+    args = parser.parse_args()
+
+    tickers = load_portfolio()["ticker"].tolist()
+    start_date = pd.Timestamp(args.start).to_pydatetime()
+    try:
+        ok = run(tickers, start_date, args.interval, args.slow_interval, args.once)
+    except KeyboardInterrupt:
+        return
+    if args.once and not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
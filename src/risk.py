@@ -0,0 +1,106 @@
+# risk.py
+
+# Indicateurs de risque vectorisés sur la matrice de prix : volatilité annualisée, perte maximale,
+# ratios de Sharpe et de Sortino, bêta et corrélation avec des indices de référence.
+# Toutes les colonnes (valeurs, portefeuille) sont traitées ensemble, en une passe sur les rendements.
+
+import numpy as np
+import pandas as pd
+
+from src import config
+
+# Séances par an (annualisation des rendements quotidiens)
+TRADING_DAYS = 252
+
+PORTFOLIO_LABEL = "Portefeuille"
+
+def _aligned(series, dates):
+    """Prix d'une série réindexés sur les dates de la matrice (propagés vers l'avant)."""
+    series = series.copy()
+    series.index = pd.DatetimeIndex(series.index).tz_localize(None).normalize()
+    series = series[~series.index.duplicated(keep='last')]
+    return series.reindex(series.index.union(dates)).ffill().reindex(dates).to_numpy(dtype=np.float64)
+
+def risk_metrics(prices, benchmarks=None, portfolio=None, risk_free_rate=None, periods_per_year=TRADING_DAYS):
+    """
+    Calcule les indicateurs de risque de toutes les valeurs (et du portefeuille) en une passe.
+
+    Args:
+        prices (PriceMatrix): Matrice des clôtures (dates x tickers)
+        benchmarks (dict, optional): Nom -> Series de prix de l'indice de référence
+        portfolio (Series, optional): Valeur du portefeuille, ajoutée en première ligne
+        risk_free_rate (float, optional): Taux sans risque annuel (config.RISK_FREE_RATE par défaut)
+        periods_per_year (int): Périodes par an
+
+    Returns:
+        DataFrame: Une ligne par valeur ; volatilité et perte maximale en %, Sharpe, Sortino,
+            puis bêta et corrélation pour chaque indice
+    """
+    rf = config.RISK_FREE_RATE if risk_free_rate is None else risk_free_rate
+    benchmarks = benchmarks or {}
+    labels = list(prices.tickers)
+    levels = prices.values
+    if portfolio is not None:
+        labels = [PORTFOLIO_LABEL] + labels
+        levels = np.column_stack([_aligned(portfolio, prices.dates), levels])
+
+    columns = ["Volatilité (%)", "Drawdown max (%)", "Sharpe", "Sortino"]
+    for name in benchmarks:
+        columns += [f"Bêta {name}", f"Corrélation {name}"]
+    if len(levels) < 2 or not labels:
+        return pd.DataFrame(np.nan, index=labels, columns=columns)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Rendements quotidiens ; NaN avant la première cotation, masqués ensuite par des zéros
+        returns = levels[1:] / levels[:-1] - 1
+        valid = np.isfinite(returns)
+        r = np.where(valid, returns, 0.0)
+        m = valid.astype(np.float64)
+        n = m.sum(axis=0)
+
+        mean = r.sum(axis=0) / n
+        var = ((r - mean) ** 2 * m).sum(axis=0) / (n - 1)
+        vol = np.sqrt(var * periods_per_year)
+        excess = mean * periods_per_year - rf
+        downside = np.sqrt((np.minimum(r, 0.0) ** 2).sum(axis=0) / n * periods_per_year)
+
+        # Perte maximale depuis le plus haut précédent (les NaN initiaux sont ignorés par fmax)
+        peaks = np.fmax.accumulate(levels, axis=0)
+        drawdown = np.nanmin(np.where(np.isnan(levels), 0.0, levels / peaks - 1), axis=0)
+
+        data = {
+            "Volatilité (%)": vol * 100,
+            "Drawdown max (%)": drawdown * 100,
+            "Sharpe": excess / vol,
+            "Sortino": excess / downside
+        }
+
+        if benchmarks:
+            # Moments croisés de toutes les colonnes avec tous les indices : produits matriciels
+            # sur les séances où la valeur et l'indice cotent tous deux
+            bench_levels = np.column_stack([_aligned(s, prices.dates) for s in benchmarks.values()])
+            bench_returns = bench_levels[1:] / bench_levels[:-1] - 1
+            b_valid = np.isfinite(bench_returns)
+            b = np.where(b_valid, bench_returns, 0.0)
+            bm = b_valid.astype(np.float64)
+
+            # Seconde passe centrée (deux passes corrigées) : rendements centrés sur la moyenne de
+            # chaque colonne, puis correction par l'écart à la moyenne des séances communes
+            # (petit terme) ; évite la différence de grands termes de E[x²] - E[x]²
+            rc = np.where(valid, r - mean, 0.0)
+            b_mean = b.sum(axis=0) / bm.sum(axis=0)
+            bc = np.where(b_valid, b - b_mean, 0.0)
+            n_xy = bm.T @ m
+            sx = bm.T @ rc
+            sy = bc.T @ m
+            cov = (bc.T @ rc - sx * sy / n_xy) / n_xy
+            var_x = (bm.T @ (rc * rc) - sx ** 2 / n_xy) / n_xy
+            var_y = ((bc * bc).T @ m - sy ** 2 / n_xy) / n_xy
+            beta = cov / var_y
+            corr = cov / np.sqrt(var_x * var_y)
+            for k, name in enumerate(benchmarks):
+                data[f"Bêta {name}"] = beta[k]
+                data[f"Corrélation {name}"] = corr[k]
+
+    df = pd.DataFrame(data, index=labels, columns=columns)
+    return df.replace([np.inf, -np.inf], np.nan)
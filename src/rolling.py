@@ -0,0 +1,346 @@
+# rolling.py
+
+# Statistiques glissantes (rendement, volatilité annualisée, corrélation à un indice) sur 30, 90
+# et 252 séances, pour le portefeuille et chaque valeur. Les séries complètes sont obtenues par
+# sommes cumulées sur la matrice des prix ; une nouvelle séance met à jour les sommes de la
+# dernière fenêtre de chaque durée (ajout du rendement entrant, retrait du sortant) en O(tickers).
+
+import collections
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.portfolio_engine import PortfolioEngine
+from src.profiling import profiled
+from src.risk import TRADING_DAYS, PORTFOLIO_LABEL
+
+# Durées des fenêtres glissantes (séances)
+WINDOWS = (30, 90, 252)
+
+STATS = ("Rendement (%)", "Volatilité (%)", "Corrélation")
+
+def _moments(returns, bench):
+    """
+    Contributions de rendements aux sommes glissantes (première dimension) :
+    effectif, somme, somme des carrés sur les séances cotées ; puis, sur les séances
+    où l'indice cote aussi, effectif, sommes et produits croisés valeur / indice.
+    """
+    valid = np.isfinite(returns)
+    joint = valid & np.isfinite(bench)
+    r = np.where(valid, returns, 0.0)
+    rj = np.where(joint, returns, 0.0)
+    bj = np.where(joint, bench, 0.0)
+    return np.stack([valid, r, r * r, joint, rj, rj * rj, bj, bj * bj, rj * bj]).astype(np.float64)
+
+def _stats(sums, window, periods_per_year):
+    """Volatilité annualisée (%) et corrélation à partir des sommes d'une fenêtre complète."""
+    n, s, ss, nj, sx, sxx, sb, sbb, sxb = sums
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var = (ss - s * s / n) / (n - 1)
+        vol = np.where(n >= window, np.sqrt(np.maximum(var, 0.0) * periods_per_year) * 100, np.nan)
+        cov = sxb - sx * sb / nj
+        denom = np.sqrt((sxx - sx * sx / nj) * (sbb - sb * sb / nj))
+        corr = np.where((nj >= window) & (denom > 0), cov / denom, np.nan)
+    return vol, corr
+
+class RollingStats:
+    """
+    Statistiques glissantes de colonnes de prix alignées (propagés vers l'avant, NaN avant
+    la première cotation), avec mise à jour incrémentale à chaque nouvelle séance.
+
+    Args:
+        dates (DatetimeIndex): Dates des lignes
+        values (ndarray): Prix (dates x colonnes)
+        labels (list): Libellé de chaque colonne
+        benchmark (ndarray, optional): Prix de l'indice de référence aux mêmes dates
+        windows (tuple): Durées des fenêtres (séances)
+        periods_per_year (int): Périodes par an (annualisation de la volatilité)
+    """
+
+    def __init__(self, dates, values, labels, benchmark=None, windows=WINDOWS, periods_per_year=TRADING_DAYS):
+        self.labels = list(labels)
+        self.windows = tuple(windows)
+        self.periods_per_year = periods_per_year
+        self._dates = [pd.DatetimeIndex(dates)]
+        values = np.asarray(values, dtype=np.float64)
+        bench = np.full(len(values), np.nan) if benchmark is None else np.asarray(benchmark, dtype=np.float64)
+        self._values = [values]
+        self._bench = [bench]
+
+        # Dernières lignes de prix (rendement sur la fenêtre) et derniers rendements (sortie de fenêtre)
+        horizon = max(self.windows)
+        self._prices = collections.deque(zip(values[-horizon - 1:], bench[-horizon - 1:]), maxlen=horizon + 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tail, tail_bench = values[-horizon - 1:], bench[-horizon - 1:]
+            returns = tail[1:] / tail[:-1] - 1
+            bench_returns = tail_bench[1:] / tail_bench[:-1] - 1
+        self._returns = collections.deque(
+            (_moments(r, b) for r, b in zip(returns, bench_returns)), maxlen=horizon
+        )
+        recent = list(self._returns)
+        self._sums = {
+            w: np.sum(recent[-w:], axis=0) if recent else np.zeros((9, len(self.labels)))
+            for w in self.windows
+        }
+
+    def __len__(self):
+        return sum(len(d) for d in self._dates)
+
+    @property
+    def dates(self):
+        if len(self._dates) > 1:
+            self._dates = [self._dates[0].append(self._dates[1:])]
+        return self._dates[0]
+
+    @property
+    def last_date(self):
+        return self._dates[-1][-1] if len(self) else None
+
+    @property
+    def last_prices(self):
+        """Prix de la dernière séance et de l'indice : (ndarray, float), None si vide."""
+        return self._prices[-1] if self._prices else None
+
+    def append(self, date, prices, benchmark=np.nan):
+        """
+        Ajoute une séance et met à jour la dernière fenêtre de chaque durée (O(colonnes)).
+
+        Args:
+            date (Timestamp): Date de la séance
+            prices (ndarray): Prix de chaque colonne
+            benchmark (float, optional): Prix de l'indice de référence
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        if self._prices:
+            previous, previous_bench = self._prices[-1]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                entering = _moments(prices / previous - 1, np.float64(benchmark) / previous_bench - 1)
+            for w in self.windows:
+                self._sums[w] += entering
+                if len(self._returns) >= w:
+                    self._sums[w] -= self._returns[-w]
+            self._returns.append(entering)
+        self._prices.append((prices, np.float64(benchmark)))
+        self._dates.append(pd.DatetimeIndex([date]))
+        self._values.append(prices[None, :])
+        self._bench.append(np.array([benchmark], dtype=np.float64))
+
+    def replace_last(self, prices, benchmark=np.nan):
+        """
+        Remplace les prix de la dernière séance (cours révisé en séance) : la contribution du
+        dernier rendement est retirée des sommes de chaque durée puis remplacée (O(colonnes)).
+
+        Args:
+            prices (ndarray): Prix révisés de chaque colonne
+            benchmark (float, optional): Prix révisé de l'indice de référence
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        if len(self._prices) > 1:
+            previous, previous_bench = self._prices[-2]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                entering = _moments(prices / previous - 1, np.float64(benchmark) / previous_bench - 1)
+            for w in self.windows:
+                self._sums[w] += entering - self._returns[-1]
+            self._returns[-1] = entering
+        self._prices[-1] = (prices, np.float64(benchmark))
+
+        # Les blocs de prix peuvent être en lecture seule (instantané projeté) : le dernier bloc
+        # est raccourci et la ligne révisée ajoutée à part
+        values, bench = self._values[-1], self._bench[-1]
+        self._values[-1:] = [values[:-1], prices[None, :]] if len(values) > 1 else [prices[None, :]]
+        self._bench[-1:] = [bench[:-1], np.array([benchmark], dtype=np.float64)] if len(bench) > 1 else [np.array([benchmark], dtype=np.float64)]
+
+    def latest(self):
+        """
+        Statistiques de la dernière fenêtre de chaque durée.
+
+        Returns:
+            DataFrame: Une ligne par colonne ; rendement (%), volatilité (%) et corrélation par durée
+        """
+        prices = [p for p, _ in self._prices]
+        data = {}
+        for w in self.windows:
+            vol, corr = _stats(self._sums[w], w, self.periods_per_year)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ret = (prices[-1] / prices[-1 - w] - 1) * 100 if len(prices) > w else np.full(len(self.labels), np.nan)
+            data[f"Rendement {w}j (%)"] = ret
+            data[f"Volatilité {w}j (%)"] = vol
+            data[f"Corrélation {w}j"] = corr
+        return pd.DataFrame(data, index=self.labels)
+
+    def snapshot(self):
+        """
+        Copie figée de l'état courant : statistiques des dernières fenêtres calculées et prix
+        partagés sans copie (les mises à jour ultérieures créent de nouveaux blocs sans
+        modifier ceux-ci).
+
+        Returns:
+            RollingSnapshot: Statistiques figées
+        """
+        if len(self._values) > 1:
+            self._values = [np.vstack(self._values)]
+            self._bench = [np.concatenate(self._bench)]
+        values, bench = self._values[0].view(), self._bench[0].view()
+        values.flags.writeable = False
+        bench.flags.writeable = False
+        return RollingSnapshot(self.dates, values, bench, self.labels, self.windows, self.periods_per_year, self.latest())
+
+    def history(self, window, columns=None):
+        """Séries complètes d'une durée de fenêtre (voir RollingSnapshot.history)."""
+        return self.snapshot().history(window, columns)
+
+class RollingSnapshot:
+    """
+    Statistiques glissantes figées (voir RollingStats.snapshot), partagées entre sessions
+    sans verrou : aucune méthode ne modifie l'objet.
+
+    Attributes:
+        dates (DatetimeIndex): Dates des lignes
+        labels (list): Libellé de chaque colonne
+        windows (tuple): Durées des fenêtres (séances)
+        periods_per_year (int): Périodes par an
+    """
+
+    def __init__(self, dates, values, bench, labels, windows, periods_per_year, latest):
+        self.dates = dates
+        self.labels = list(labels)
+        self.windows = tuple(windows)
+        self.periods_per_year = periods_per_year
+        self._values = values
+        self._bench = bench
+        self._latest = latest
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def last_date(self):
+        return self.dates[-1] if len(self.dates) else None
+
+    def latest(self):
+        """
+        Statistiques de la dernière fenêtre de chaque durée.
+
+        Returns:
+            DataFrame: Une ligne par colonne ; rendement (%), volatilité (%) et corrélation par durée
+        """
+        return self._latest.copy()
+
+    def history(self, window, columns=None):
+        """
+        Séries complètes d'une durée de fenêtre, par sommes cumulées sur toute la matrice.
+
+        Args:
+            window (int): Durée de la fenêtre (séances)
+            columns (list, optional): Libellés des colonnes calculées (toutes par défaut)
+
+        Returns:
+            dict: Statistique (voir STATS) -> DataFrame (dates x colonnes)
+        """
+        values, bench = self._values, self._bench
+        labels = self.labels if columns is None else list(columns)
+        if columns is not None:
+            values = values[:, [self.labels.index(c) for c in labels]]
+
+        nan = np.full((min(window, len(values)), len(labels)), np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ret = np.vstack([nan, values[window:] / values[:-window] - 1]) * 100
+            moments = _moments(values[1:] / values[:-1] - 1, (bench[1:] / bench[:-1] - 1)[:, None])
+        # Sommes de chaque fenêtre : différence de deux sommes cumulées (ligne de zéros en tête)
+        cumulative = np.concatenate([np.zeros((9, 1, len(labels))), np.cumsum(moments, axis=1)], axis=1)
+        sums = cumulative[:, window:] - cumulative[:, :-window]
+        vol, corr = _stats(sums, window, self.periods_per_year)
+        frames = [ret, np.vstack([nan, vol]), np.vstack([nan, corr])]
+        return {name: pd.DataFrame(data[:len(values)], index=self.dates, columns=labels) for name, data in zip(STATS, frames)}
+
+class RollingAnalytics:
+    """
+    Statistiques glissantes du portefeuille équipondéré et de chaque valeur, conservées d'un
+    rafraîchissement à l'autre : une séance ajoutée à la matrice ou une révision de la dernière
+    séance est intégrée en O(tickers), le calcul complet n'est refait que si l'univers, la fenêtre
+    ou l'historique antérieur changent.
+
+    Args:
+        start_date (datetime): Date d'achat du portefeuille (début des séries)
+        windows (tuple): Durées des fenêtres (séances)
+    """
+
+    def __init__(self, start_date, windows=WINDOWS):
+        self.start_date = start_date
+        self.windows = tuple(windows)
+        self.stats = None
+        self.full_rebuilds = 0
+        self.incremental_updates = 0
+        self.revisions = 0
+        self._tickers = None
+        self._shares = None
+        self._valid = None
+        # Copie figée renvoyée par sync, refaite seulement si les statistiques ont changé
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def _rebuild(self, window, bench):
+        _, _, shares, _ = PortfolioEngine(window).allocate(1.0)
+        valid = shares > 0
+        portfolio = window.values[:, valid] @ shares[valid] if valid.any() else np.full(len(window), np.nan)
+        self.stats = RollingStats(
+            window.dates, np.column_stack([portfolio, window.values]),
+            [PORTFOLIO_LABEL] + list(window.tickers), bench, self.windows
+        )
+        self._tickers = list(window.tickers)
+        self._shares = shares
+        self._valid = valid
+        self.full_rebuilds += 1
+
+    @profiled()
+    def sync(self, prices, benchmark=None):
+        """
+        Met les statistiques à jour avec la matrice des clôtures.
+
+        Args:
+            prices (PriceMatrix): Matrice des clôtures alignées
+            benchmark (Series, optional): Clôtures de l'indice de référence
+
+        Returns:
+            RollingSnapshot: Statistiques glissantes figées (colonne "Portefeuille" puis une par
+                valeur), lisibles hors du verrou pendant les mises à jour suivantes
+        """
+        with self._lock:
+            window = prices.window(self.start_date)
+            if benchmark is not None:
+                bench = benchmark.copy()
+                bench.index = pd.DatetimeIndex(bench.index).tz_localize(None).normalize()
+                bench = bench[~bench.index.duplicated(keep='last')]
+                bench = bench.reindex(bench.index.union(window.dates)).ffill().reindex(window.dates).to_numpy(dtype=np.float64)
+            else:
+                bench = None
+            stats = self.stats
+            same_universe = stats is not None and self._tickers == list(window.tickers)
+            n = len(stats) if stats is not None else 0
+            if same_universe and n and n <= len(window) <= n + 1 and window.dates[n - 1] == stats.last_date:
+                # Dernière séance connue révisée (cours en séance) : remplacement de sa ligne
+                prices, bench_price = self._row(window, bench, n - 1)
+                last, last_bench = stats.last_prices
+                if not (np.array_equal(prices[1:], last[1:], equal_nan=True)
+                        and np.array_equal(bench_price, last_bench, equal_nan=True)):
+                    stats.replace_last(prices, bench_price)
+                    self.revisions += 1
+                    self._snapshot = None
+                if len(window) == n + 1:
+                    # Nouvelle séance : mise à jour de la dernière fenêtre seulement
+                    stats.append(window.dates[-1], *self._row(window, bench, -1))
+                    self.incremental_updates += 1
+                    self._snapshot = None
+            else:
+                self._rebuild(window, bench)
+                self._snapshot = None
+            if self._snapshot is None:
+                self._snapshot = self.stats.snapshot()
+            return self._snapshot
+
+    def _row(self, window, bench, i):
+        """Prix d'une ligne de la matrice (portefeuille en tête) et de l'indice."""
+        row = window.values[i]
+        value = row[self._valid] @ self._shares[self._valid]
+        return np.concatenate([[value], row]), np.nan if bench is None else bench[i]
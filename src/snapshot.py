@@ -0,0 +1,160 @@
+# snapshot.py
+
+# Instantané de la matrice de prix partagé entre sessions et processus : fichiers .npy
+# projetés en mémoire (lecture seule, sans copie), remplacés atomiquement à chaque rafraîchissement.
+
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import config
+from src.price_matrix import PriceMatrix
+
+def snapshot_key(tickers, start_date):
+    """Identifiant d'un instantané : univers de tickers et date de début."""
+    raw = json.dumps([list(tickers), pd.Timestamp(start_date).isoformat()])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+class Snapshot:
+    """
+    Instantané ouvert en lecture seule.
+
+    Attributes:
+        prices (PriceMatrix): Matrice projetée en mémoire (tableau non modifiable)
+        built_at (float): Instant de publication (secondes depuis l'epoch)
+        version (str): Version des fichiers
+    """
+
+    def __init__(self, prices, built_at, version):
+        self.prices = prices
+        self.built_at = built_at
+        self.version = version
+
+    @property
+    def age(self):
+        return time.time() - self.built_at
+
+class SnapshotStore:
+    """
+    Répertoire d'instantanés.
+
+    Arborescence :
+        <directory>/<clé>.current.json          version courante (remplacée atomiquement)
+        <directory>/<clé>-<version>.values.npy  prix (dates x tickers, float64)
+        <directory>/<clé>-<version>.dates.npy   dates (datetime64[ns])
+
+    Les fichiers d'une version ne sont jamais modifiés après publication : un lecteur
+    qui a projeté une version la conserve intacte même après son remplacement.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or config.SNAPSHOT_DIR
+        os.makedirs(self.directory, exist_ok=True)
+        # Instantanés ouverts par le processus : clé -> (signature du pointeur, Snapshot)
+        self._opened = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def publish(self, key, prices):
+        """
+        Publie une nouvelle version de l'instantané.
+
+        Args:
+            key (str): Identifiant (voir snapshot_key)
+            prices (PriceMatrix): Matrice à partager
+
+        Returns:
+            Snapshot: Version publiée, ouverte en lecture seule
+        """
+        version = f"{time.time_ns()}-{os.getpid()}"
+        prefix = f"{key}-{version}"
+        values = np.ascontiguousarray(prices.values, dtype=np.float64)
+        dates = prices.dates.to_numpy(dtype="datetime64[ns]")
+        np.save(self._path(f"{prefix}.values.npy"), values)
+        np.save(self._path(f"{prefix}.dates.npy"), dates)
+        built_at = time.time()
+
+        # Projection ouverte avant la publication : elle reste valide même si un autre
+        # processus supprime ensuite cette version (publication plus récente)
+        try:
+            values = np.load(self._path(f"{prefix}.values.npy"), mmap_mode="r")
+        except (OSError, ValueError):
+            values = values.view()
+            values.flags.writeable = False
+        snapshot = Snapshot(PriceMatrix(dates, list(prices.tickers), values), built_at, version)
+
+        pointer = {"version": version, "tickers": list(prices.tickers), "built_at": built_at}
+        tmp = self._path(f"{key}.current.json.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(pointer, f)
+        os.replace(tmp, self._path(f"{key}.current.json"))
+
+        self._cleanup(key)
+        return snapshot
+
+    def _cleanup(self, key):
+        """
+        Supprime les versions antérieures à celle que désigne le pointeur
+        (les projections déjà ouvertes restent valides).
+        """
+        try:
+            with open(self._path(f"{key}.current.json"), encoding="utf-8") as f:
+                keep_ns = int(json.load(f)["version"].split("-")[0])
+        except (OSError, ValueError, KeyError):
+            return
+        for path in glob.glob(self._path(f"{key}-*.npy")):
+            version_ns = int(os.path.basename(path)[len(key) + 1:].split("-")[0])
+            if version_ns < keep_ns:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def load(self, key):
+        """
+        Ouvre la version courante d'un instantané, sans copie des prix.
+        La projection est réutilisée tant que la version ne change pas.
+
+        Returns:
+            Snapshot: Instantané courant (None s'il n'existe pas)
+        """
+        pointer_path = self._path(f"{key}.current.json")
+        try:
+            stat = os.stat(pointer_path)
+        except FileNotFoundError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            opened = self._opened.get(key)
+            if opened is not None and opened[0] == signature:
+                return opened[1]
+            try:
+                with open(pointer_path, encoding="utf-8") as f:
+                    pointer = json.load(f)
+                prefix = f"{key}-{pointer['version']}"
+                values = np.load(self._path(f"{prefix}.values.npy"), mmap_mode="r")
+                dates = np.load(self._path(f"{prefix}.dates.npy"))
+            except (OSError, ValueError, KeyError):
+                # Version remplacée entre la lecture du pointeur et l'ouverture des fichiers
+                return opened[1] if opened is not None else None
+            snapshot = Snapshot(PriceMatrix(dates, pointer["tickers"], values), pointer["built_at"], pointer["version"])
+            self._opened[key] = (signature, snapshot)
+            return snapshot
+
+_store = None
+
+def get_snapshot_store():
+    """Renvoie le répertoire d'instantanés partagé par le processus."""
+    global _store
+    if _store is None:
+        _store = SnapshotStore()
+    return _store
@@ -0,0 +1,143 @@
+# synthetic_market.py
+
+# Générateur vectorisé de marchés synthétiques : OHLCV corrélés pour un nombre quelconque
+# de tickers et de séances (mouvement brownien géométrique avec facteur de marché et
+# facteurs sectoriels). Sert de source hors-ligne, de repli et de données de test de charge.
+
+import zlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+SECTORS = [
+    "Technology", "Healthcare", "Industrials", "Consumer Cyclical", "Consumer Defensive",
+    "Financial Services", "Communication Services", "Basic Materials", "Energy", "Utilities"
+]
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
+
+def sector_of(ticker):
+    """Secteur synthétique (stable) d'un ticker."""
+    return SECTORS[zlib.crc32(ticker.encode("utf-8")) % len(SECTORS)]
+
+class SyntheticMarket:
+    """
+    Marché synthétique déterministe.
+
+    Le rendement quotidien d'un ticker est la somme d'un rendement propre et de son
+    exposition au facteur de marché et au facteur de son secteur, ce qui corrèle les
+    tickers d'un même secteur. Les facteurs ne dépendent que de la graine et chaque
+    ticker a son propre générateur : la série d'un ticker est identique qu'il soit
+    généré seul ou au sein d'un panel, et un jour supplémentaire ne modifie pas le passé.
+
+    Args:
+        seed (int): Graine
+        start (datetime): Première séance
+        market_vol (float): Volatilité quotidienne du facteur de marché
+        sector_vol (float): Volatilité quotidienne des facteurs sectoriels
+    """
+
+    def __init__(self, seed=0, start=datetime(2015, 1, 1), market_vol=0.009, sector_vol=0.006):
+        self.seed = seed
+        self.start = pd.Timestamp(start).normalize()
+        self.market_vol = market_vol
+        self.sector_vol = sector_vol
+
+    def dates(self, end=None):
+        """Séances (jours ouvrés) de la date de début à `end` (aujourd'hui par défaut)."""
+        end = pd.Timestamp.today() if end is None else pd.Timestamp(end)
+        return pd.bdate_range(self.start, end.normalize(), name="Date")
+
+    def _factors(self, n_days):
+        """Rendements des facteurs (n_days x (1 + secteurs)) : marché puis un facteur par secteur."""
+        rng = np.random.default_rng([self.seed, 0])
+        # Tirage ligne par ligne : les n premières séances ne dépendent pas de n_days
+        z = rng.standard_normal((n_days, 1 + len(SECTORS)))
+        scale = np.array([self.market_vol] + [self.sector_vol] * len(SECTORS))
+        return z * scale
+
+    def _ticker_draws(self, ticker, n_days):
+        """Paramètres et aléas propres à un ticker."""
+        rng = np.random.default_rng([self.seed, 1, zlib.crc32(ticker.encode("utf-8"))])
+        params = {
+            "price0": rng.uniform(20, 500),
+            "drift": rng.uniform(-0.0002, 0.0008),
+            "beta_market": rng.uniform(0.6, 1.4),
+            "beta_sector": rng.uniform(0.5, 1.5),
+            "idio_vol": rng.uniform(0.006, 0.02),
+            "volume": rng.uniform(2e5, 5e6)
+        }
+        # Aléas par séance : rendement propre, ouverture, plus haut, plus bas, volume
+        noise = rng.standard_normal((n_days, 5))
+        return params, noise
+
+    def uniform(self, ticker, name, low, high):
+        """Valeur uniforme déterministe propre à un ticker et à un attribut (ratios, capitalisation...)."""
+        key = [self.seed, 2, zlib.crc32(ticker.encode("utf-8")), zlib.crc32(name.encode("utf-8"))]
+        return float(np.random.default_rng(key).uniform(low, high))
+
+    def panel(self, tickers, end=None):
+        """
+        Génère un panel OHLCV.
+
+        Args:
+            tickers (list): Symboles des actions
+            end (datetime, optional): Dernière séance (aujourd'hui par défaut)
+
+        Returns:
+            tuple: (dates, dict champ -> ndarray (séances x tickers))
+        """
+        dates = self.dates(end)
+        n_days, n_tickers = len(dates), len(tickers)
+        factors = self._factors(n_days)
+
+        params = {k: np.empty(n_tickers) for k in ("price0", "drift", "beta_market", "beta_sector", "idio_vol", "volume")}
+        noise = np.empty((5, n_days, n_tickers))
+        sector_idx = np.empty(n_tickers, dtype=np.intp)
+        for j, ticker in enumerate(tickers):
+            p, z = self._ticker_draws(ticker, n_days)
+            for k, v in p.items():
+                params[k][j] = v
+            noise[:, :, j] = z.T
+            sector_idx[j] = 1 + SECTORS.index(sector_of(ticker))
+
+        returns = (
+            params["drift"]
+            + params["beta_market"] * factors[:, [0]]
+            + params["beta_sector"] * factors[:, sector_idx]
+            + params["idio_vol"] * noise[0]
+        )
+        close = params["price0"] * np.exp(np.cumsum(returns, axis=0))
+        vol = params["idio_vol"]
+        open_ = close * (1 + noise[1] * vol / 3)
+        high = np.maximum(open_, close) * (1 + np.abs(noise[2]) * vol / 2)
+        low = np.minimum(open_, close) * (1 - np.abs(noise[3]) * vol / 2)
+        volume = np.round(params["volume"] * np.exp(0.3 * noise[4])).astype(np.int64)
+
+        return dates, {
+            'Open': open_,
+            'High': high,
+            'Low': low,
+            'Close': close,
+            'Volume': volume,
+            'Dividends': np.zeros((n_days, n_tickers)),
+            'Stock Splits': np.zeros((n_days, n_tickers))
+        }
+
+    def frames(self, tickers, end=None):
+        """
+        Génère les historiques sous forme de DataFrames (format des fournisseurs de données).
+
+        Returns:
+            dict: ticker -> DataFrame OHLCV indexé par date
+        """
+        dates, panel = self.panel(tickers, end)
+        return {
+            t: pd.DataFrame({f: panel[f][:, j] for f in OHLCV_COLUMNS}, index=dates)
+            for j, t in enumerate(tickers)
+        }
+
+    def history(self, ticker, end=None):
+        """Historique OHLCV d'un seul ticker."""
+        return self.frames([ticker], end)[ticker]
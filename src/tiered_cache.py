@@ -0,0 +1,184 @@
+# tiered_cache.py
+
+# Cache en mémoire à durées de validité différenciées (métadonnées statiques, fondamentaux, cours)
+# avec service de la valeur périmée pendant son rafraîchissement en arrière-plan.
+
+import collections
+import threading
+import time
+
+from src import config
+from src.fetch_scheduler import get_scheduler
+
+# Durée de validité de chaque niveau (secondes)
+TIER_TTLS = {
+    "static": config.CACHE_TTL_STATIC,
+    "fundamentals": config.CACHE_TTL_FUNDAMENTALS,
+    "quotes": config.CACHE_TTL_QUOTES
+}
+
+# Niveau de chaque champ des données fondamentales (.info) ; les champs absents sont "fundamentals"
+FIELD_TIERS = {
+    "longName": "static",
+    "shortName": "static",
+    "sector": "static",
+    "industry": "static",
+    "country": "static",
+    "exchange": "static",
+    "currency": "static",
+    "currentPrice": "quotes",
+    "regularMarketPrice": "quotes",
+    "previousClose": "quotes",
+    "regularMarketPreviousClose": "quotes"
+}
+
+def ttl_for(fields=None):
+    """
+    Durée de validité d'un ensemble de champs : celle du champ le plus volatil.
+
+    Args:
+        fields (iterable, optional): Champs utilisés (tous les champs par défaut)
+
+    Returns:
+        float: Durée de validité en secondes
+    """
+    return min(TIER_TTLS[tier] for tier in tiers_for(fields))
+
+def tiers_for(fields=None):
+    """
+    Niveaux d'un ensemble de champs, du plus stable au plus volatil.
+
+    Args:
+        fields (iterable, optional): Champs utilisés (tous les champs par défaut)
+
+    Returns:
+        list: Niveaux concernés (clés de TIER_TTLS)
+    """
+    if fields is None:
+        return list(TIER_TTLS)
+    used = {FIELD_TIERS.get(f, "fundamentals") for f in fields}
+    return [tier for tier in TIER_TTLS if tier in used]
+
+def split_tiers(info):
+    """
+    Répartit les champs d'une donnée .info par niveau.
+
+    Returns:
+        dict: niveau -> dict des champs de ce niveau
+    """
+    parts = {tier: {} for tier in TIER_TTLS}
+    for field, value in info.items():
+        parts[FIELD_TIERS.get(field, "fundamentals")][field] = value
+    return parts
+
+class TieredCache:
+    """
+    Cache clé -> valeur, partagé entre threads.
+
+    Une valeur plus ancienne que la durée demandée est renvoyée immédiatement
+    et rafraîchie en arrière-plan (une seule requête en cours par clé) ; seules
+    les clés jamais chargées sont téléchargées de façon bloquante.
+    Les erreurs ne sont pas conservées : la clé est redemandée au prochain appel.
+    Au-delà de `max_entries` clés, les moins récemment utilisées sont évincées.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._refreshing = set()
+        # Incrémenté par clear() : les rafraîchissements lancés avant sont ignorés
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _store(self, fetched, generation):
+        """Conserve les valeurs sans erreur de `fetched`, y compris des clés non demandées."""
+        fetched_at = time.monotonic()
+        with self._lock:
+            if generation != self._generation:
+                return
+            for key, (value, error) in fetched.items():
+                if error is None:
+                    self._entries[key] = (fetched_at, value)
+                    self._entries.move_to_end(key)
+            if self.max_entries is not None:
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+    def _refresh(self, keys, fetch_many, generation):
+        def run():
+            try:
+                self._store(fetch_many(keys), generation)
+            except Exception:
+                # Rafraîchissement raté : la valeur périmée reste servie
+                pass
+            finally:
+                with self._lock:
+                    if generation == self._generation:
+                        self._refreshing.difference_update(keys)
+
+        # Threads de fond partagés par tous les caches (pas un thread par lot)
+        get_scheduler().submit(run)
+
+    def get_many(self, keys, fetch_many, ttl):
+        """
+        Renvoie les valeurs des clés demandées.
+
+        Args:
+            keys (iterable): Clés demandées
+            fetch_many (callable): keys -> dict clé -> (valeur, erreur) ; les clés
+                supplémentaires renvoyées sont aussi conservées
+            ttl (float): Âge au-delà duquel une valeur est rafraîchie (secondes)
+
+        Returns:
+            dict: clé -> (valeur, erreur) ; valeur vaut None en cas d'erreur
+        """
+        keys = list(dict.fromkeys(keys))
+        now = time.monotonic()
+        result, stale, missing = {}, [], []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    missing.append(key)
+                    continue
+                self._entries.move_to_end(key)
+                result[key] = (entry[1], None)
+                if now - entry[0] > ttl:
+                    stale.append(key)
+            self.hits += len(result)
+            self.stale_hits += len(stale)
+            self.misses += len(missing)
+            # Clés déjà en cours de rafraîchissement : pas de seconde requête
+            stale = [k for k in stale if k not in self._refreshing]
+            self._refreshing.update(stale)
+            generation = self._generation
+
+        if stale:
+            self._refresh(stale, fetch_many, generation)
+        if missing:
+            fetched = fetch_many(missing)
+            self._store(fetched, generation)
+            for key in missing:
+                result[key] = fetched.get(key, (None, KeyError(key)))
+        return result
+
+    def age(self, key):
+        """Âge de la valeur en cache (secondes), None si la clé est absente."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return None if entry is None else time.monotonic() - entry[0]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._refreshing.clear()
+            self._generation += 1
@@ -2,7 +2,9 @@
 
 import streamlit as st
 import base64
+import pandas as pd
 from .stock_utils import determine_currency, get_company_name
+from .profiling import profiled
 
 def apply_custom_css():
     """Applique un CSS personnalisé à l'application Streamlit."""
@@ -126,14 +128,15 @@ def apply_custom_css():
     </style>
     """, unsafe_allow_html=True)
 
-def create_scrolling_ticker(portfolio_df, stock_data_dict, currency_mapping):
+@profiled(rows=None)
+def create_scrolling_ticker(portfolio_df, quotes, currency_mapping):
     """
     Crée un bandeau défilant HTML avec les prix et variations des actions.
     Adapté pour 100 valeurs avec animation plus longue.
     
     Args:
         portfolio_df (DataFrame): DataFrame avec les données du portefeuille
-        stock_data_dict (dict): Dictionnaire avec les données boursières
+        quotes (DataFrame): Cotations indexées par ticker (voir get_quotes_batch)
         currency_mapping (dict): Mapping des devises par ticker (non utilisé, logique dans determine_currency)
         
     Returns:
@@ -142,19 +145,21 @@ def create_scrolling_ticker(portfolio_df, stock_data_dict, currency_mapping):
     # Générer le contenu HTML pour le bandeau défilant
     ticker_items = ""
     
-    for _, row in portfolio_df.iterrows():
-        ticker = row['ticker']
-        stock_data = stock_data_dict.get(ticker, {})
-        
+    # Lecture colonne par colonne ; NaN pour les cotations indisponibles
+    tickers = portfolio_df['ticker']
+    prices = quotes['current_price'].reindex(tickers).tolist()
+    changes = quotes['percent_change'].reindex(tickers).tolist()
+    
+    for ticker, current_price, percent_change in zip(tickers, prices, changes):
         # Déterminer la devise correcte en fonction du suffixe du ticker
         currency = determine_currency(ticker)
         
-        # Valeurs par défaut si les données ne sont pas disponibles
-        current_price = stock_data.get('current_price', 0)
-        percent_change = stock_data.get('percent_change', 0)
-        
         # Déterminer la classe CSS et flèche en fonction de la variation
-        if percent_change >= 0:
+        if pd.isna(current_price) or pd.isna(percent_change):
+            # Cotation indisponible : signalée plutôt que remplacée par zéro
+            change_class = "missing"
+            arrow = ""
+        elif percent_change >= 0:
             change_class = "positive"
             arrow = '<span style="font-size: 22px;">&#x25B2;</span>'
         else:
@@ -164,12 +169,15 @@ def create_scrolling_ticker(portfolio_df, stock_data_dict, currency_mapping):
         # Utiliser le nom de la société depuis le CSV
         company_name = get_company_name(ticker, portfolio_df)
         
+        price_text = "n/d" if pd.isna(current_price) else f"{currency}{current_price:.2f}"
+        change_text = "n/d" if change_class == "missing" else f"{arrow} {percent_change:.2f}%"
+        
         # Ajouter les informations de cette action au bandeau
         ticker_items += f"""
         <div class="ticker-item">
             <span class="ticker-name">{company_name}</span>
-            <span class="ticker-price">{currency}{current_price:.2f}</span>
-            <span class="ticker-change {change_class}">{arrow} {percent_change:.2f}%</span>
+            <span class="ticker-price">{price_text}</span>
+            <span class="ticker-change {change_class}">{change_text}</span>
         </div>
         """
     
@@ -220,6 +228,9 @@ def create_scrolling_ticker(portfolio_df, stock_data_dict, currency_mapping):
                 color: #ff4d4d;
                 font-weight: bold;
             }}
+            .missing {{
+                color: #a0a8b8;
+            }}
             @keyframes ticker-scroll {{
                 0% {{ transform: translate3d(0, 0, 0); }}
                 100% {{ transform: translate3d(-100%, 0, 0); }}
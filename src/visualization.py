@@ -1,4 +1,3 @@
-import yfinance as yf
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
@@ -6,87 +5,71 @@ import numpy as np
 import streamlit as st
 from datetime import datetime
 from .stock_utils import get_company_name, determine_currency
+from .market_data import get_reference_performance
+from .portfolio_engine import PortfolioEngine, PortfolioResult
+from .profiling import profiled, section, runs_to_json
 
-def plot_performance(hist_data, weights=None, reference_indices=None, end_date_ui=None, force_start_date=None):
+@profiled()
+def plot_performance(prices, weights=None, reference_indices=None, end_date_ui=None, force_start_date=None, portfolio_performance=None):
     """
     Crée un graphique de performance comparée.
     
     Args:
-        hist_data (dict): Dictionnaire de DataFrames avec historique des prix
+        prices (PriceMatrix): Matrice des clôtures alignées (dates x tickers)
         weights (list, optional): Liste des poids de chaque action
         reference_indices (dict, optional): Dictionnaire des indices de référence
         end_date_ui (datetime, optional): Date de fin spécifiée par l'UI
         force_start_date (datetime, optional): Date de début forcée (05/01/2023)
+        portfolio_performance (Series, optional): Performance base 100 déjà calculée
+            (mode incrémental, voir IncrementalPortfolioSeries)
         
     Returns:
         go.Figure: Figure Plotly avec graphique de performance
     """
-    if weights is None:
-        weights = [1/len(hist_data)] * len(hist_data)
-    
-    # Trouver les dates communes
-    start_dates = []
-    end_dates = []
-    
-    for ticker, hist in hist_data.items():
-        if not hist.empty:
-            start_dates.append(hist.index[0])
-            end_dates.append(hist.index[-1])
-    
-    if not start_dates or not end_dates:
+    first_dates = prices.first_valid_dates().dropna()
+    if prices.empty or first_dates.empty:
         st.warning("Pas assez de données pour créer un graphique.")
         return None
     
-    # Utiliser la date forcée si fournie, sinon utiliser la date max des données
-    start_date = force_start_date if force_start_date else max(start_dates)
+    # Utiliser la date forcée si fournie, sinon la première date où toutes les valeurs cotent
+    start_date = force_start_date if force_start_date else first_dates.max()
     # Utiliser la date de fin fournie par l'UI ou la date maximale disponible
-    end_date = end_date_ui or max(end_dates)
+    end_date = end_date_ui or prices.dates[-1]
     
     # Créer le graphique
     fig = go.Figure()
     
-    # Créer une plage de dates sans fuseau horaire
-    date_range = pd.date_range(start=start_date, end=end_date, freq='B')
-    
-    # Initialiser le DataFrame pour les performances normalisées
-    all_normalized = pd.DataFrame(index=date_range)
+    # Fenêtre de la matrice (jours ouvrés, sans copie)
+    window = prices.window(start_date, end_date)
+    date_range = window.dates
     
     # Variables pour stocker les traces
     portfolio_trace = None
     indices_traces = []
     
-    # Ajouter chaque action
-    valid_tickers = []
-    for i, (ticker, hist) in enumerate(hist_data.items()):
-        if hist.empty:
-            continue
-            
-        # Filtrer par dates communes
-        filtered_hist = hist[(hist.index >= start_date) & (hist.index <= end_date)]
-        if filtered_hist.empty:
-            continue
+    if portfolio_performance is None:
+        # Normaliser à 100 les valeurs dont le premier prix est valide
+        base = window.values[0] if len(window) else np.array([])
+        valid = np.nan_to_num(base) > 0
         
-        valid_tickers.append(ticker)
-            
-        # Réindexer pour s'assurer que les dates correspondent
-        reindexed = filtered_hist['Close'].reindex(date_range, method='ffill')
+        # Vérifier que nous avons des données valides
+        if not valid.any():
+            st.warning("Pas assez de données pour calculer la performance du portefeuille.")
+            return None
         
-        # Normaliser à 100
-        if reindexed.iloc[0] > 0:  # Vérifier que la première valeur n'est pas zéro
-            normalized = reindexed / reindexed.iloc[0] * 100
-            all_normalized[ticker] = normalized
-    
-    # Vérifier que nous avons des données valides
-    if all_normalized.empty or len(valid_tickers) == 0:
-        st.warning("Pas assez de données pour calculer la performance du portefeuille.")
-        return None
-    
-    # Recalculer les poids si nécessaire pour n'inclure que les tickers valides
-    if len(valid_tickers) < len(hist_data):
-        weights = [1/len(valid_tickers)] * len(valid_tickers)
+        all_normalized = window.values[:, valid] / base[valid] * 100
         
-    # Calculer la performance du portefeuille (répartition équitable)
-    portfolio_performance = all_normalized.mean(axis=1)
+        # Calculer la performance du portefeuille (répartition équitable par défaut)
+        if weights is None:
+            performance = np.nanmean(all_normalized, axis=1)
+        else:
+            w = np.asarray(weights, dtype=np.float64)[valid]
+            mask = ~np.isnan(all_normalized)
+            performance = np.nansum(all_normalized * w, axis=1) / (mask * w).sum(axis=1)
+        portfolio_performance = pd.Series(performance, index=date_range)
+    else:
+        # Le point du jour peut dépasser la dernière séance de l'historique
+        date_range = portfolio_performance.index
     
     # Vérifier que la performance du portefeuille a été calculée
     if portfolio_performance.empty or portfolio_performance.isna().all():
@@ -102,33 +85,26 @@ def plot_performance(hist_data, weights=None, reference_indices=None, end_date_u
         line=dict(width=3, color='#693112')
     )
     
-    # Ajouter les indices de référence
+    # Ajouter les indices de référence (historiques partagés avec les indicateurs de risque
+    # et les statistiques glissantes ; séries base 100 recalculées seulement si elles changent)
     if reference_indices:
-        for name, ticker in reference_indices.items():
-            try:
-                reference = yf.Ticker(ticker)
-                ref_hist = reference.history(start=start_date, end=end_date)
-                if not ref_hist.empty:
-                    # Rendre les dates naïves
-                    ref_hist.index = ref_hist.index.tz_localize(None)
-                    
-                    # Réindexer pour correspondre à notre date_range
-                    ref_close = ref_hist['Close'].reindex(date_range, method='ffill')
-                    
-                    # Normaliser
-                    if ref_close.iloc[0] > 0:  # Vérifier que la première valeur n'est pas zéro
-                        ref_normalized = ref_close / ref_close.iloc[0] * 100
-                        
-                        # Sauvegarder la trace de l'indice
-                        indices_traces.append(go.Scatter(
-                            x=ref_normalized.index,
-                            y=ref_normalized.values,
-                            mode='lines',
-                            name=name,
-                            line=dict(width=2.5, dash='dash')  # Ligne plus épaisse pour les indices
-                        ))
-            except Exception as e:
-                st.warning(f"Erreur lors de la récupération des données pour {name}: {e}")
+        try:
+            with section("indices de référence") as timing:
+                references = get_reference_performance(reference_indices, start_date, date_range)
+                if timing is not None:
+                    timing.rows = sum(len(r) for r in references.values())
+        except Exception as e:
+            st.warning(f"Erreur lors de la récupération des indices de référence : {e}")
+            references = {}
+        for name, ref_normalized in references.items():
+            # Sauvegarder la trace de l'indice
+            indices_traces.append(go.Scatter(
+                x=ref_normalized.index,
+                y=ref_normalized.values,
+                mode='lines',
+                name=name,
+                line=dict(width=2.5, dash='dash')  # Ligne plus épaisse pour les indices
+            ))
     
     # Ajouter les traces dans l'ordre : d'abord le portefeuille, puis les indices
     if portfolio_trace:
@@ -183,106 +159,115 @@ def plot_performance(hist_data, weights=None, reference_indices=None, end_date_u
     
     return fig
 
-def plot_portfolio_simulation(hist_data, initial_investment=1000000, end_date_ui=None, max_traces=20, force_start_date=None):
+@profiled()
+def plot_rolling_stats(stats, stat="Volatilité (%)", column="Portefeuille", height=500):
+    """
+    Crée le graphique d'une statistique glissante, une courbe par durée de fenêtre.
+    
+    Args:
+        stats (RollingSnapshot): Statistiques glissantes (voir rolling.RollingSnapshot)
+        stat (str): Statistique affichée ("Rendement (%)", "Volatilité (%)" ou "Corrélation")
+        column (str): Colonne affichée (portefeuille ou ticker)
+        height (int): Hauteur du graphique
+        
+    Returns:
+        go.Figure: Figure Plotly, None si aucune fenêtre n'est complète
+    """
+    fig = go.Figure()
+    colors = ['#693112', '#A0522D', '#D2B48C']
+    for window, color in zip(stats.windows, colors):
+        series = stats.history(window, [column])[stat][column].dropna()
+        if series.empty:
+            continue
+        fig.add_trace(go.Scatter(
+            x=series.index,
+            y=series.values,
+            mode='lines',
+            name=f"{window} séances",
+            line=dict(color=color, width=2)
+        ))
+    if not fig.data:
+        return None
+    
+    fig.update_layout(
+        title=f"{stat} glissant(e)",
+        height=height,
+        template="plotly_white",
+        hovermode='x unified',
+        margin=dict(l=0, r=0, t=60, b=10),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
+
+@profiled()
+def plot_portfolio_simulation(prices, initial_investment=1000000, end_date_ui=None, max_traces=20, force_start_date=None, portfolio_value=None):
     """
     Crée un graphique de simulation d'investissement.
     Avec 100 valeurs, on limite le nombre de traces à afficher.
     
     Args:
-        hist_data (dict): Dictionnaire de DataFrames avec historique des prix
+        prices (PriceMatrix): Matrice des clôtures alignées (dates x tickers)
         initial_investment (float): Montant initial d'investissement
         end_date_ui (datetime, optional): Date de fin spécifiée par l'UI
         max_traces (int): Nombre maximum de traces individuelles à afficher
         force_start_date (datetime, optional): Date de début forcée (05/01/2023)
+        portfolio_value (Series, optional): Valeur du portefeuille déjà calculée
+            (mode incrémental, voir IncrementalPortfolioSeries)
         
     Returns:
         tuple: (Figure Plotly, valeur finale, gain/perte, % changement, info actions)
     """
-    # Trouver les dates communes
-    start_dates = []
-    end_dates = []
-    
-    for ticker, hist in hist_data.items():
-        if not hist.empty:
-            start_dates.append(hist.index[0])
-            end_dates.append(hist.index[-1])
-    
-    if not start_dates or not end_dates:
+    first_dates = prices.first_valid_dates().dropna()
+    if prices.empty or first_dates.empty:
         st.warning("Pas assez de données pour créer une simulation.")
         return None, 0, 0, 0, []
     
-    # Utiliser la date forcée si fournie, sinon utiliser la date max des données
-    start_date = force_start_date if force_start_date else max(start_dates)
+    # Utiliser la date forcée si fournie, sinon la première date où toutes les valeurs cotent
+    start_date = force_start_date if force_start_date else first_dates.max()
     # Utiliser la date de fin fournie par l'UI ou la date maximale disponible
-    end_date = end_date_ui or max(end_dates)
+    end_date = end_date_ui or prices.dates[-1]
     
-    # Créer une plage de dates sans fuseau horaire
-    date_range = pd.date_range(start=start_date, end=end_date, freq='B')
-    
-    # Répartition équitable
-    num_stocks = len(hist_data)
-    investment_per_stock = initial_investment / num_stocks
+    # Achat équipondéré puis conservation (calcul vectorisé)
+    engine = PortfolioEngine(prices)
+    if portfolio_value is None:
+        result = engine.run(initial_investment, start_date=start_date, end_date=end_date)
+        portfolio_value = result.total_value
+    else:
+        # Série fournie : seules les parts sont recalculées
+        window, w, shares, invested = engine.allocate(initial_investment, start_date=start_date, end_date=end_date)
+        result = PortfolioResult(window, w, shares, invested, portfolio_value, initial_investment)
+    investment_per_stock = initial_investment / len(prices.tickers)
     
     # Créer le graphique
     fig = go.Figure()
     
-    # Initialiser le DataFrame pour les valeurs
-    all_values = pd.DataFrame(index=date_range)
-    
-    # Calculer l'évolution de la valeur de chaque action
-    stock_info = []
-    
-    # Pour limiter le nombre de traces individuelles (car 100 serait trop)
-    sorted_tickers = sorted(hist_data.keys(), key=lambda x: len(hist_data[x]) if not hist_data[x].empty else 0, reverse=True)
-    display_tickers = sorted_tickers[:max_traces]
-    
-    for ticker, hist in hist_data.items():
-        if hist.empty:
-            continue
-            
-        # Réindexer pour correspondre à notre date_range
-        reindexed = hist['Close'].reindex(date_range, method='ffill')
-        
-        if reindexed.empty or reindexed.isna().all() or reindexed.iloc[0] == 0:
-            continue
-        
-        # Calculer le nombre d'actions achetées au début
-        initial_price = reindexed.iloc[0]
-        num_shares = investment_per_stock / initial_price
-        
-        # Stocker les informations pour l'affichage
-        # Vérifier si num_shares est NaN avant de le convertir en entier
-        if pd.notna(num_shares):
-            stock_info.append({
-                "ticker": ticker,
-                "num_shares": int(num_shares),
-                "initial_investment": investment_per_stock
-            })
-        else:
-            # Si num_shares est NaN, utiliser 0 comme valeur par défaut
-            stock_info.append({
-                "ticker": ticker,
-                "num_shares": 0,
-                "initial_investment": investment_per_stock
-            })
-        
-        # Calculer la valeur au fil du temps
-        stock_value = reindexed * num_shares
-        all_values[ticker] = stock_value
-        
-        # N'ajouter la trace que si elle fait partie des top tickers à afficher
-        if ticker in display_tickers:
-            fig.add_trace(go.Scatter(
-                x=stock_value.index,
-                y=stock_value.values,
-                mode='lines',
-                name=ticker,
-                line=dict(width=1, dash='dot'),
-                opacity=0.3
-            ))
-    
-    # Calculer la valeur totale du portefeuille
-    portfolio_value = all_values.sum(axis=1)
+    # Stocker les informations pour l'affichage
+    stock_info = [
+        {
+            "ticker": ticker,
+            "num_shares": int(shares),
+            "initial_investment": investment_per_stock
+        }
+        for ticker, shares, ok in zip(result.tickers, result.shares, result.valid) if ok
+    ]
+    
+    # Pour limiter le nombre de traces individuelles (car 100 serait trop) : les plus longs historiques
+    history_length = (~np.isnan(prices.values)).sum(axis=0)
+    display_tickers = [
+        prices.tickers[i] for i in np.argsort(-history_length, kind='stable')[:max_traces]
+        if result.valid[i]
+    ]
+    display_tickers.sort(key=prices.position)
+    
+    for ticker, stock_value in result.position_values(display_tickers).items():
+        fig.add_trace(go.Scatter(
+            x=stock_value.index,
+            y=stock_value.values,
+            mode='lines',
+            name=ticker,
+            line=dict(width=1, dash='dot'),
+            opacity=0.3
+        ))
     
     # Ajouter le portefeuille total
     fig.add_trace(go.Scatter(
@@ -322,17 +307,13 @@ def plot_portfolio_simulation(hist_data, initial_investment=1000000, end_date_ui
         fig.update_layout(yaxis=dict(range=[min_y, max_y]))
     
     # Calculer le gain/perte total
-    if portfolio_value.empty:
-        final_value = initial_investment
-        gain_loss = 0
-        percent_change = 0
-    else:
-        final_value = portfolio_value.iloc[-1]
-        gain_loss = final_value - initial_investment
-        percent_change = (gain_loss / initial_investment) * 100
+    final_value = result.final_value
+    gain_loss = result.gain_loss
+    percent_change = result.percent_change
     
     return fig, final_value, gain_loss, percent_change, stock_info
 
+@profiled()
 def create_bar_charts(df, weight_column="Weight"):
     """
     Crée des graphiques à barres horizontales pour la répartition sectorielle et géographique.
@@ -419,12 +400,13 @@ def create_bar_charts(df, weight_column="Weight"):
     
     return fig_sector, fig_geo
 
-def calculate_portfolio_stats(hist_data, portfolio_df, start_date, end_date):
+@profiled()
+def calculate_portfolio_stats(prices, portfolio_df, start_date, end_date):
     """
     Calcule les statistiques de performance pour chaque action du portefeuille.
     
     Args:
-        hist_data (dict): Données historiques des actions
+        prices (PriceMatrix): Matrice des clôtures alignées (dates x tickers)
         portfolio_df (DataFrame): DataFrame contenant les informations du portefeuille
         start_date (datetime): Date de début
         end_date (datetime): Date de fin
@@ -432,65 +414,56 @@ def calculate_portfolio_stats(hist_data, portfolio_df, start_date, end_date):
     Returns:
         DataFrame: DataFrame avec les statistiques calculées
     """
-    results = []
-    
-    # S'assurer que start_date et end_date sont définis
-    if not start_date:
-        start_date = min([hist.index[0] for ticker, hist in hist_data.items() if not hist.empty], default=None)
-    if not end_date:
-        end_date = max([hist.index[-1] for ticker, hist in hist_data.items() if not hist.empty], default=None)
-    
-    if not start_date or not end_date:
+    if prices.empty:
         return pd.DataFrame()
     
-    for ticker, hist in hist_data.items():
-        if hist.empty:
-            continue
-            
-        # Filtrer pour la période demandée
-        filtered_hist = hist[(hist.index >= start_date) & (hist.index <= end_date)]
-        if filtered_hist.empty or len(filtered_hist) < 2:
-            continue
-            
-        # Calculer la performance
-        initial_price = filtered_hist['Close'].iloc[0]
-        final_price = filtered_hist['Close'].iloc[-1]
-        
-        if initial_price <= 0:
-            continue
-            
-        percent_change = ((final_price - initial_price) / initial_price) * 100
-        
-        # Récupérer le nom de la société
-        name = get_company_name(ticker, portfolio_df)
-        
-        # Récupérer les autres informations du secteur/pays si disponibles
-        # Pour le moment, on les laisse vides car on se concentre sur la performance
-        results.append({
-            'Ticker': ticker,
-            'Name': name,
-            'Initial Price': initial_price,
-            'Final Price': final_price,
-            'Performance (%)': percent_change,
-            'Weight (%)': 100.0/len(hist_data),  # Répartition équitable
-            'Contribution': percent_change/len(hist_data)  # Contribution équitable
-        })
-    
-    # Convertir en DataFrame et trier par performance
-    if results:
-        df_results = pd.DataFrame(results)
-        df_results = df_results.sort_values(by='Performance (%)', ascending=False)
-        return df_results
-    else:
+    # Filtrer pour la période demandée (vue sur la matrice)
+    window = prices.window(start_date, end_date)
+    values = window.values
+    valid = ~np.isnan(values)
+    
+    # Premier et dernier prix coté de chaque valeur dans la fenêtre
+    n_valid = valid.sum(axis=0)
+    first_idx = valid.argmax(axis=0)
+    last_idx = len(values) - 1 - valid[::-1].argmax(axis=0)
+    cols = np.arange(values.shape[1])
+    initial_price = values[first_idx, cols] if len(values) else np.full(len(cols), np.nan)
+    final_price = values[last_idx, cols] if len(values) else np.full(len(cols), np.nan)
+    
+    # Au moins deux séances et un prix initial positif
+    keep = (n_valid >= 2) & (np.nan_to_num(initial_price) > 0)
+    if not keep.any():
         return pd.DataFrame()
+    
+    percent_change = (final_price[keep] - initial_price[keep]) / initial_price[keep] * 100
+    tickers = [t for t, ok in zip(prices.tickers, keep) if ok]
+    
+    # Récupérer le nom de la société (ticker si non trouvé)
+    names = portfolio_df.drop_duplicates('ticker').set_index('ticker')['name'] if 'name' in portfolio_df.columns else pd.Series(dtype=object)
+    
+    num_stocks = len(prices.tickers)
+    df_results = pd.DataFrame({
+        'Ticker': tickers,
+        'Name': [names.get(t, t) for t in tickers],
+        'Initial Price': initial_price[keep],
+        'Final Price': final_price[keep],
+        'Performance (%)': percent_change,
+        'Weight (%)': 100.0 / num_stocks,  # Répartition équitable
+        'Contribution': percent_change / num_stocks  # Contribution équitable
+    })
+    
+    # Trier par performance
+    return df_results.sort_values(by='Performance (%)', ascending=False)
 
-def display_top_contributors(df_perf, top_n=15):
+@profiled()
+def display_top_contributors(df_perf, top_n=15, key="contributors"):
     """
     Affiche les contributeurs positifs et négatifs.
     
     Args:
         df_perf (DataFrame): DataFrame avec les performances calculées
         top_n (int): Nombre de contributeurs à afficher
+        key (str): Préfixe des clés des tableaux (unique par affichage dans une même exécution)
     """
     if df_perf.empty:
         st.warning("Pas assez de données pour calculer les contributeurs.")
@@ -545,7 +518,7 @@ def display_top_contributors(df_perf, top_n=15):
                 height=min(40 * len(positive_contributors) + 50, 600)
             )
             
-            st.plotly_chart(fig_pos, use_container_width=True)
+            st.plotly_chart(fig_pos, use_container_width=True, key=f"{key}_pos")
         else:
             st.info("Aucun contributeur positif trouvé.")
     
@@ -582,10 +555,93 @@ def display_top_contributors(df_perf, top_n=15):
                 height=min(40 * len(negative_contributors) + 50, 600)
             )
             
-            st.plotly_chart(fig_neg, use_container_width=True)
+            st.plotly_chart(fig_neg, use_container_width=True, key=f"{key}_neg")
         else:
             st.info("Aucun contributeur négatif trouvé.")
 
+@profiled()
+def create_country_table(rows, full_height=False):
+    """
+    Crée le tableau des valeurs d'un pays (nom, secteur, performance du jour, devise).
+    
+    Args:
+        rows (DataFrame): Valeurs du pays (colonnes name, Sector, performance_day, currency)
+        full_height (bool): Affiche toutes les lignes (sinon hauteur limitée à 800 px)
+        
+    Returns:
+        go.Figure: Tableau Plotly
+    """
+    # Secteur (avec valeur par défaut si manquant)
+    sectors = rows['Sector'].fillna('Non disponible') if 'Sector' in rows.columns else ['Non disponible'] * len(rows)
+    
+    fig = go.Figure(data=[go.Table(
+        header=dict(
+            # Ordre des colonnes : Nom - Secteur - Performance - Devise
+            values=['<b>Nom complet de la société</b>', '<b>Secteur</b>', '<b>Performance du jour (%)</b>', '<b>Devise</b>'],
+            font=dict(size=14, color='white'),
+            fill_color='#693112',  # Fond marron
+            align='center',
+            height=40
+        ),
+        cells=dict(
+            values=[
+                rows['name'].tolist(),
+                list(sectors),
+                rows['performance_day'].tolist(),
+                rows['currency'].tolist()
+            ],
+            font=dict(size=14, color='#000000', weight='bold'),
+            align='center',
+            format=[None, None, None, None],
+            fill_color=['#F9F9F9'],
+            height=30
+        )
+    )])
+    
+    # 40px par ligne + 50px pour l'en-tête
+    base_height = 40 * len(rows) + 50
+    fig.update_layout(
+        margin=dict(l=5, r=5, t=0, b=0),
+        height=base_height if full_height else min(base_height, 800)
+    )
+    return fig
+
+@profiled(rows=None)
+def plot_correlation_heatmap(correlation, order=None, height=700):
+    """
+    Crée la carte de chaleur d'une matrice de corrélation, valeurs corrélées regroupées.
+    
+    Args:
+        correlation (SymmetricMatrix): Matrice de corrélation (voir covariance.CovarianceModel)
+        order (ndarray, optional): Ordre des tickers (voir covariance.cluster_order)
+        height (int): Hauteur du graphique
+        
+    Returns:
+        go.Figure: Figure Plotly avec la carte de chaleur
+    """
+    frame = correlation.to_frame(order)
+    labels = list(frame.index)
+    fig = go.Figure(go.Heatmap(
+        z=np.round(frame.to_numpy(), 3),
+        x=labels,
+        y=labels,
+        hovertemplate="%{y} / %{x}<br>Corrélation : %{z:.2f}<extra></extra>",
+        colorscale='RdBu',
+        reversescale=True,
+        zmin=-1,
+        zmax=1,
+        colorbar=dict(title="Corrélation")
+    ))
+    fig.update_layout(
+        height=height,
+        template="plotly_white",
+        margin=dict(l=0, r=0, t=10, b=10),
+        xaxis=dict(showticklabels=len(labels) <= 100, tickfont=dict(size=7)),
+        yaxis=dict(showticklabels=len(labels) <= 100, tickfont=dict(size=7), autorange='reversed')
+    )
+    return fig
+
+@profiled()
 def create_stock_chart(hist, ticker, currency="€", period="1 an"):
     """
     Crée un graphique d'évolution du cours d'une action.
@@ -661,4 +717,79 @@ def create_stock_chart(hist, ticker, currency="€", period="1 an"):
         plot_bgcolor='white'
     )
     
-    return fig, avg_price, max_price, min_price
\ No newline at end of file
+    return fig, avg_price, max_price, min_price
+
+def display_fetch_diagnostics(ledger, metrics=None, top_n=20, memory=None):
+    """
+    Affiche le diagnostic des récupérations de données : part servie par les caches,
+    replis simulés, erreurs, tickers les plus lents et mémoire des historiques projetés.
+    
+    Args:
+        ledger (FetchLedger): Journal des récupérations
+        metrics (dict, optional): Métriques de l'ordonnanceur (voir get_fetch_metrics)
+        top_n (int): Nombre de tickers affichés dans la synthèse
+        memory (DataFrame, optional): Mémoire des historiques projetés (voir get_history_memory_report)
+    """
+    records = ledger.to_frame()
+    if records.empty:
+        st.info("Aucune récupération enregistrée.")
+        return
+    
+    sources = records['Source'].value_counts()
+    cached = sources.reindex(["cache", "stale", "store"]).fillna(0).sum()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Récupérations", len(records))
+    col2.metric("Servies par un cache", f"{cached / len(records):.0%}")
+    col3.metric("Replis simulés", int(sources.get("fallback", 0)))
+    col4.metric("Erreurs", int(sources.get("error", 0)))
+    if metrics is not None:
+        st.caption(
+            f"Ordonnanceur : {metrics['requests']} requêtes, {metrics['retries']} nouvelles tentatives, "
+            f"latence p50 {metrics['latency_p50_s']:.2f}s / p95 {metrics['latency_p95_s']:.2f}s, "
+            f"attente de débit {metrics['throttle_wait_s']:.1f}s"
+        )
+    
+    st.markdown(f"**{top_n} tickers les plus coûteux**")
+    st.dataframe(ledger.summary().head(top_n), width="stretch")
+    
+    failed = records[records['Source'].isin(["fallback", "error"])]
+    if not failed.empty:
+        st.markdown("**Replis et erreurs**")
+        st.dataframe(failed, width="stretch", hide_index=True)
+    
+    if memory is not None and not memory.empty:
+        st.markdown("**Mémoire des historiques projetés**")
+        st.dataframe(memory, width="stretch", hide_index=True)
+    
+    st.markdown("**Journal complet**")
+    st.dataframe(records.iloc[::-1], width="stretch", hide_index=True)
+
+def display_timing_panel(runs, top_n=15):
+    """
+    Affiche les durées de la dernière exécution et leur évolution, avec export JSON.
+    
+    Args:
+        runs (list): Exécutions mesurées (ProfileRun), de la plus ancienne à la plus récente
+        top_n (int): Nombre de sections affichées
+    """
+    if not runs:
+        return
+    last = runs[-1]
+    st.markdown("**Durées de l'exécution**")
+    previous = runs[-2].wall_s if len(runs) > 1 else None
+    st.metric(
+        "Exécution complète", f"{last.wall_s:.2f} s",
+        delta=f"{last.wall_s - previous:+.2f} s" if previous is not None else None, delta_color="inverse"
+    )
+    
+    frame = last.to_frame()
+    steps = frame[frame['Niveau'] == 0].set_index('Section')['Durée (s)']
+    st.bar_chart(steps, horizontal=True)
+    st.dataframe(last.summary().head(top_n), width="stretch")
+    
+    if len(runs) > 1:
+        st.line_chart(pd.Series([r.wall_s for r in runs], name="Durée (s)"))
+    st.download_button(
+        "Exporter (JSON)", runs_to_json(runs),
+        file_name=f"profil_{last.started_at:%Y%m%d_%H%M%S}.json", mime="application/json"
+    )
@@ -0,0 +1,19 @@
+# conftest.py
+
+# Stockages des tests dans un répertoire temporaire, fournisseur synthétique et débit non limité,
+# fixés avant le chargement de la configuration (comme dans benchmarks/bench_pipeline.py).
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+WORK_DIR = tempfile.mkdtemp(prefix="komorebi-tests-")
+os.environ.setdefault("KOMOREBI_HISTORY_STORE_DIR", os.path.join(WORK_DIR, "history"))
+os.environ.setdefault("KOMOREBI_ARCHIVE_DIR", os.path.join(WORK_DIR, "archive"))
+os.environ.setdefault("KOMOREBI_SNAPSHOT_DIR", os.path.join(WORK_DIR, "snapshot"))
+os.environ.setdefault("KOMOREBI_MARKET_STORE_PATH", os.path.join(WORK_DIR, "market.db"))
+os.environ.setdefault("KOMOREBI_DATA_PROVIDER", "synthetic")
+os.environ.setdefault("KOMOREBI_FETCH_RATE", "0")
+os.environ["KOMOREBI_USE_REFRESHER"] = "0"
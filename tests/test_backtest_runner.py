@@ -0,0 +1,46 @@
+# test_backtest_runner.py
+
+# Balayage réparti sur un pool de processus (matrice en mémoire partagée) comparé à
+# l'exécution dans le processus courant et au portefeuille acheté-conservé.
+
+import glob
+
+import numpy as np
+import pandas as pd
+
+from src.backtest_runner import HOLDING_PERIODS, build_scenarios, run_scenarios
+from src.portfolio_engine import PortfolioEngine
+from src.price_matrix import PriceMatrix
+
+
+def make_prices(n_dates=800, n_tickers=12, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2021-01-04", periods=n_dates)
+    values = 100 * np.cumprod(1 + rng.normal(0.0002, 0.015, (n_dates, n_tickers)), axis=0)
+    values[:30, 3] = np.nan
+    return PriceMatrix(dates, [f"T{i}" for i in range(n_tickers)], values)
+
+
+def test_pool_matches_single_process():
+    prices = make_prices()
+    scenarios = build_scenarios(prices.dates, HOLDING_PERIODS, (None, "monthly", "quarterly"), step=10)
+    segments = set(glob.glob("/dev/shm/psm_*"))
+    pooled = run_scenarios(prices, scenarios, max_workers=4, chunk_size=16)
+    single = run_scenarios(prices, scenarios, max_workers=1)
+    assert len(pooled) == len(scenarios)
+    pd.testing.assert_frame_equal(pooled, single)
+    # Le segment partagé est supprimé à la fin du balayage
+    assert set(glob.glob("/dev/shm/psm_*")) <= segments
+
+
+def test_buy_and_hold_matches_portfolio_engine():
+    prices = make_prices()
+    scenarios = build_scenarios(prices.dates, HOLDING_PERIODS, step=50)
+    results = run_scenarios(prices, scenarios, max_workers=1)
+    for row in results.sample(20, random_state=0).itertuples():
+        window = prices.window(row.start, row.end)
+        # Équipondéré sur les valeurs cotées à la date d'entrée
+        valid = np.nan_to_num(window.values[0]) > 0
+        weights = valid / valid.sum()
+        value = PortfolioEngine(window).run(1.0, weights).final_value
+        assert np.isclose(row.return_pct, (value - 1) * 100, rtol=1e-10)
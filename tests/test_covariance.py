@@ -0,0 +1,108 @@
+# test_covariance.py
+
+# Modèle de covariance glissant : mises à jour de rang 1 identiques à un calcul complet,
+# rétrécissement de Ledoit-Wolf comparé à la formule de référence, réutilisation et
+# mise à jour des modèles conservés par get_covariance_model.
+
+import numpy as np
+import pandas as pd
+
+from src import market_data
+from src.covariance import CovarianceModel
+from src.price_matrix import PriceMatrix
+
+
+def make_prices(n_dates=160, n_tickers=8, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2023-01-02", periods=n_dates)
+    factor = rng.normal(0, 0.01, (n_dates, 1))
+    values = 100 * np.cumprod(1 + factor + rng.normal(0, 0.01, (n_dates, n_tickers)), axis=0)
+    values[:20, 3] = np.nan
+    return PriceMatrix(dates, [f"T{i}" for i in range(n_tickers)], values)
+
+
+def head(prices, n):
+    return PriceMatrix(prices.dates[:n], prices.tickers, prices.values[:n])
+
+
+def window_returns(prices, window):
+    values = prices.values[-window - 1:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = values[1:] / values[:-1] - 1
+    return np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def ledoit_wolf(returns):
+    """Ledoit et Wolf (2004), lemme 3.2 et suivants : cible mu * I, normes de Frobenius / p."""
+    n, p = returns.shape
+    y = returns - returns.mean(axis=0)
+    sample = y.T @ y / n
+    mu = np.trace(sample) / p
+    target = mu * np.eye(p)
+    d2 = np.sum((sample - target) ** 2) / p
+    b2_bar = sum(np.sum((np.outer(row, row) - sample) ** 2) for row in y) / n ** 2 / p
+    delta = min(b2_bar, d2) / d2
+    return delta * target + (1 - delta) * sample, delta
+
+
+def assert_same_model(model, expected):
+    assert list(model.dates) == list(expected.dates)
+    for shrink in (False, True):
+        np.testing.assert_allclose(model.covariance(shrink).to_array(), expected.covariance(shrink).to_array(),
+                                   rtol=1e-8, atol=1e-14)
+        np.testing.assert_allclose(model.correlation(shrink).to_array(), expected.correlation(shrink).to_array(),
+                                   rtol=1e-8, atol=1e-12)
+    assert np.isclose(model.shrinkage, expected.shrinkage, rtol=1e-8)
+
+
+def test_incremental_append_matches_from_prices():
+    prices = make_prices()
+    model = CovarianceModel.from_prices(head(prices, 60), window=40)
+    # Ajouts successifs : fenêtre pleine, rendements sortants retirés à chaque séance
+    for n in range(61, len(prices) + 1):
+        model.append(prices.dates[n - 1], prices.values[n - 1])
+    assert len(model) == 40
+    assert_same_model(model, CovarianceModel.from_prices(prices, window=40))
+
+
+def test_window_not_yet_full_matches_from_prices():
+    prices = make_prices()
+    model = CovarianceModel.from_prices(head(prices, 10), window=40)
+    for n in range(11, 31):
+        model.append(prices.dates[n - 1], prices.values[n - 1])
+    assert len(model) == 29
+    assert_same_model(model, CovarianceModel.from_prices(head(prices, 30), window=40))
+
+
+def test_sample_covariance_and_shrinkage_match_reference():
+    prices = make_prices()
+    model = CovarianceModel.from_prices(prices, window=60)
+    returns = window_returns(prices, 60)
+    np.testing.assert_allclose(model.covariance(shrink=False).to_array(), np.cov(returns.T, bias=True), rtol=1e-9)
+
+    shrunk, delta = ledoit_wolf(returns)
+    assert 0 < delta < 1
+    assert np.isclose(model.shrinkage, delta, rtol=1e-9)
+    np.testing.assert_allclose(model.covariance().to_array(), shrunk, rtol=1e-9)
+    np.testing.assert_allclose(model.covariance(annualize=True).to_array(), shrunk * 252, rtol=1e-9)
+
+
+def test_get_covariance_model_reuses_and_extends_previous_model():
+    market_data.clear_caches()
+    prices = make_prices()
+    first = market_data.get_covariance_model(head(prices, 150), window=60)
+    assert market_data.get_covariance_model(head(prices, 150), window=60) is first
+
+    # Séance suivante : modèle de la veille copié puis mis à jour, la veille reste intacte
+    second = market_data.get_covariance_model(head(prices, 151), window=60)
+    assert second is not first and first.end == prices.dates[149] and second.end == prices.dates[150]
+    assert_same_model(second, CovarianceModel.from_prices(head(prices, 151), window=60))
+
+    # Dernière séance révisée : nouveau modèle, issu de la veille et de la ligne révisée
+    revised = prices.values[:151].copy()
+    revised[-1] *= 1.01
+    revised = PriceMatrix(prices.dates[:151], prices.tickers, revised)
+    third = market_data.get_covariance_model(revised, window=60)
+    assert third is not second
+    assert_same_model(third, CovarianceModel.from_prices(revised, window=60))
+    market_data.clear_caches()
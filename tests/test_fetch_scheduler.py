@@ -0,0 +1,123 @@
+# test_fetch_scheduler.py
+
+# Ordonnanceur des requêtes : résultats comparés aux appels directs, nouvelles tentatives et
+# délai maximal sur un fournisseur simulé, limite de concurrence et seau à jetons.
+
+import threading
+import time
+
+import pytest
+
+from src.fetch_scheduler import FetchScheduler, TokenBucket
+
+
+class FlakyProvider:
+    """Fournisseur simulé : échecs transitoires, tickers absents et réponses lentes."""
+
+    def __init__(self, failures=0, delay=0.0, missing=()):
+        self.failures = failures
+        self.delay = delay
+        self.missing = set(missing)
+        self.calls = {}
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def get_price(self, ticker):
+        with self._lock:
+            self.calls[ticker] = self.calls.get(ticker, 0) + 1
+            attempt = self.calls[ticker]
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if ticker in self.missing:
+                raise KeyError(ticker)
+            if attempt <= self.failures:
+                raise ConnectionError(f"{ticker}: erreur transitoire")
+            return len(ticker) * 10.0
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def scheduler(**kwargs):
+    options = dict(max_concurrency=4, rate=0, burst=1, max_retries=3, backoff_base=0.001, backoff_max=0.005, timeout=5.0)
+    options.update(kwargs)
+    return FetchScheduler(**options)
+
+
+def test_map_matches_direct_calls():
+    provider = FlakyProvider()
+    tickers = [f"T{i:0{1 + i % 3}d}" for i in range(40)]
+    results = scheduler().map(provider.get_price, tickers)
+    assert results == [(FlakyProvider().get_price(t), None) for t in tickers]
+
+
+def test_transient_errors_are_retried():
+    provider = FlakyProvider(failures=2)
+    sched = scheduler()
+    results = sched.map(provider.get_price, ["A", "BB"], trace=True)
+    assert [(r, e) for r, e, _ in results] == [(10.0, None), (20.0, None)]
+    assert [stats[1] for _, _, stats in results] == [2, 2]
+    assert provider.calls == {"A": 3, "BB": 3}
+    metrics = sched.metrics.snapshot()
+    assert metrics["requests"] == 6 and metrics["retries"] == 4 and metrics["failures"] == 0
+
+
+def test_retries_are_bounded():
+    provider = FlakyProvider(failures=10)
+    [(result, error)] = scheduler(max_retries=2).map(provider.get_price, ["A"])
+    assert result is None and isinstance(error, ConnectionError)
+    assert provider.calls == {"A": 3}
+
+
+def test_missing_ticker_is_not_retried():
+    provider = FlakyProvider(missing={"X"})
+    [(result, error)] = scheduler().map(provider.get_price, ["X"])
+    assert result is None and isinstance(error, KeyError)
+    assert provider.calls == {"X": 1}
+
+
+def test_timeout_abandons_slow_requests():
+    provider = FlakyProvider(delay=0.3)
+    sched = scheduler(timeout=0.05, max_retries=0)
+    t0 = time.perf_counter()
+    [(result, error)] = sched.map(provider.get_price, ["A"])
+    assert time.perf_counter() - t0 < 0.25
+    assert result is None and isinstance(error, TimeoutError)
+    assert sched.metrics.snapshot()["timeouts"] == 1
+
+
+def test_concurrency_limit_is_per_process():
+    provider = FlakyProvider(delay=0.02)
+    sched = scheduler(max_concurrency=3)
+    callers = [
+        threading.Thread(target=sched.map, args=(provider.get_price, [f"{c}{i}" for i in range(10)]))
+        for c in "ABCD"
+    ]
+    for t in callers:
+        t.start()
+    for t in callers:
+        t.join()
+    assert sum(provider.calls.values()) == 40
+    assert provider.peak <= 3
+
+
+def test_token_bucket_delays():
+    bucket = TokenBucket(rate=10, capacity=2)
+    delays = [bucket.reserve() for _ in range(4)]
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2] == pytest.approx(0.1, abs=0.01)
+    assert delays[3] == pytest.approx(0.2, abs=0.01)
+    assert TokenBucket(rate=0, capacity=1).reserve() == 0.0
+
+
+def test_rate_limit_spaces_requests():
+    provider = FlakyProvider()
+    sched = scheduler(rate=50, burst=1)
+    t0 = time.perf_counter()
+    sched.map(provider.get_price, [f"T{i}" for i in range(11)])
+    # 10 requêtes au-delà de la réserve, à 50 par seconde
+    assert time.perf_counter() - t0 >= 0.18
+    assert sched.metrics.snapshot()["throttle_wait_s"] > 0
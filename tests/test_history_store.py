@@ -0,0 +1,123 @@
+# test_history_store.py
+
+# Mise à jour incrémentale du stockage des historiques comparée au téléchargement complet
+# du même historique, y compris après une division ou un dividende (prix ajustés).
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.history_store import HistoryStore
+
+
+class FakeProvider:
+    """Historique ajusté en mémoire ; conserve les fenêtres demandées."""
+
+    def __init__(self, hist):
+        self.hist = hist
+        self.calls = []
+
+    def get_history(self, ticker, start=None, end=None, period=None):
+        self.calls.append((pd.Timestamp(start), end))
+        hist = self.hist[self.hist.index >= pd.Timestamp(start).normalize()]
+        if end is not None:
+            hist = hist[hist.index < pd.Timestamp(end)]
+        return hist.copy()
+
+
+def make_history(n_dates=300, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2023-01-02", periods=n_dates)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n_dates))
+    return pd.DataFrame({
+        "Open": close * 0.995, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+        "Volume": rng.integers(1_000, 10_000, n_dates).astype(np.float64),
+        "Dividends": 0.0, "Stock Splits": 0.0
+    }, index=dates)
+
+
+def test_tail_only_without_adjustment(tmp_path):
+    full = make_history()
+    provider = FakeProvider(full.iloc[:250])
+    store = HistoryStore(str(tmp_path))
+    store.update("T", provider, full.index[0])
+
+    provider.hist = full
+    provider.calls.clear()
+    window = store.update("T", provider, full.index[0])
+    assert provider.calls == [(full.index[249], None)]
+    pd.testing.assert_frame_equal(window, full, check_freq=False)
+
+
+def test_split_refetches_full_range(tmp_path):
+    # Avant la division 4:1 de la séance 260, la source renvoie des prix 4 fois plus élevés ;
+    # après, toute la série antérieure est ajustée
+    adjusted = make_history()
+    adjusted.iloc[260, adjusted.columns.get_loc("Stock Splits")] = 4.0
+    before_split = adjusted.iloc[:250].copy()
+    before_split.iloc[:, :4] *= 4
+    before_split["Volume"] /= 4
+    provider = FakeProvider(before_split)
+    store = HistoryStore(str(tmp_path))
+    store.update("T", provider, adjusted.index[0])
+
+    provider.hist = adjusted
+    window = store.update("T", provider, adjusted.index[0])
+    pd.testing.assert_frame_equal(window, adjusted, check_freq=False)
+    assert window["Close"].pct_change().abs().max() < 0.1
+
+
+def test_dividend_on_new_session_refetches(tmp_path):
+    full = make_history()
+    provider = FakeProvider(full.iloc[:250])
+    store = HistoryStore(str(tmp_path))
+    store.update("T", provider, full.index[0])
+
+    adjusted = full.copy()
+    adjusted.iloc[:255, :4] *= 0.98
+    adjusted.iloc[255, adjusted.columns.get_loc("Dividends")] = 2.0
+    provider.hist = adjusted
+    pd.testing.assert_frame_equal(store.update("T", provider, full.index[0]), adjusted, check_freq=False)
+
+    # Dividende déjà stocké : les mises à jour suivantes ne téléchargent que la queue
+    provider.calls.clear()
+    store.update("T", provider, full.index[0])
+    assert provider.calls == [(adjusted.index[-1], None)]
+
+
+def test_revised_last_session_is_not_an_adjustment(tmp_path):
+    full = make_history()
+    partial = full.iloc[:250].copy()
+    partial.iloc[-1, partial.columns.get_loc("Close")] *= 1.01
+    provider = FakeProvider(partial)
+    store = HistoryStore(str(tmp_path))
+    store.update("T", provider, full.index[0])
+
+    provider.hist = full
+    provider.calls.clear()
+    window = store.update("T", provider, full.index[0])
+    assert len(provider.calls) == 1
+    pd.testing.assert_frame_equal(window, full, check_freq=False)
+
+
+def test_concurrent_updates(tmp_path):
+    full = make_history()
+    store = HistoryStore(str(tmp_path))
+    errors = []
+
+    def run(n):
+        try:
+            store.update("T", FakeProvider(full.iloc[:n]), full.index[0])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(200 + 10 * i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert not [f for f in os.listdir(tmp_path) if f.endswith(".tmp")]
+    assert len(store.load("T")) >= 200
@@ -0,0 +1,90 @@
+# test_intraday.py
+
+# Séries du portefeuille mises à jour par le point du jour, comparées au calcul complet
+# (PortfolioEngine) sur la matrice prolongée des mêmes cotations.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.intraday import IncrementalPortfolioSeries
+from src.portfolio_engine import PortfolioEngine
+from src.price_matrix import PriceMatrix
+
+TICKERS = [f"T{i}" for i in range(6)]
+
+
+def make_values(n_dates=300, seed=0):
+    rng = np.random.default_rng(seed)
+    values = 100 * np.cumprod(1 + rng.normal(0, 0.01, (n_dates, len(TICKERS))), axis=0)
+    values[:20, 4] = np.nan
+    return values
+
+
+def matrix(values, end="2024-03-01"):
+    return PriceMatrix(pd.bdate_range(end=end, periods=len(values)), TICKERS, values)
+
+
+def quotes(prices):
+    return pd.DataFrame({"current_price": prices}, index=TICKERS)
+
+
+def reference(values, end="2024-03-01"):
+    prices = matrix(values, end)
+    value = PortfolioEngine(prices).run(1_000_000).total_value
+    base = values[0]
+    valid = np.nan_to_num(base) > 0
+    performance = pd.Series(np.nanmean(values[:, valid] / base[valid] * 100, axis=1), index=prices.dates)
+    return performance, value
+
+
+def test_history_only_matches_engine():
+    values = make_values()
+    series = IncrementalPortfolioSeries(None, 1_000_000)
+    performance, value = series.sync(matrix(values))
+    expected_perf, expected_value = reference(values)
+    pd.testing.assert_series_equal(performance, expected_perf, check_freq=False, check_names=False)
+    pd.testing.assert_series_equal(value, expected_value, check_freq=False, check_names=False)
+
+
+def test_todays_point_matches_extended_matrix():
+    values = make_values()
+    series = IncrementalPortfolioSeries(None, 1_000_000)
+    prices = matrix(values)
+    now = pd.Timestamp("2024-03-04 11:00")
+    series.sync(prices, quotes(values[-1] * 1.01), now=now)
+    # Cotation révisée dans la journée : seul le dernier point change, sans copie des séries
+    first, _ = series.sync(prices, quotes(values[-1] * 1.02), now=now)
+    performance, value = series.sync(prices, quotes(values[-1] * 1.03), now=now)
+    assert series.full_rebuilds == 1 and series.incremental_updates == 3
+    assert np.shares_memory(first.to_numpy(), performance.to_numpy())
+
+    extended = np.vstack([values, values[-1] * 1.03])
+    expected_perf, expected_value = reference(extended, end="2024-03-04")
+    np.testing.assert_allclose(performance.to_numpy(), expected_perf.to_numpy(), rtol=1e-12)
+    np.testing.assert_allclose(value.to_numpy(), expected_value.to_numpy(), rtol=1e-12)
+    assert performance.index[-1] == pd.Timestamp("2024-03-04")
+
+
+def test_series_are_read_only():
+    values = make_values()
+    series = IncrementalPortfolioSeries(None, 1_000_000)
+    performance, _ = series.sync(matrix(values), quotes(values[-1]), now=pd.Timestamp("2024-03-04"))
+    with pytest.raises(ValueError):
+        performance.to_numpy()[-1] = 0.0
+
+
+def test_new_sessions_without_history_grow_the_series():
+    values = make_values()
+    series = IncrementalPortfolioSeries(None, 1_000_000)
+    prices = matrix(values)
+    days = pd.bdate_range("2024-03-04", periods=IncrementalPortfolioSeries.SPARE_POINTS + 3)
+    for day in days:
+        performance, _ = series.sync(prices, quotes(values[-1]), now=day + pd.Timedelta(hours=12))
+    assert list(performance.index[-len(days):]) == list(days)
+    assert len(performance) == len(values) + len(days)
+    assert series.full_rebuilds == 1
+
+    # Une séance de plus dans l'historique : recalcul complet
+    series.sync(matrix(np.vstack([values, values[-1]]), end="2024-03-04"))
+    assert series.full_rebuilds == 2 and len(series.performance) == len(values) + 1
@@ -0,0 +1,25 @@
+# test_market_data.py
+
+# Services de la couche de données (fournisseur synthétique, stockages temporaires)
+# comparés à un calcul direct sur les mêmes historiques.
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src import market_data
+
+START = datetime(2023, 1, 5)
+INDICES = {"CAC 40": "^FCHI", "S&P 500": "^GSPC"}
+
+
+def test_reference_performance_matches_direct_computation():
+    dates = pd.bdate_range(START, periods=400)
+    series = market_data.get_reference_performance(INDICES, START, dates)
+    hist = market_data.get_historical_data(list(INDICES.values()), START, fields=("Close",))
+    for name, ticker in INDICES.items():
+        close = hist[ticker]['Close'].astype(np.float64).reindex(dates, method='ffill')
+        np.testing.assert_allclose(series[name].to_numpy(), (close / close.iloc[0] * 100).to_numpy(), rtol=1e-12)
+    # Mêmes dates et mêmes historiques : séries réutilisées
+    assert market_data.get_reference_performance(INDICES, START, dates) is series
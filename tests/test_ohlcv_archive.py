@@ -0,0 +1,146 @@
+# test_ohlcv_archive.py
+
+# Archive OHLCV segmentée : vue identique aux historiques sources et à une reconstruction
+# complète après chaque mise à jour (séance nouvelle, inchangée, réajustée), seules les
+# séances récentes réécrites, version précédente conservée.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from src import ohlcv_archive
+from src.ohlcv_archive import OHLCVArchive
+
+TICKERS = ["AAA", "BBB", "CCC"]
+START = pd.Timestamp("2024-01-01")
+
+
+def make_histories(n_dates=120, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(START, periods=n_dates)
+    histories = {}
+    for i, ticker in enumerate(TICKERS):
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n_dates))
+        hist = pd.DataFrame({
+            "Open": close * 0.99, "High": close * 1.01, "Low": close * 0.98, "Close": close,
+            "Volume": rng.integers(1_000, 100_000, n_dates).astype(np.float64),
+            "Dividends": 0.0, "Stock Splits": 0.0
+        }, index=dates)
+        # Jours fériés et cotation tardive : séances absentes de l'historique source
+        hist = hist.drop(dates[[10, 50]])
+        histories[ticker] = hist.iloc[30:] if i == 2 else hist
+    return histories
+
+
+def through(histories, end):
+    return {t: h[h.index <= end] for t, h in histories.items()}
+
+
+def assert_matches(archive, histories, fields=("Close", "Volume")):
+    view = archive.view(TICKERS, fields, START)
+    assert list(view) == TICKERS
+    for ticker, hist in histories.items():
+        expected = hist[list(fields)].astype({"Volume": np.int64} if "Volume" in fields else {})
+        pd.testing.assert_frame_equal(view[ticker], expected, check_freq=False, check_index_type=False)
+
+
+def segments(archive):
+    return archive._open()[1]["segments"]
+
+
+def test_build_matches_histories(tmp_path):
+    histories = make_histories()
+    archive = OHLCVArchive(str(tmp_path))
+    end = histories["AAA"].index[-1]
+    archive.build(TICKERS, START, end, histories.items())
+    assert_matches(archive, histories)
+
+    view = archive.view(TICKERS, ("Volume",), START)
+    assert view.field("Volume").dtype == np.int64
+    # Séances absentes lues dans Close, même si seul le volume est demandé
+    assert len(view["CCC"]) == len(histories["CCC"])
+    assert "AAA" in view and "ZZZ" not in view
+
+
+def test_new_session_rewrites_only_the_tail(tmp_path):
+    histories = make_histories()
+    dates = histories["AAA"].index
+    archive = OHLCVArchive(str(tmp_path))
+    archive.build(TICKERS, START, dates[-3], through(histories, dates[-3]).items())
+    base, _ = segments(archive)
+
+    archive.update(TICKERS, START, dates[-2], through(histories, dates[-2]).items())
+    archive.update(TICKERS, START, dates[-1], histories.items())
+    assert segments(archive)[0] == base
+    assert_matches(archive, histories, tuple(ohlcv_archive.FIELD_DTYPES))
+
+    rebuilt = OHLCVArchive(str(tmp_path / "rebuilt"))
+    rebuilt.build(TICKERS, START, dates[-1], histories.items())
+    for ticker in TICKERS:
+        pd.testing.assert_frame_equal(archive.view(TICKERS, ("Close",), START)[ticker],
+                                      rebuilt.view(TICKERS, ("Close",), START)[ticker])
+
+
+def test_unchanged_update_only_renews_the_pointer(tmp_path):
+    histories = make_histories()
+    end = histories["AAA"].index[-1]
+    archive = OHLCVArchive(str(tmp_path))
+    archive.build(TICKERS, START, end, histories.items())
+    version, _, _, _, built_at = archive._open()
+
+    archive.update(TICKERS, START, end, histories.items())
+    assert archive._open()[0] == version and archive._open()[4] >= built_at
+    assert archive.covers(TICKERS, START, max_age=60)
+
+
+def test_adjusted_history_rebuilds_the_base(tmp_path):
+    histories = make_histories()
+    dates = histories["AAA"].index
+    archive = OHLCVArchive(str(tmp_path))
+    archive.build(TICKERS, START, dates[-2], through(histories, dates[-2]).items())
+    base, _ = segments(archive)
+
+    # Division 2:1 à la dernière séance : tout l'historique ajusté de BBB change
+    adjusted = dict(histories)
+    bbb = histories["BBB"].copy()
+    bbb.loc[bbb.index[:-1], ["Open", "High", "Low", "Close"]] /= 2
+    bbb.loc[bbb.index[-1], "Stock Splits"] = 2.0
+    adjusted["BBB"] = bbb
+    archive.update(TICKERS, START, dates[-1], adjusted.items())
+    assert segments(archive)[0] != base
+    assert_matches(archive, adjusted, tuple(ohlcv_archive.FIELD_DTYPES))
+
+
+def test_long_tail_is_merged_into_the_base(tmp_path, monkeypatch):
+    monkeypatch.setattr(ohlcv_archive, "TAIL_ROWS", 2)
+    histories = make_histories()
+    dates = histories["AAA"].index
+    archive = OHLCVArchive(str(tmp_path))
+    archive.build(TICKERS, START, dates[-5], through(histories, dates[-5]).items())
+    base, _ = segments(archive)
+
+    archive.update(TICKERS, START, dates[-1], histories.items())
+    assert segments(archive)[0] != base
+    assert archive._open()[1]["base_rows"] == len(archive._open()[2]) - 1
+    assert_matches(archive, histories)
+
+
+def test_cleanup_keeps_current_and_previous_versions(tmp_path):
+    histories = make_histories()
+    dates = histories["AAA"].index
+    archive = OHLCVArchive(str(tmp_path))
+    archive.build(TICKERS, START, dates[-4], through(histories, dates[-4]).items())
+    first = segments(archive)
+    archive.update(TICKERS, START, dates[-3], through(histories, dates[-3]).items())
+    previous = segments(archive)
+    reader = archive.view(TICKERS, ("Close",), START)
+
+    archive.update(TICKERS, START, dates[-2], through(histories, dates[-2]).items())
+    current = segments(archive)
+    on_disk = {name for name in os.listdir(tmp_path) if os.path.isdir(tmp_path / name)}
+    assert on_disk == set(current) | set(previous)
+    assert first[1] not in on_disk
+    # Une vue de la version précédente reste lisible
+    pd.testing.assert_frame_equal(reader["AAA"], through(histories, dates[-3])["AAA"][["Close"]],
+                                  check_freq=False, check_index_type=False)
@@ -0,0 +1,69 @@
+# test_rebalancing.py
+
+# Simulations de rééquilibrage comparées au portefeuille acheté-conservé (PortfolioEngine)
+# et à une simulation de référence, séance par séance.
+
+import numpy as np
+import pandas as pd
+
+from src.portfolio_engine import PortfolioEngine
+from src.price_matrix import PriceMatrix
+from src.rebalancing import schedule_mask, simulate_rebalancing
+
+
+def make_prices(n_dates=500, n_tickers=8, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2022-01-03", periods=n_dates)
+    values = 100 * np.cumprod(1 + rng.normal(0.0003, 0.02, (n_dates, n_tickers)), axis=0)
+    return PriceMatrix(dates, [f"T{i}" for i in range(n_tickers)], values)
+
+
+def reference(prices, initial, frequency=None, drift_threshold=None, cost_bps=10.0):
+    """Simulation séance par séance : parts constantes, rééquilibrage aux prix du jour."""
+    px = prices.values
+    target = np.full(px.shape[1], 1.0 / px.shape[1])
+    shares = initial * target / px[0]
+    scheduled = schedule_mask(prices.dates, frequency)
+    total = [initial]
+    for i in range(1, len(px)):
+        value = px[i] @ shares
+        positions = px[i] * shares
+        breach = drift_threshold is not None and (np.abs(positions / value / target - 1) > drift_threshold).any()
+        if scheduled[i] or breach:
+            cost = np.abs(value * target - positions).sum() * cost_bps / 10_000
+            value -= cost
+            shares = value * target / px[i]
+        total.append(value)
+    return np.array(total)
+
+
+def test_buy_and_hold_matches_portfolio_engine():
+    prices = make_prices()
+    result = simulate_rebalancing(prices, 1_000_000, cost_bps=10.0)
+    expected = PortfolioEngine(prices).run(1_000_000).total_value
+    np.testing.assert_allclose(result.total_value.to_numpy(), expected.to_numpy(), rtol=1e-12)
+    assert result.n_rebalances == 0 and result.total_costs == 0
+
+
+def test_calendar_rebalancing_matches_reference():
+    prices = make_prices()
+    for frequency in ("monthly", "quarterly", "annually"):
+        result = simulate_rebalancing(prices, 1_000_000, frequency=frequency)
+        np.testing.assert_allclose(result.total_value.to_numpy(), reference(prices, 1_000_000, frequency), rtol=1e-10)
+
+
+def test_drift_band_matches_reference():
+    # Fenêtre plus longue qu'un bloc de détection (DRIFT_BLOCK)
+    prices = make_prices(n_dates=700)
+    for threshold in (0.05, 0.25):
+        result = simulate_rebalancing(prices, 1_000_000, drift_threshold=threshold)
+        np.testing.assert_allclose(
+            result.total_value.to_numpy(), reference(prices, 1_000_000, drift_threshold=threshold), rtol=1e-10
+        )
+        assert result.n_rebalances > 0
+
+
+def test_schedule_mask_first_business_day():
+    dates = pd.bdate_range("2023-01-02", "2023-12-29")
+    mask = schedule_mask(dates, "quarterly")
+    assert list(dates[mask]) == [pd.Timestamp(d) for d in ("2023-04-03", "2023-07-03", "2023-10-02")]
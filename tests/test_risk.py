@@ -0,0 +1,62 @@
+# test_risk.py
+
+# Indicateurs de risque vectorisés comparés à un calcul pandas colonne par colonne
+# (séances communes pour le bêta et la corrélation), y compris pour des rendements
+# de forte moyenne et de faible dispersion.
+
+import numpy as np
+import pandas as pd
+
+from src.price_matrix import PriceMatrix
+from src.risk import risk_metrics, TRADING_DAYS
+
+
+def make_prices(n_dates=500, n_tickers=5, drift=0.0003, noise=0.015, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2021-01-04", periods=n_dates)
+    values = 100 * np.cumprod(1 + rng.normal(drift, noise, (n_dates, n_tickers)), axis=0)
+    values[:120, 1] = np.nan
+    bench = 100 * np.cumprod(1 + rng.normal(drift, noise / 2, n_dates))
+    bench[200:205] = np.nan
+    prices = PriceMatrix(dates, [f"T{i}" for i in range(n_tickers)], values)
+    return prices, pd.Series(bench, index=dates)
+
+
+def reference(prices, bench, rf):
+    frame = pd.DataFrame(prices.values, index=prices.dates, columns=prices.tickers)
+    returns = frame / frame.shift(1) - 1
+    # Prix de l'indice propagés vers l'avant, comme dans risk_metrics
+    b = bench.ffill()
+    b_returns = b / b.shift(1) - 1
+    rows = {}
+    for ticker in prices.tickers:
+        r = returns[ticker].dropna()
+        vol = r.std() * np.sqrt(TRADING_DAYS)
+        level = frame[ticker].dropna()
+        pair = pd.concat([returns[ticker], b_returns], axis=1).dropna()
+        x, y = pair.iloc[:, 0], pair.iloc[:, 1]
+        rows[ticker] = {
+            "Volatilité (%)": vol * 100,
+            "Drawdown max (%)": (level / level.cummax() - 1).min() * 100,
+            "Sharpe": (r.mean() * TRADING_DAYS - rf) / vol,
+            "Bêta Indice": x.cov(y) / y.var(),
+            "Corrélation Indice": x.corr(y)
+        }
+    return pd.DataFrame(rows).T
+
+
+def test_matches_pandas_reference():
+    prices, bench = make_prices()
+    metrics = risk_metrics(prices, {"Indice": bench}, risk_free_rate=0.02)
+    expected = reference(prices, bench, 0.02)
+    pd.testing.assert_frame_equal(metrics[expected.columns], expected, rtol=1e-9, check_dtype=False)
+
+
+def test_low_dispersion_returns_keep_precision():
+    # Rendements de moyenne élevée et d'écart-type minuscule : E[x²] - E[x]² perdrait
+    # la plupart des chiffres significatifs
+    prices, bench = make_prices(drift=0.01, noise=1e-7, seed=1)
+    metrics = risk_metrics(prices, {"Indice": bench}, risk_free_rate=0.0)
+    expected = reference(prices, bench, 0.0)
+    cols = ["Volatilité (%)", "Bêta Indice", "Corrélation Indice"]
+    pd.testing.assert_frame_equal(metrics[cols], expected[cols], rtol=1e-6, check_dtype=False)
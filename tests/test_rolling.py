@@ -0,0 +1,86 @@
+# test_rolling.py
+
+# Mises à jour incrémentales des statistiques glissantes (nouvelle séance, révision de la
+# dernière séance) comparées à un calcul complet sur la même matrice.
+
+import numpy as np
+import pandas as pd
+
+from src.price_matrix import PriceMatrix
+from src.rolling import RollingAnalytics, WINDOWS
+
+
+def make_prices(n_dates=400, n_tickers=6, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2022-01-03", periods=n_dates)
+    values = 100 * np.cumprod(1 + rng.normal(0, 0.01, (n_dates, n_tickers)), axis=0)
+    values[:40, 2] = np.nan
+    bench = pd.Series(1000 * np.cumprod(1 + rng.normal(0, 0.008, n_dates)), index=dates)
+    return dates, values, bench
+
+
+def matrix(dates, values, n):
+    # Lignes en lecture seule, comme dans un instantané projeté en mémoire
+    window = values[:n].copy()
+    window.flags.writeable = False
+    return PriceMatrix(dates[:n], [f"T{i}" for i in range(values.shape[1])], window)
+
+
+def assert_same_stats(incremental, rebuilt):
+    pd.testing.assert_frame_equal(incremental.latest(), rebuilt.latest(), rtol=1e-9)
+    for window in WINDOWS:
+        for stat, frame in incremental.history(window).items():
+            pd.testing.assert_frame_equal(frame, rebuilt.history(window)[stat], rtol=1e-9, check_freq=False)
+
+
+def test_revised_last_bar_matches_rebuild():
+    dates, values, bench = make_prices()
+    analytics = RollingAnalytics(dates[0])
+    analytics.sync(matrix(dates, values, 300), bench[:300])
+
+    # Cours révisé en séance : même date, dernière ligne différente
+    values[299] *= 1.02
+    bench.iloc[299] *= 0.99
+    stats = analytics.sync(matrix(dates, values, 300), bench[:300])
+    assert analytics.full_rebuilds == 1 and analytics.revisions == 1
+    assert_same_stats(stats, RollingAnalytics(dates[0]).sync(matrix(dates, values, 300), bench[:300]))
+
+
+def test_revision_then_next_session_matches_rebuild():
+    dates, values, bench = make_prices()
+    analytics = RollingAnalytics(dates[0])
+    analytics.sync(matrix(dates, values, 300), bench[:300])
+
+    values[299, 1] *= 0.97
+    analytics.sync(matrix(dates, values, 300), bench[:300])
+    # Séance suivante, avec une nouvelle révision de la précédente
+    values[299, 4] *= 1.03
+    stats = analytics.sync(matrix(dates, values, 301), bench[:301])
+    assert analytics.full_rebuilds == 1 and analytics.revisions == 2 and analytics.incremental_updates == 1
+    assert_same_stats(stats, RollingAnalytics(dates[0]).sync(matrix(dates, values, 301), bench[:301]))
+
+
+def test_unchanged_matrix_is_not_revised():
+    dates, values, bench = make_prices()
+    analytics = RollingAnalytics(dates[0])
+    first = analytics.sync(matrix(dates, values, 300), bench[:300])
+    assert analytics.sync(matrix(dates, values, 300), bench[:300]) is first
+    assert analytics.revisions == 0 and analytics.full_rebuilds == 1
+
+
+def test_returned_stats_are_frozen():
+    dates, values, bench = make_prices()
+    analytics = RollingAnalytics(dates[0])
+    before = analytics.sync(matrix(dates, values, 300), bench[:300])
+    latest = before.latest()
+    history = before.history(30)["Volatilité (%)"]
+
+    # Séance suivante et révision : la copie déjà renvoyée ne change pas
+    values[299] *= 1.05
+    after = analytics.sync(matrix(dates, values, 301), bench[:301])
+    assert after is not before and len(before) == 300 and len(after) == 301
+    pd.testing.assert_frame_equal(before.latest(), latest)
+    pd.testing.assert_frame_equal(before.history(30)["Volatilité (%)"], history)
+    frame = before.latest()
+    frame.iloc[0, 0] = 0.0
+    pd.testing.assert_frame_equal(before.latest(), latest)
@@ -0,0 +1,84 @@
+# test_snapshot.py
+
+# Instantanés projetés en mémoire : aller-retour publication / lecture identique à la matrice,
+# réutilisation de la projection, nettoyage des anciennes versions sans invalider les lecteurs.
+
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.price_matrix import PriceMatrix
+from src.snapshot import SnapshotStore, snapshot_key
+
+
+def make_prices(n_dates=250, n_tickers=5, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2023-01-02", periods=n_dates)
+    values = 100 * np.cumprod(1 + rng.normal(0, 0.01, (n_dates, n_tickers)), axis=0)
+    values[:30, 1] = np.nan
+    return PriceMatrix(dates, [f"T{i}" for i in range(n_tickers)], values)
+
+
+def assert_same_matrix(actual, expected):
+    assert list(actual.tickers) == list(expected.tickers)
+    # Dates enregistrées en nanosecondes, quelle que soit la résolution d'origine
+    pd.testing.assert_index_equal(
+        pd.DatetimeIndex(actual.dates).as_unit("ns"), pd.DatetimeIndex(expected.dates).as_unit("ns"), check_names=False
+    )
+    np.testing.assert_array_equal(actual.values, expected.values)
+
+
+def test_publish_then_load_round_trip(tmp_path):
+    prices = make_prices()
+    store = SnapshotStore(str(tmp_path))
+    key = snapshot_key(prices.tickers, prices.dates[0])
+    published = store.publish(key, prices)
+    assert_same_matrix(published.prices, prices)
+
+    # Autre processus : nouveau répertoire ouvert sur les mêmes fichiers
+    loaded = SnapshotStore(str(tmp_path)).load(key)
+    assert loaded.version == published.version
+    assert_same_matrix(loaded.prices, prices)
+    # Projection du fichier, sans copie
+    assert not loaded.prices.values.flags.owndata
+    with pytest.raises(ValueError):
+        loaded.prices.values[0, 0] = 0.0
+
+
+def test_load_reuses_projection_until_republished(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    assert store.load("absent") is None
+    store.publish("k", make_prices())
+    first = store.load("k")
+    assert store.load("k") is first
+
+    store.publish("k", make_prices(seed=1))
+    second = store.load("k")
+    assert second is not first and second.version != first.version
+    assert_same_matrix(second.prices, make_prices(seed=1))
+
+
+def test_cleanup_keeps_current_version_and_open_readers(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    old = SnapshotStore(str(tmp_path))
+    store.publish("k", make_prices(seed=0))
+    reader = old.load("k")
+
+    for seed in (1, 2):
+        current = store.publish("k", make_prices(seed=seed))
+    # Seuls les fichiers de la version courante restent sur le disque
+    files = sorted(os.path.basename(p) for p in glob.glob(os.path.join(str(tmp_path), "k-*.npy")))
+    assert files == [f"k-{current.version}.dates.npy", f"k-{current.version}.values.npy"]
+    assert_same_matrix(SnapshotStore(str(tmp_path)).load("k").prices, make_prices(seed=2))
+
+    # Une projection ouverte avant le nettoyage reste lisible et intacte
+    assert_same_matrix(reader.prices, make_prices(seed=0))
+
+
+def test_snapshot_key_depends_on_universe_and_start():
+    assert snapshot_key(["A", "B"], "2020-01-01") == snapshot_key(("A", "B"), pd.Timestamp("2020-01-01"))
+    assert snapshot_key(["A", "B"], "2020-01-01") != snapshot_key(["B", "A"], "2020-01-01")
+    assert snapshot_key(["A", "B"], "2020-01-01") != snapshot_key(["A", "B"], "2020-01-02")
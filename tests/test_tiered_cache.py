@@ -0,0 +1,107 @@
+# test_tiered_cache.py
+
+# Cache à durées de validité : valeur périmée servie pendant un rafraîchissement unique,
+# éviction des clés les moins récemment utilisées, remise à zéro, niveaux des fondamentaux.
+
+import threading
+import time
+
+from src import market_data
+from src.tiered_cache import TIER_TTLS, TieredCache
+
+
+class CountingLoader:
+    """fetch_many qui compte ses appels ; `gate` retient les appels jusqu'à son ouverture."""
+
+    def __init__(self):
+        self.calls = []
+        self.version = 0
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, keys):
+        self.calls.append(list(keys))
+        self.gate.wait(5)
+        return {key: (f"{key}-v{self.version}", None) for key in keys}
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_stale_value_served_while_refreshed_once():
+    cache, loader = TieredCache(), CountingLoader()
+    assert cache.get_many(["a"], loader, ttl=60) == {"a": ("a-v0", None)}
+
+    loader.version = 1
+    loader.gate.clear()
+    # Deux lectures d'une valeur périmée : servies sans attendre, un seul rafraîchissement
+    assert cache.get_many(["a"], loader, ttl=0)["a"] == ("a-v0", None)
+    assert cache.get_many(["a"], loader, ttl=0)["a"] == ("a-v0", None)
+    loader.gate.set()
+    wait_until(lambda: cache.get_many(["a"], loader, ttl=60)["a"] == ("a-v1", None))
+    assert loader.calls == [["a"], ["a"]]
+    assert cache.stale_hits == 2 and cache.misses == 1
+
+
+def test_least_recently_used_keys_are_evicted():
+    cache, loader = TieredCache(max_entries=2), CountingLoader()
+    cache.get_many(["a", "b"], loader, ttl=60)
+    cache.get_many(["a"], loader, ttl=60)
+    cache.get_many(["c"], loader, ttl=60)
+    assert len(cache) == 2 and cache.evictions == 1
+    assert cache.age("b") is None and cache.age("a") is not None
+
+    cache.get_many(["b"], loader, ttl=60)
+    assert loader.calls[-1] == ["b"]
+
+
+def test_clear_forgets_refreshes_in_flight():
+    cache, loader = TieredCache(), CountingLoader()
+    cache.get_many(["a"], loader, ttl=60)
+    loader.gate.clear()
+    loader.version = 1
+    cache.get_many(["a"], loader, ttl=0)
+    cache.clear()
+    assert cache._refreshing == set()
+
+    # Le rafraîchissement lancé avant clear() ne repeuple pas le cache
+    loader.gate.set()
+    loader.version = 2
+    assert cache.get_many(["a"], loader, ttl=60)["a"] == ("a-v2", None)
+    time.sleep(0.1)
+    assert cache.get_many(["a"], loader, ttl=60)["a"] == ("a-v2", None)
+
+
+def test_stale_quotes_do_not_refetch_fundamentals(monkeypatch):
+    calls = []
+
+    def fetch(tickers):
+        calls.append(list(tickers))
+        info = {"sector": "Tech", "trailingPE": 20.0 + len(calls), "currentPrice": 100.0 + len(calls)}
+        return {t: (dict(info), None) for t in tickers}
+
+    monkeypatch.setattr(market_data, "fetch_fundamentals", fetch)
+    monkeypatch.setattr(market_data.config, "USE_REFRESHER", False)
+    monkeypatch.setitem(TIER_TTLS, "quotes", 0.2)
+    market_data.clear_caches()
+    try:
+        info, error = market_data.get_fundamentals(["AAA"])["AAA"]
+        assert error is None and info == {"sector": "Tech", "trailingPE": 21.0, "currentPrice": 101.0}
+
+        info, _ = market_data.get_fundamentals(["AAA"], fields=("sector", "trailingPE"))["AAA"]
+        assert info == {"sector": "Tech", "trailingPE": 21.0} and len(calls) == 1
+        # Fondamentaux à jour : servis sans téléchargement même si les cours sont périmés
+        time.sleep(0.25)
+        info, _ = market_data.get_fundamentals(["AAA"], fields=("sector", "trailingPE"))["AAA"]
+        assert info["trailingPE"] == 21.0 and len(calls) == 1
+
+        # Cours périmés : rafraîchis en arrière-plan, qui met aussi à jour les autres niveaux
+        market_data.get_fundamentals(["AAA"], fields=market_data.QUOTE_FIELDS)
+        wait_until(lambda: len(calls) == 2 and market_data.get_fundamentals(
+            ["AAA"], fields=("trailingPE",))["AAA"][0] == {"trailingPE": 22.0})
+    finally:
+        market_data.clear_caches()